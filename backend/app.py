@@ -5,6 +5,8 @@ from flask_migrate import Migrate
 import os
 import sys
 import logging
+import tempfile
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -22,8 +24,114 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 # JWT Configuration
 app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-change-in-production')
+# Key id written into the "kid" header of new tokens
+app.config['JWT_KEY_ID'] = os.getenv('JWT_KEY_ID', 'default')
+# Retired signing keys still accepted during rotation, as "kid:secret,kid:secret"
+app.config['JWT_PREVIOUS_KEYS'] = os.getenv('JWT_PREVIOUS_KEYS', '')
+app.config['JWT_CACHE_SIZE'] = int(os.getenv('JWT_CACHE_SIZE', '4096'))
 app.config['GOOGLE_CLIENT_ID'] = os.getenv('GOOGLE_CLIENT_ID', '')
 
+# Google OAuth verification (URLs can point at a local stub, see google_stub_server.py)
+app.config['GOOGLE_TOKENINFO_URL'] = os.getenv('GOOGLE_TOKENINFO_URL', 'https://www.googleapis.com/oauth2/v3/tokeninfo')
+app.config['GOOGLE_USERINFO_URL'] = os.getenv('GOOGLE_USERINFO_URL', 'https://www.googleapis.com/oauth2/v2/userinfo')
+app.config['GOOGLE_HTTP_TIMEOUT'] = float(os.getenv('GOOGLE_HTTP_TIMEOUT', '5'))
+app.config['GOOGLE_TOKEN_CACHE_TTL'] = int(os.getenv('GOOGLE_TOKEN_CACHE_TTL', '60'))
+
+# Password hashing configuration
+# BCRYPT_LOG_ROUNDS is the bcrypt work factor (each +1 doubles login CPU time).
+# Stored hashes with a different cost are transparently rehashed on login.
+app.config['BCRYPT_LOG_ROUNDS'] = int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+app.config['BCRYPT_MAX_WORKERS'] = int(os.getenv('BCRYPT_MAX_WORKERS', '2'))
+
+# Building layout: a JSON file, or towers / floors / units settings
+# (floors and units accept per-tower overrides like "14,10:12")
+app.config['BUILDING_LAYOUT_FILE'] = os.getenv('BUILDING_LAYOUT_FILE', '')
+app.config['BUILDING_TOWERS'] = os.getenv('BUILDING_TOWERS', '1-10')
+app.config['BUILDING_FLOORS_PER_TOWER'] = os.getenv('BUILDING_FLOORS_PER_TOWER', '14')
+app.config['BUILDING_UNITS_PER_FLOOR'] = os.getenv('BUILDING_UNITS_PER_FLOOR', '4')
+# Flats that do not exist or are not visited, e.g. "A101,J1404"
+app.config['BUILDING_EXCLUDED_FLATS'] = os.getenv('BUILDING_EXCLUDED_FLATS', '')
+
+# Login rate limiting (token buckets as "count/seconds")
+app.config['RATE_LIMIT_ENABLED'] = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+# memory:// (per worker) or sqlite:///path/to/file.db (shared by workers on one host)
+app.config['RATE_LIMIT_STORAGE_URL'] = os.getenv('RATE_LIMIT_STORAGE_URL', 'memory://')
+# Proxies in front of gunicorn that append to X-Forwarded-For (nginx = 1, Render's edge + nginx = 2);
+# the client address is read from X-Forwarded-For that many hops from the right (0 = the socket peer)
+app.config['RATE_LIMIT_PROXY_COUNT'] = int(os.getenv('RATE_LIMIT_PROXY_COUNT', '0'))
+app.config['LOGIN_RATE_LIMIT_PER_IP'] = os.getenv('LOGIN_RATE_LIMIT_PER_IP', '20/60')
+app.config['LOGIN_RATE_LIMIT_PER_EMAIL'] = os.getenv('LOGIN_RATE_LIMIT_PER_EMAIL', '5/300')
+
+# Processes rendering Excel tower sheets concurrently (1 = sequential)
+app.config['EXCEL_EXPORT_WORKERS'] = int(os.getenv('EXCEL_EXPORT_WORKERS', '1'))
+# Reuse cached tower sheets whose donations have not changed since the last export
+app.config['EXCEL_EXPORT_INCREMENTAL'] = os.getenv('EXCEL_EXPORT_INCREMENTAL', 'false').lower() == 'true'
+
+# Timezone the drive runs in; "today" and time-series buckets use it (rows are stored in UTC)
+app.config['DRIVE_TIMEZONE'] = os.getenv('DRIVE_TIMEZONE', 'Asia/Kolkata')
+
+# Seconds aggregate statistics stay cached per worker (cleared on donation writes)
+app.config['STATS_CACHE_TTL'] = int(os.getenv('STATS_CACHE_TTL', '30'))
+
+# Database connection pool, per worker process (see db_pool.py)
+# Web server concurrency, exported by gunicorn.conf.py (outside gunicorn: one process, 5 threads)
+app.config['GUNICORN_WORKERS'] = int(os.getenv('GUNICORN_WORKERS') or '1')
+app.config['GUNICORN_THREADS'] = int(os.getenv('GUNICORN_THREADS') or '5')
+# 0 = one connection per request thread
+app.config['DB_POOL_SIZE'] = int(os.getenv('DB_POOL_SIZE', '0'))
+app.config['DB_MAX_OVERFLOW'] = int(os.getenv('DB_MAX_OVERFLOW', '2'))
+# Connections this app may hold in total, over all workers (0 = no cap); PostgreSQL's
+# default max_connections is 100, the rest is left for migrations and admin sessions
+app.config['DB_MAX_CONNECTIONS'] = int(os.getenv('DB_MAX_CONNECTIONS', '80'))
+# Seconds to wait for a free connection before failing the request
+app.config['DB_POOL_TIMEOUT'] = int(os.getenv('DB_POOL_TIMEOUT', '10'))
+# Reconnect connections older than this, and test each one on checkout (survives database restarts)
+app.config['DB_POOL_RECYCLE'] = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+app.config['DB_POOL_PRE_PING'] = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+# PostgreSQL only: connect timeout (seconds) and per-statement timeout (milliseconds, 0 = none)
+app.config['DB_CONNECT_TIMEOUT'] = int(os.getenv('DB_CONNECT_TIMEOUT', '5'))
+app.config['DB_STATEMENT_TIMEOUT_MS'] = int(os.getenv('DB_STATEMENT_TIMEOUT_MS', '30000'))
+
+# Optional read replica for stats and exports (see db_routing.py)
+app.config['DATABASE_REPLICA_URL'] = os.getenv('DATABASE_REPLICA_URL', '')
+# Seconds a user keeps reading from the primary after writing (must cover replication lag)
+app.config['DB_REPLICA_STICKY_SECONDS'] = int(os.getenv('DB_REPLICA_STICKY_SECONDS', '10'))
+
+# SQLite PRAGMAs applied to every new connection (empty = leave the SQLite default).
+# WAL lets collectors read while another writes; writers queue for busy_timeout ms.
+app.config['SQLITE_JOURNAL_MODE'] = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+app.config['SQLITE_SYNCHRONOUS'] = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+app.config['SQLITE_BUSY_TIMEOUT_MS'] = os.getenv('SQLITE_BUSY_TIMEOUT_MS', '10000')
+app.config['SQLITE_MMAP_SIZE'] = os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024))
+# Page cache per connection, in KiB
+app.config['SQLITE_CACHE_SIZE_KB'] = os.getenv('SQLITE_CACHE_SIZE_KB', '16384')
+
+# Per-request query count and DB time (Server-Timing header and a JSON log line
+# per request) plus a log of statements slower than SLOW_QUERY_MS; off by default
+app.config['QUERY_INSTRUMENTATION'] = os.getenv('QUERY_INSTRUMENTATION', 'false').lower() == 'true'
+app.config['SLOW_QUERY_MS'] = int(os.getenv('SLOW_QUERY_MS', '200'))
+# Include bound parameters (donor names, phone numbers) in slow query log lines
+app.config['SLOW_QUERY_LOG_PARAMS'] = os.getenv('SLOW_QUERY_LOG_PARAMS', 'true').lower() == 'true'
+# Flag requests running the same statement this many times (N+1 loops)
+app.config['N_PLUS_ONE_THRESHOLD'] = int(os.getenv('N_PLUS_ONE_THRESHOLD', '10'))
+
+# Prometheus metrics at /metrics (gunicorn workers share them via PROMETHEUS_MULTIPROC_DIR)
+app.config['METRICS_ENABLED'] = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+# Bearer token required to scrape /metrics (empty = open; nginx does not proxy /metrics)
+app.config['METRICS_TOKEN'] = os.getenv('METRICS_TOKEN', '')
+
+# Readiness probe: seconds a SELECT 1 may take, and how long a result is reused
+app.config['HEALTH_CHECK_TIMEOUT'] = float(os.getenv('HEALTH_CHECK_TIMEOUT', '1'))
+app.config['HEALTH_CACHE_SECONDS'] = float(os.getenv('HEALTH_CACHE_SECONDS', '2'))
+
+# Per-request cProfile (see profiling.py): admins send "X-Profile: 1" when enabled;
+# PROFILE_ALL_REQUESTS profiles everything (staging only)
+app.config['PROFILING_ENABLED'] = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+app.config['PROFILE_ALL_REQUESTS'] = os.getenv('PROFILE_ALL_REQUESTS', 'false').lower() == 'true'
+app.config['PROFILE_DIR'] = os.getenv('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'donation-app-profiles'))
+# Profiles kept per endpoint (older ones are deleted)
+app.config['PROFILE_KEEP'] = int(os.getenv('PROFILE_KEEP', '10'))
+
 # Configure logging to stdout so platforms like Render capture app logs
 log_level_name = os.getenv('LOG_LEVEL', 'INFO').upper()
 log_level = getattr(logging, log_level_name, logging.INFO)
@@ -36,7 +144,16 @@ app.logger.setLevel(log_level)
 app.logger.info("Flask application initialized with log level %s", log_level_name)
 
 # Initialize extensions
-db = SQLAlchemy(app)
+from db_pool import engine_options, sqlite_profile
+from db_routing import REPLICA_BIND, RoutingSession, replica_router
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+if app.config['DATABASE_REPLICA_URL']:
+    app.config['SQLALCHEMY_BINDS'] = {
+        REPLICA_BIND: dict(engine_options(app.config, app.config['DATABASE_REPLICA_URL']),
+                           url=app.config['DATABASE_REPLICA_URL'])
+    }
+sqlite_profile.init_app(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
 migrate = Migrate(app, db)
 CORS(app)
 
@@ -44,6 +161,33 @@ CORS(app)
 from auth import auth_service
 auth_service.init_app(app)
 
+# Load the building layout once
+import building_layout
+building_layout.init_app(app)
+
+# Count and time the queries each request runs, if enabled
+from query_stats import query_instrumentation
+query_instrumentation.init_app(app)
+
+# Request, database, export and login metrics
+from metrics import metrics
+metrics.init_app(app)
+
+# Liveness and readiness probes
+from health import health_checks
+health_checks.init_app(app)
+
+# Profile requests on demand, if enabled
+from profiling import request_profiler
+request_profiler.init_app(app)
+
+# Route reporting queries to the read replica, if configured
+replica_router.init_app(app)
+
+# Initialize login rate limiter
+from rate_limit import login_rate_limiter
+login_rate_limiter.init_app(app)
+
 # Import routes after db initialization to avoid circular imports
 from routes import api_bp
 from auth_routes import auth_bp
@@ -73,7 +217,7 @@ def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'timestamp': '2024-01-01T00:00:00Z',
+        'timestamp': datetime.now(timezone.utc).isoformat(),
         'version': '1.0.0'
     })
 
@@ -5,12 +5,19 @@ Handles password hashing, JWT tokens, and Google OAuth
 
 import jwt
 import bcrypt
+import hashlib
+import time
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
 from functools import wraps
 from flask import request, jsonify, current_app
 from models import User, Invite, UserRole, db
+from sqlalchemy.orm import joinedload
+from cache import TTLCache
+from metrics import BCRYPT_DURATION
 import json
+from concurrent.futures import ThreadPoolExecutor
 
 class AuthService:
     def __init__(self, app=None):
@@ -22,20 +29,94 @@ class AuthService:
         self.app = app
         app.config.setdefault('JWT_SECRET_KEY', 'your-secret-key-change-in-production')
         app.config.setdefault('JWT_ACCESS_TOKEN_EXPIRES', timedelta(hours=24))
+        app.config.setdefault('JWT_KEY_ID', 'default')
+        app.config.setdefault('JWT_PREVIOUS_KEYS', '')
+        app.config.setdefault('JWT_CACHE_SIZE', 4096)
+        app.config.setdefault('JWT_CACHE_TTL', 300)  # seconds, further capped by each token's exp
         app.config.setdefault('GOOGLE_CLIENT_ID', 'your-google-client-id')
+        app.config.setdefault('BCRYPT_LOG_ROUNDS', 12)
+        app.config.setdefault('BCRYPT_MAX_WORKERS', 2)
+        app.config.setdefault('GOOGLE_TOKENINFO_URL', 'https://www.googleapis.com/oauth2/v3/tokeninfo')
+        app.config.setdefault('GOOGLE_USERINFO_URL', 'https://www.googleapis.com/oauth2/v2/userinfo')
+        app.config.setdefault('GOOGLE_HTTP_TIMEOUT', 5.0)  # seconds, per upstream call
+        app.config.setdefault('GOOGLE_HTTP_POOL_SIZE', 10)
+        app.config.setdefault('GOOGLE_TOKEN_CACHE_TTL', 60)  # seconds
+        app.config.setdefault('GOOGLE_TOKEN_CACHE_SIZE', 1024)
+        
+        # bcrypt releases the GIL, so a small dedicated pool bounds how many
+        # request threads can burn CPU on password checks at the same time
+        self.bcrypt_executor = ThreadPoolExecutor(
+            max_workers=app.config['BCRYPT_MAX_WORKERS'],
+            thread_name_prefix='bcrypt'
+        )
+        
+        # Verification keys by kid: the current signing key plus any retired ones
+        self.jwt_keys = self._parse_previous_keys(app.config['JWT_PREVIOUS_KEYS'])
+        self.jwt_keys[app.config['JWT_KEY_ID']] = app.config['JWT_SECRET_KEY']
+        self.token_cache = TTLCache(
+            maxsize=app.config['JWT_CACHE_SIZE'],
+            ttl=app.config['JWT_CACHE_TTL']
+        )
+        
+        # Pooled keep-alive connections to Google, shared by all request threads
+        pool_size = app.config['GOOGLE_HTTP_POOL_SIZE']
+        self.google_session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.google_session.mount('https://', adapter)
+        self.google_session.mount('http://', adapter)
+        self.google_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='google-auth')
+        self.google_token_cache = TTLCache(
+            maxsize=app.config['GOOGLE_TOKEN_CACHE_SIZE'],
+            ttl=app.config['GOOGLE_TOKEN_CACHE_TTL']
+        )
     
-    def hash_password(self, password):
-        """Hash a password using bcrypt"""
-        salt = bcrypt.gensalt()
-        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+    def hash_password(self, password, rounds=None):
+        """Hash a password using bcrypt with the configured work factor"""
+        if rounds is None:
+            rounds = self.app.config['BCRYPT_LOG_ROUNDS'] if self.app else 12
+        salt = bcrypt.gensalt(rounds=rounds)
+        with BCRYPT_DURATION.labels('hash').time():
+            hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
         return hashed.decode('utf-8')  # Convert bytes to string for database storage
     
     def verify_password(self, password, password_hash):
         """Verify a password against its hash"""
+        if not password_hash:
+            return False  # Google-only accounts have no password
         # password_hash from database is already a string, so we need to encode it back to bytes
         if isinstance(password_hash, str):
             password_hash = password_hash.encode('utf-8')
-        return bcrypt.checkpw(password.encode('utf-8'), password_hash)
+        password = password.encode('utf-8')
+        
+        # Run the check on the bcrypt pool instead of the request thread
+        executor = getattr(self, 'bcrypt_executor', None)
+        with BCRYPT_DURATION.labels('check').time():
+            if executor is None:
+                return bcrypt.checkpw(password, password_hash)
+            return executor.submit(bcrypt.checkpw, password, password_hash).result()
+    
+    def get_hash_rounds(self, password_hash):
+        """Return the bcrypt cost a stored hash was created with (None if unparseable)"""
+        # Hashes look like $2b$12$<22 char salt><31 char digest>
+        try:
+            return int(password_hash.split('$')[2])
+        except (AttributeError, IndexError, ValueError):
+            return None
+    
+    def needs_rehash(self, password_hash):
+        """Check if a stored hash uses a different cost than the configured one"""
+        return self.get_hash_rounds(password_hash) != self.app.config['BCRYPT_LOG_ROUNDS']
+    
+    def _parse_previous_keys(self, previous_keys):
+        """Parse retired signing keys given as a dict or a "kid:secret,kid:secret" string"""
+        if isinstance(previous_keys, dict):
+            return dict(previous_keys)
+        keys = {}
+        for entry in (previous_keys or '').split(','):
+            kid, separator, secret = entry.strip().partition(':')
+            if separator and kid and secret:
+                keys[kid] = secret
+        return keys
     
     def generate_token(self, user_id, email, roles):
         """Generate JWT token for user"""
@@ -46,26 +127,62 @@ class AuthService:
             'exp': datetime.utcnow() + self.app.config['JWT_ACCESS_TOKEN_EXPIRES'],
             'iat': datetime.utcnow()
         }
-        return jwt.encode(payload, self.app.config['JWT_SECRET_KEY'], algorithm='HS256')
+        return jwt.encode(
+            payload,
+            self.app.config['JWT_SECRET_KEY'],
+            algorithm='HS256',
+            headers={'kid': self.app.config['JWT_KEY_ID']}
+        )
     
     def verify_token(self, token):
         """Verify and decode JWT token"""
-        try:
-            payload = jwt.decode(token, self.app.config['JWT_SECRET_KEY'], algorithms=['HS256'])
+        # Tokens already verified recently skip the HMAC and claims parsing
+        payload = self.token_cache.get(token)
+        if payload is not None:
             return payload
+        
+        try:
+            # Pick the key by kid; tokens issued before rotation support carry none
+            kid = jwt.get_unverified_header(token).get('kid')
+            secret = self.jwt_keys.get(kid) if kid else self.app.config['JWT_SECRET_KEY']
+            if secret is None:
+                return None
+            
+            payload = jwt.decode(token, secret, algorithms=['HS256'])
         except jwt.ExpiredSignatureError:
             return None
         except jwt.InvalidTokenError:
             return None
+        
+        self.token_cache.set(token, payload, expires_at=payload.get('exp'))
+        return payload
     
     def verify_google_token(self, google_token):
         """Verify Google OAuth token and get user info"""
+        # Cache by digest so raw access tokens are never kept in memory
+        cache_key = hashlib.sha256(google_token.encode('utf-8')).hexdigest()
+        cached = self.google_token_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            # Verify the token with Google
-            response = requests.get(
-                'https://www.googleapis.com/oauth2/v3/tokeninfo',
-                params={'access_token': google_token}
+            timeout = self.app.config['GOOGLE_HTTP_TIMEOUT']
+            
+            # Verify the token and fetch the user info concurrently
+            token_info_future = self.google_executor.submit(
+                self.google_session.get,
+                self.app.config['GOOGLE_TOKENINFO_URL'],
+                params={'access_token': google_token},
+                timeout=timeout
             )
+            user_info_future = self.google_executor.submit(
+                self.google_session.get,
+                self.app.config['GOOGLE_USERINFO_URL'],
+                headers={'Authorization': f'Bearer {google_token}'},
+                timeout=timeout
+            )
+            response = token_info_future.result()
+            user_info_response = user_info_future.result()
             
             if response.status_code != 200:
                 return None
@@ -76,51 +193,65 @@ class AuthService:
             if token_info.get('aud') != self.app.config['GOOGLE_CLIENT_ID']:
                 return None
             
-            # Get user info
-            user_info_response = requests.get(
-                'https://www.googleapis.com/oauth2/v2/userinfo',
-                headers={'Authorization': f'Bearer {google_token}'}
-            )
-            
             if user_info_response.status_code != 200:
                 return None
             
-            return user_info_response.json()
+            user_info = user_info_response.json()
+            
+            # Never cache past the token's own expiry
+            expires_in = token_info.get('expires_in')
+            expires_at = time.time() + int(expires_in) if expires_in else None
+            self.google_token_cache.set(cache_key, user_info, expires_at=expires_at)
+            
+            return user_info
         except Exception as e:
             current_app.logger.error(f"Google token verification error: {e}")
             return None
     
-    def get_user_roles(self, user_id):
-        """Get user roles and tower assignments"""
-        user_roles = UserRole.query.filter_by(user_id=user_id).all()
+    def load_user_with_roles(self, **filters):
+        """Load a user together with their roles in a single joined query"""
+        return User.query.options(joinedload(User.user_roles)).filter_by(**filters).first()
+    
+    def serialize_roles(self, user_roles):
+        """Build the roles payload (as stored in tokens) from UserRole rows"""
         roles = []
         for user_role in user_roles:
-            role_data = {
+            # Rows written before the towers column existed fall back to the JSON string
+            if user_role.towers is not None:
+                assigned_towers = list(user_role.towers)
+            else:
+                assigned_towers = json.loads(user_role.assigned_towers) if user_role.assigned_towers else []
+            roles.append({
                 'role': user_role.role,
-                'assigned_towers': json.loads(user_role.assigned_towers) if user_role.assigned_towers else []
-            }
-            roles.append(role_data)
+                'assigned_towers': assigned_towers
+            })
         return roles
     
+    def get_user_roles(self, user_id):
+        """Get user roles and tower assignments"""
+        user_roles = UserRole.query.filter_by(user_id=user_id).all()
+        return self.serialize_roles(user_roles)
+    
     def has_role(self, user_id, required_role):
         """Check if user has a specific role"""
         user_role = UserRole.query.filter_by(user_id=user_id, role=required_role).first()
         return user_role is not None
     
-    def can_access_tower(self, user_id, tower):
-        """Check if user can access a specific tower"""
+    def accessible_towers(self, user_id):
+        """Get the set of towers a user can access, or None if they can access all (admin)"""
         user_roles = UserRole.query.filter_by(user_id=user_id).all()
         
-        for user_role in user_roles:
-            if user_role.role == 'admin':
-                return True  # Admins can access all towers
-            
-            if user_role.assigned_towers:
-                assigned_towers = json.loads(user_role.assigned_towers)
-                if tower in assigned_towers:
-                    return True
-        
-        return False
+        towers = set()
+        for role_data in self.serialize_roles(user_roles):
+            if role_data['role'] == 'admin':
+                return None  # Admins can access all towers
+            towers.update(role_data['assigned_towers'])
+        return towers
+    
+    def can_access_tower(self, user_id, tower):
+        """Check if user can access a specific tower"""
+        towers = self.accessible_towers(user_id)
+        return towers is None or tower in towers
 
 # Initialize auth service
 auth_service = AuthService()
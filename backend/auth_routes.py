@@ -7,6 +7,7 @@ from flask import Blueprint, request, jsonify
 from models import User, Invite, UserRole, db
 from schemas import register_schema, login_schema, google_auth_schema, invite_schema, invites_schema, user_schema, change_password_schema
 from auth import auth_service, require_auth, require_role
+from rate_limit import login_rate_limiter
 from datetime import datetime, timedelta
 import json
 
@@ -57,31 +58,33 @@ def register():
             password_hash=password_hash
         )
         
-        db.session.add(user)
-        db.session.flush()  # Get user ID
-        
-        # Create user role
+        # Create user role (attached through the relationship so no reload is needed)
         user_role = UserRole(
-            user_id=user.id,
+            user=user,
             role=invite.role,
             assigned_towers=invite.assigned_towers
         )
         
+        db.session.add(user)
         db.session.add(user_role)
+        db.session.flush()  # Get user ID
         
         # Mark invite as used
         invite.is_used = True
         
+        # Build the response from the in-memory rows before commit expires them
+        roles = auth_service.serialize_roles(user.user_roles)
+        user_data = user_schema.dump(user)
+        
         db.session.commit()
         
         # Generate token
-        roles = auth_service.get_user_roles(user.id)
-        token = auth_service.generate_token(user.id, user.email, roles)
+        token = auth_service.generate_token(user_data['id'], user_data['email'], roles)
         
         return jsonify({
             'message': 'Registration successful',
             'token': token,
-            'user': user_schema.dump(user),
+            'user': user_data,
             'roles': roles
         }), 201
         
@@ -90,6 +93,7 @@ def register():
         return jsonify({'error': str(e)}), 400
 
 @auth_bp.route('/login', methods=['POST'])
+@login_rate_limiter.limit
 def login():
     """Login with email and password"""
     data = request.get_json()
@@ -98,8 +102,8 @@ def login():
         # Validate login data
         validated_data = login_schema.load(data)
         
-        # Find user
-        user = User.query.filter_by(email=validated_data['email']).first()
+        # Find user (roles are joined in so token issuance needs no further queries)
+        user = auth_service.load_user_with_roles(email=validated_data['email'])
         if not user:
             return jsonify({'error': 'Invalid email or password'}), 401
         
@@ -111,17 +115,26 @@ def login():
             return jsonify({'error': 'Invalid email or password'}), 401
         
         # Generate token
-        roles = auth_service.get_user_roles(user.id)
+        roles = auth_service.serialize_roles(user.user_roles)
         token = auth_service.generate_token(user.id, user.email, roles)
+        user_data = user_schema.dump(user)
+        
+        # Upgrade (or downgrade) the stored hash to the configured bcrypt cost
+        if auth_service.needs_rehash(user.password_hash):
+            user.password_hash = auth_service.hash_password(validated_data['password'])
+            db.session.commit()
+        
+        login_rate_limiter.reset_email(validated_data['email'])
         
         return jsonify({
             'message': 'Login successful',
             'token': token,
-            'user': user_schema.dump(user),
+            'user': user_data,
             'roles': roles
         }), 200
         
     except Exception as e:
+        db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
 @auth_bp.route('/google-auth', methods=['POST'])
@@ -154,7 +167,7 @@ def google_auth():
             return jsonify({'error': 'Email does not match invite'}), 400
         
         # Check if user already exists
-        user = User.query.filter_by(email=google_user_info['email']).first()
+        user = auth_service.load_user_with_roles(email=google_user_info['email'])
         
         if not user:
             # Create new user
@@ -164,31 +177,33 @@ def google_auth():
                 google_id=google_user_info['id']
             )
             
-            db.session.add(user)
-            db.session.flush()  # Get user ID
-            
-            # Create user role
+            # Create user role (attached through the relationship so no reload is needed)
             user_role = UserRole(
-                user_id=user.id,
+                user=user,
                 role=invite.role,
                 assigned_towers=invite.assigned_towers
             )
             
+            db.session.add(user)
             db.session.add(user_role)
+            db.session.flush()  # Get user ID
             
             # Mark invite as used
             invite.is_used = True
-            
-            db.session.commit()
+        
+        # Build the response from the loaded rows before commit expires them
+        roles = auth_service.serialize_roles(user.user_roles)
+        user_data = user_schema.dump(user)
+        
+        db.session.commit()
         
         # Generate token
-        roles = auth_service.get_user_roles(user.id)
-        token = auth_service.generate_token(user.id, user.email, roles)
+        token = auth_service.generate_token(user_data['id'], user_data['email'], roles)
         
         return jsonify({
             'message': 'Google authentication successful',
             'token': token,
-            'user': user_schema.dump(user),
+            'user': user_data,
             'roles': roles
         }), 200
         
@@ -200,11 +215,11 @@ def google_auth():
 @require_auth
 def get_profile():
     """Get current user profile"""
-    user = User.query.get(request.user_id)
+    user = auth_service.load_user_with_roles(id=request.user_id)
     if not user:
         return jsonify({'error': 'User not found'}), 404
     
-    roles = auth_service.get_user_roles(user.id)
+    roles = auth_service.serialize_roles(user.user_roles)
     
     return jsonify({
         'user': user_schema.dump(user),
@@ -234,7 +249,7 @@ def change_password():
         new_password_hash = auth_service.hash_password(validated_data['new_password'])
         
         # Update password
-        user.password_hash = new_password_hash.decode('utf-8')
+        user.password_hash = new_password_hash
         db.session.commit()
         
         return jsonify({
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark of Excel export wall time, sequential vs parallel tower sheets
+
+Seeds a throwaway database with --scale synthetic seasons (bench/synthetic.py)
+and times generate_excel with tower sheets rendered sequentially and in
+process pools of increasing size. Each parallel workbook is checked against the
+sequential one. Finally an incremental export is timed after a few
+donations land in one tower.
+
+Usage:
+    python bench/bench_excel_export.py [--scale 10] [--workers 1,2,4,8] [--repeat 3]
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+
+# Use a throwaway database so the benchmark never touches real data
+_db_dir = tempfile.mkdtemp(prefix='bench_excel_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import load_workbook
+from app import app
+from models import db, Donation
+from building_layout import get_layout
+from excel_export import ExcelExporter
+from synthetic import generate
+
+def time_export(workers, repeat):
+    """Return (best wall seconds, workbook bytes) for one worker count"""
+    best, data = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = ExcelExporter(workers=workers).generate_excel().getvalue()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, data
+
+def sheet_values(data):
+    """Cell values of every sheet, skipping the export timestamps"""
+    workbook = load_workbook(io.BytesIO(data))
+    return {
+        ws.title: [row for row in ws.iter_rows(values_only=True) if row[0] != "Exported At"]
+        for ws in workbook.worksheets
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sequential vs parallel Excel export')
+    parser.add_argument('--scale', type=int, default=10, help='seasons of synthetic donations')
+    parser.add_argument('--workers', default='1,2,4,8', help='comma separated worker counts')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    worker_counts = [int(n) for n in args.workers.split(',')]
+
+    with app.app_context():
+        db.create_all()
+        count = generate(args.scale)['donations']
+
+        print("=" * 60)
+        print(f"EXCEL EXPORT: {count} donations, {len(get_layout().towers)} towers, {os.cpu_count()} CPUs")
+        print("=" * 60)
+        baseline_time, baseline = time_export(1, args.repeat)
+        expected = sheet_values(baseline)
+        print(f"sequential          : {baseline_time:7.2f}s")
+        for workers in worker_counts:
+            if workers <= 1:
+                continue
+            elapsed, data = time_export(workers, args.repeat)
+            matches = sheet_values(data) == expected
+            print(f"{workers:2d} worker processes: {elapsed:7.2f}s  speed-up {baseline_time / elapsed:4.2f}x  "
+                  f"{'identical' if matches else 'MISMATCH'}")
+
+        # Incremental export: warm the tower sheet cache, then change one tower
+        ExcelExporter(incremental=True).generate_excel()
+        for unit in range(1, 4):
+            db.session.add(Donation(tower=get_layout().towers[0], floor=1, unit=unit, amount=1100,
+                                    donor_name='Late donor', status='completed'))
+        db.session.commit()
+        start = time.perf_counter()
+        exporter = ExcelExporter(incremental=True)
+        data = exporter.generate_excel().getvalue()
+        elapsed = time.perf_counter() - start
+        matches = sheet_values(data) == sheet_values(time_export(1, 1)[1])
+        print(f"incremental (1 tower changed): {elapsed:7.2f}s  rendered {len(exporter.rendered_towers)}, "
+              f"reused {len(exporter.reused_towers)}  {'identical' if matches else 'MISMATCH'}")
+
+if __name__ == "__main__":
+    main()
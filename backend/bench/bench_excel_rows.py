@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Profiling benchmark of per-row cost when writing Excel tower sheets
+
+Compares the previous cell-by-cell writer (coordinate strings built with
+get_column_letter, border and number format assigned per cell, widths from a
+full rescan) with write_tower_sheet (list-based append, one named style per
+cell, widths tracked while writing). Both write every donation of --scale
+synthetic seasons (bench/synthetic.py, about 630 rows each) into one sheet.
+
+Usage:
+    python bench/bench_excel_rows.py [--scale 30] [--profile]
+"""
+
+import argparse
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tempfile
+import time
+
+# Use a throwaway database so the benchmark never touches real data
+_db_dir = tempfile.mkdtemp(prefix='bench_excel_rows_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.utils import get_column_letter
+from app import app, db
+from excel_export import ExcelExporter
+from excel_styles import register_styles
+from excel_tower_sheets import TOWER_HEADERS, write_tower_sheet
+from synthetic import generate
+
+def synthetic_rows(scale):
+    """Tower sheet rows of every donation in a synthetic drive"""
+    with app.app_context():
+        db.create_all()
+        generate(scale)
+        tower_rows = ExcelExporter()._get_tower_rows()
+    return [row for rows in tower_rows.values() for row in rows]
+
+def legacy_tower_sheet(ws, tower, rows):
+    """The tower sheet writer as it was before named styles"""
+    border = Border(left=Side(style='thin'), right=Side(style='thin'), top=Side(style='thin'), bottom=Side(style='thin'))
+    ws['A1'] = f"TOWER {chr(64 + tower)} - DONATION DETAILS"
+    ws['A1'].font = Font(bold=True, size=14)
+    ws.merge_cells('A1:K1')
+    ws['A1'].alignment = Alignment(horizontal='center')
+    row = 3
+    for col, header in enumerate(TOWER_HEADERS, 1):
+        cell = ws[f'{get_column_letter(col)}{row}']
+        cell.value = header
+        cell.font = Font(bold=True, color="FFFFFF")
+        cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+        cell.border = border
+        cell.alignment = Alignment(horizontal='center')
+    row += 1
+    for floor, unit, donor_name, amount, phone_number, head_count, upi_other_person, sponsorship, notes, status, created_at in rows:
+        values = [floor, unit, f"{chr(64 + tower)}{floor}{unit:02d}", donor_name, amount, phone_number or "",
+                  head_count or "", upi_other_person or "", sponsorship or "", notes or "", status,
+                  created_at.strftime("%Y-%m-%d")]
+        for col, value in enumerate(values, 1):
+            ws[f'{get_column_letter(col)}{row}'] = value
+        for col in range(1, 13):
+            cell = ws[f'{get_column_letter(col)}{row}']
+            cell.border = border
+            if col == 5:
+                cell.number_format = '#,##0'
+        row += 1
+    for column in ws.columns:
+        max_length = max(len(str(cell.value)) for cell in column)
+        ws.column_dimensions[get_column_letter(column[0].column)].width = min(max_length + 2, 30)
+
+def current_tower_sheet(ws, tower, rows):
+    write_tower_sheet(ws, tower, rows)
+
+def run(writer, rows, profile=False):
+    """Return (build us/row, save us/row), optionally printing a profile of the build"""
+    workbook = Workbook()
+    register_styles(workbook)
+    ws = workbook.create_sheet("Tower A")
+    profiler = cProfile.Profile() if profile else None
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    writer(ws, 1, rows)
+    if profiler:
+        profiler.disable()
+    built = time.perf_counter()
+    workbook.save(io.BytesIO())
+    saved = time.perf_counter()
+    if profiler:
+        print(f"\n--- {writer.__name__} (top 10 by total time) ---")
+        pstats.Stats(profiler).sort_stats('tottime').print_stats(10)
+    return (built - start) / len(rows) * 1_000_000, (saved - built) / len(rows) * 1_000_000
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile per-row cost of Excel tower sheets')
+    parser.add_argument('--scale', type=int, default=30, help='seasons of synthetic donations')
+    parser.add_argument('--profile', action='store_true', help='print cProfile output for each writer')
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.scale)
+    legacy = run(legacy_tower_sheet, rows, args.profile)
+    current = run(current_tower_sheet, rows, args.profile)
+
+    print("=" * 60)
+    print(f"TOWER SHEET PER-ROW COST ({len(rows)} rows, 12 columns)")
+    print("=" * 60)
+    print(f"{'':28} {'build':>10} {'save':>10} {'total':>10}")
+    print(f"{'cell-by-cell (before)':28} {legacy[0]:8.1f}us {legacy[1]:8.1f}us {sum(legacy):8.1f}us")
+    print(f"{'append + named styles':28} {current[0]:8.1f}us {current[1]:8.1f}us {sum(current):8.1f}us")
+    print(f"Build speed-up: {legacy[0] / current[0]:.1f}x, overall: {sum(legacy) / sum(current):.1f}x")
+
+if __name__ == "__main__":
+    main()
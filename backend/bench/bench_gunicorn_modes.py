@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Load-test comparison of gunicorn worker classes
+
+Fills a throwaway SQLite database with --scale synthetic seasons
+(bench/synthetic.py), then for each worker class starts gunicorn
+with gunicorn.conf.py and drives it with concurrent keep-alive clients for a
+fixed time. The request mix follows a collector's session: apartment grid
+reads, stats, recording donations and the occasional login. Reports
+throughput, latency percentiles and errors per mode.
+
+gevent is skipped when the gevent package is not installed.
+
+Usage:
+    python bench/bench_gunicorn_modes.py [--modes sync,gthread,gevent] [--workers 2]
+        [--threads 4] [--concurrency 32] [--duration 10] [--scale 1]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Use a throwaway database so the benchmark never touches real data
+_db_dir = tempfile.mkdtemp(prefix='bench_gunicorn_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+os.environ['RATE_LIMIT_ENABLED'] = 'false'
+os.environ['BCRYPT_LOG_ROUNDS'] = '10'
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the backend directory to Python path
+sys.path.append(BACKEND_DIR)
+
+from app import app, db
+from synthetic import PASSWORD, collector_email, generate
+
+# The load comes from tower A's collector
+TOWER = 1
+EMAIL = collector_email(TOWER)
+
+def request_mix(token):
+    """Weighted (method, path, body, headers) choices for one collector session"""
+    auth = {'Authorization': f'Bearer {token}'}
+    reads = [
+        ('GET', f'/api/v1/donations/apartments/status?tower={TOWER}', None, auth),
+        ('GET', '/api/v1/stats', None, auth),
+        ('GET', '/api/v1/stats/today', None, auth),
+    ]
+    write = ('POST', f'/api/v1/donations/apartment/{TOWER}/{{floor}}/{{unit}}',
+             {'donor_name': 'Load test', 'amount': 501, 'status': 'completed'}, auth)
+    login = ('POST', '/api/v1/auth/login', {'email': EMAIL, 'password': PASSWORD}, {})
+    return [reads[0]] * 4 + [reads[1]] * 2 + [reads[2]] * 2 + [write, login]
+
+def start_server(mode, port, workers, threads):
+    env = dict(os.environ)
+    env.update({
+        'GUNICORN_WORKER_CLASS': mode,
+        'GUNICORN_BIND': f'127.0.0.1:{port}',
+        'GUNICORN_WORKERS': str(workers),
+        'GUNICORN_THREADS': str(threads),
+    })
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', 'app:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            conn.request('GET', '/health')
+            if conn.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f'gunicorn ({mode}) did not start')
+
+def login(port):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    conn.request('POST', '/api/v1/auth/login', json.dumps({'email': EMAIL, 'password': PASSWORD}),
+                 {'Content-Type': 'application/json'})
+    return json.loads(conn.getresponse().read())['token']
+
+def client_loop(port, mix, stop_at, seed_value):
+    """One keep-alive client; returns (latencies, errors)"""
+    rng = random.Random(seed_value)
+    latencies, errors = [], 0
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    while time.monotonic() < stop_at:
+        method, path, body, headers = rng.choice(mix)
+        path = path.format(floor=rng.randint(1, 14), unit=rng.randint(1, 4))
+        payload = json.dumps(body) if body is not None else None
+        headers = dict(headers, **({'Content-Type': 'application/json'} if payload else {}))
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, payload, headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 400:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    conn.close()
+    return latencies, errors
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+def run_mode(mode, port, args):
+    process = start_server(mode, port, args.workers, args.threads)
+    try:
+        mix = request_mix(login(port))
+        stop_at = time.monotonic() + args.duration
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            results = list(executor.map(
+                lambda i: client_loop(port, mix, stop_at, i), range(args.concurrency)
+            ))
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    latencies = sorted(latency for samples, _ in results for latency in samples)
+    errors = sum(errors for _, errors in results)
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / args.duration,
+        'p50': percentile(latencies, 0.50) * 1000,
+        'p95': percentile(latencies, 0.95) * 1000,
+        'p99': percentile(latencies, 0.99) * 1000,
+        'errors': errors,
+    }
+
+def gevent_installed():
+    try:
+        import gevent  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare gunicorn worker classes under load')
+    parser.add_argument('--modes', default='sync,gthread,gevent', help='comma separated worker classes')
+    parser.add_argument('--workers', type=int, default=2, help='worker processes per mode')
+    parser.add_argument('--threads', type=int, default=4, help='threads per gthread worker')
+    parser.add_argument('--concurrency', type=int, default=32, help='concurrent clients')
+    parser.add_argument('--duration', type=float, default=10, help='seconds per mode')
+    parser.add_argument('--scale', type=int, default=1, help='seasons of synthetic donations')
+    parser.add_argument('--port', type=int, default=5055)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        generate(args.scale)
+
+    print("=" * 60)
+    print(f"GUNICORN WORKER CLASSES: {args.workers} workers, {args.concurrency} clients, "
+          f"{args.duration:g}s each, {os.cpu_count()} CPUs")
+    print("=" * 60)
+    print(f"{'mode':>8}  {'req/s':>8}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'errors':>6}")
+    for mode in args.modes.split(','):
+        if mode == 'gevent' and not gevent_installed():
+            print(f"{mode:>8}  skipped (pip install gevent)")
+            continue
+        result = run_mode(mode, args.port, args)
+        print(f"{mode:>8}  {result['rps']:8.1f}  {result['p50']:6.1f}ms  {result['p95']:6.1f}ms  "
+              f"{result['p99']:6.1f}ms  {result['errors']:6d}")
+
+if __name__ == "__main__":
+    main()
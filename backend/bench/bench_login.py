@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of login latency at several bcrypt cost settings
+
+Measures the raw bcrypt check and a full POST /api/v1/auth/login round trip
+(against a throwaway SQLite database holding one synthetic season,
+bench/synthetic.py) for each cost, so BCRYPT_LOG_ROUNDS can be picked to
+match the gunicorn worker count.
+
+Usage:
+    python bench/bench_login.py [--rounds 8 10 12] [--iterations 20]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Use a throwaway database so the benchmark never touches real data
+_db_dir = tempfile.mkdtemp(prefix='bench_login_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+# Every timed login comes from 127.0.0.1
+os.environ['RATE_LIMIT_ENABLED'] = 'false'
+
+# Add the backend directory to Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bcrypt
+from app import app, db
+from models import User
+from auth import auth_service
+from synthetic import PASSWORD, collector_email, generate
+
+def _summarize(samples):
+    """Return (mean, p95) in milliseconds"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return statistics.mean(ordered) * 1000, p95 * 1000
+
+def bench_checkpw(rounds, iterations):
+    """Time bcrypt.checkpw for a hash of the given cost"""
+    password_hash = bcrypt.hashpw(PASSWORD.encode('utf-8'), bcrypt.gensalt(rounds=rounds))
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        bcrypt.checkpw(PASSWORD.encode('utf-8'), password_hash)
+        samples.append(time.perf_counter() - start)
+    return _summarize(samples)
+
+def bench_login(client, rounds, iterations):
+    """Time a full login request for a collector whose hash has the given cost"""
+    email = collector_email(1)
+    with app.app_context():
+        # Matching the configured cost, so the login does not rehash the password
+        app.config['BCRYPT_LOG_ROUNDS'] = rounds
+        user = User.query.filter_by(email=email).one()
+        user.password_hash = auth_service.hash_password(PASSWORD, rounds=rounds)
+        db.session.commit()
+
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.post('/api/v1/auth/login', json={'email': email, 'password': PASSWORD})
+        samples.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"Login failed with status {response.status_code}: {response.get_json()}")
+    return _summarize(samples)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark login latency per bcrypt cost')
+    parser.add_argument('--rounds', type=int, nargs='+', default=[8, 10, 11, 12, 13])
+    parser.add_argument('--iterations', type=int, default=10)
+    args = parser.parse_args()
+
+    with app.app_context():
+        db.create_all()
+        generate()
+    client = app.test_client()
+
+    print("=" * 72)
+    print("LOGIN LATENCY BY BCRYPT COST")
+    print("=" * 72)
+    print(f"{'Cost':>4}  {'checkpw mean':>13}  {'checkpw p95':>12}  {'login mean':>11}  {'login p95':>10}  {'logins/s/core':>13}")
+    for rounds in args.rounds:
+        check_mean, check_p95 = bench_checkpw(rounds, args.iterations)
+        login_mean, login_p95 = bench_login(client, rounds, args.iterations)
+        print(f"{rounds:>4}  {check_mean:>10.1f} ms  {check_p95:>9.1f} ms  {login_mean:>8.1f} ms  {login_p95:>7.1f} ms  {1000 / login_mean:>13.1f}")
+
+    print()
+    print("Peak logins/s is roughly logins/s/core x min(CPU cores, BCRYPT_MAX_WORKERS x gunicorn workers).")
+
+if __name__ == "__main__":
+    main()
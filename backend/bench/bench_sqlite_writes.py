@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Concurrency stress test of SQLite donation writes, stock settings vs the SQLite profile
+
+Many threads record donations at once through the API (each with its own
+test client, sharing one engine) while others read the stats, against a
+fresh SQLite file per run holding --scale synthetic seasons
+(bench/synthetic.py). The stock run clears every SQLITE_* setting
+(rollback journal, synchronous=FULL, pysqlite's 5s lock wait); the tuned run
+uses the configured profile (WAL, synchronous=NORMAL, busy_timeout, mmap and
+cache size). Each run is a separate process, since the settings are read at
+import. Reports throughput, latency and failed writes ("database is locked").
+
+Usage:
+    python bench/bench_sqlite_writes.py [--writers 16] [--readers 4] [--writes 50] [--scale 1]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_FILE = os.path.abspath(__file__)
+PROFILE_KEYS = ['SQLITE_JOURNAL_MODE', 'SQLITE_SYNCHRONOUS', 'SQLITE_BUSY_TIMEOUT_MS',
+                'SQLITE_MMAP_SIZE', 'SQLITE_CACHE_SIZE_KB']
+
+def run_workload(args):
+    """Seed and hammer one database; runs in a child process and prints a JSON result"""
+    # Add the backend directory to Python path
+    sys.path.append(os.path.dirname(os.path.dirname(BENCH_FILE)))
+    from app import app, db
+    from synthetic import ADMIN_EMAIL, PASSWORD, generate
+
+    with app.app_context():
+        db.create_all()
+        generate(args.scale)
+        journal_mode = db.session.execute(db.text('PRAGMA journal_mode')).scalar()
+
+    token = app.test_client().post('/api/v1/auth/login', json={'email': ADMIN_EMAIL, 'password': PASSWORD}).get_json()['token']
+    headers = {'Authorization': f'Bearer {token}'}
+    barrier = threading.Barrier(args.writers + args.readers)
+    stop = threading.Event()
+    lock = threading.Lock()
+    latencies, failures, reads = [], [], [0]
+
+    def writer(index):
+        client = app.test_client()
+        barrier.wait()
+        for i in range(args.writes):
+            tower = index % 10 + 1
+            floor = i % 14 + 1
+            start = time.perf_counter()
+            response = client.post(f'/api/v1/donations/apartment/{tower}/{floor}/{index % 4 + 1}', headers=headers,
+                                   json={'donor_name': f'Writer {index}', 'amount': 1100, 'status': 'completed'})
+            elapsed = time.perf_counter() - start
+            with lock:
+                if response.status_code == 201:
+                    latencies.append(elapsed)
+                else:
+                    failures.append((response.get_json() or {}).get('error', str(response.status_code)))
+
+    def reader():
+        client = app.test_client()
+        barrier.wait()
+        while not stop.is_set():
+            client.get('/api/v1/stats/today', headers=headers)
+            with lock:
+                reads[0] += 1
+
+    writers = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+    start = time.perf_counter()
+    for thread in writers + readers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    ordered = sorted(latencies)
+    locked = sum(1 for error in failures if 'locked' in error)
+    print(json.dumps({
+        'journal_mode': journal_mode,
+        'writes': len(ordered),
+        'failed': len(failures),
+        'locked': locked,
+        'reads': reads[0],
+        'writes_per_s': len(ordered) / elapsed,
+        'p50': ordered[len(ordered) // 2] * 1000 if ordered else 0,
+        'p99': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000 if ordered else 0,
+    }))
+
+def spawn_run(tuned, args):
+    """Run the workload in a fresh process against a fresh database file"""
+    env = dict(os.environ)
+    env['DATABASE_URL'] = f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='bench_sqlite_'), 'bench.db')}"
+    env.setdefault('LOG_LEVEL', 'ERROR')
+    env['BCRYPT_LOG_ROUNDS'] = '4'
+    # Allow one pooled connection per thread
+    env['DB_POOL_SIZE'] = str(args.writers + args.readers)
+    if not tuned:
+        for key in PROFILE_KEYS:
+            env[key] = ''
+    command = [sys.executable, BENCH_FILE, '--child', '--writers', str(args.writers),
+               '--readers', str(args.readers), '--writes', str(args.writes), '--scale', str(args.scale)]
+    output = subprocess.run(command, env=env, capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress concurrent SQLite donation writes')
+    parser.add_argument('--writers', type=int, default=16, help='threads recording donations')
+    parser.add_argument('--readers', type=int, default=4, help='threads reading stats meanwhile')
+    parser.add_argument('--writes', type=int, default=50, help='donations per writer thread')
+    parser.add_argument('--scale', type=int, default=1, help='seasons of synthetic donations to start from')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_workload(args)
+        return
+
+    print("=" * 60)
+    print(f"SQLITE CONCURRENT WRITES: {args.writers} writers x {args.writes} donations, {args.readers} readers")
+    print("=" * 60)
+    print(f"{'settings':>8}  {'journal':>7}  {'writes/s':>8}  {'p50':>8}  {'p99':>9}  {'failed':>6}  {'locked':>6}  {'reads':>6}")
+    for tuned in (False, True):
+        result = spawn_run(tuned, args)
+        print(f"{'profile' if tuned else 'stock':>8}  {result['journal_mode']:>7}  {result['writes_per_s']:8.1f}  "
+              f"{result['p50']:6.1f}ms  {result['p99']:7.1f}ms  {result['failed']:6d}  {result['locked']:6d}  {result['reads']:6d}")
+
+if __name__ == "__main__":
+    main()
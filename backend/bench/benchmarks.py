@@ -0,0 +1,69 @@
+"""
+Benchmarks of the hot API paths at 1x, 10x and 100x a season of data
+
+Run from the backend directory:
+    pytest bench [--bench-scales 1,10] [-k stats]
+
+Each run is saved under bench/results/ (see conftest.py). /stats and
+/stats/today query the database on every call; the collector leaderboard is
+cached per worker, so it is timed both cold (cache cleared before every
+round) and warm. Writes run last so they do not change the data the reads are timed against.
+"""
+
+from routes import stats_cache
+from synthetic import PASSWORD, collector_email
+
+def _get(client, url, headers):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response
+
+def test_donations_first_page(benchmark, client, admin_headers):
+    response = benchmark(_get, client, '/api/v1/donations?page=1&page_size=20', admin_headers)
+    assert len(response.get_json()) == 20
+
+def test_donations_deep_page(benchmark, client, admin_headers, dataset):
+    last_page = dataset['donations'] // 100
+    response = benchmark(_get, client, f'/api/v1/donations?page={last_page}&page_size=100', admin_headers)
+    assert len(response.get_json()) == 100
+
+def test_stats(benchmark, client, admin_headers):
+    response = benchmark(_get, client, '/api/v1/stats', admin_headers)
+    assert response.get_json()['total_donations'] > 0
+
+def test_stats_today(benchmark, client, admin_headers):
+    response = benchmark(_get, client, '/api/v1/stats/today', admin_headers)
+    assert response.get_json()['total_donations'] > 0
+
+def test_collector_stats_cold(benchmark, client, admin_headers):
+    response = benchmark.pedantic(_get, args=(client, '/api/v1/stats/collectors', admin_headers),
+                                  setup=stats_cache.clear, rounds=20, warmup_rounds=1)
+    assert response.get_json()
+
+def test_collector_stats_cached(benchmark, client, admin_headers):
+    response = benchmark(_get, client, '/api/v1/stats/collectors', admin_headers)
+    assert response.get_json()
+
+def test_excel_export(benchmark, client, admin_headers):
+    response = benchmark.pedantic(_get, args=(client, '/api/v1/export/excel', admin_headers),
+                                  rounds=3, iterations=1)
+    assert response.data[:2] == b'PK'
+
+def test_login(benchmark, client):
+    def login():
+        response = client.post('/api/v1/auth/login', json={'email': collector_email(1), 'password': PASSWORD})
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+    benchmark(login)
+
+def test_apartment_write(benchmark, client, collector_headers):
+    units = iter(range(10**6))
+
+    def record_donation():
+        unit = next(units) % 4 + 1
+        response = client.post(f'/api/v1/donations/apartment/1/1/{unit}', headers=collector_headers, json={
+            'donor_name': 'Bench donor', 'amount': 1100, 'status': 'completed', 'payment_method': 'upi-self',
+        })
+        assert response.status_code == 201, response.get_data(as_text=True)
+
+    benchmark(record_donation)
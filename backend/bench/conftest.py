@@ -0,0 +1,82 @@
+"""
+Fixtures for the pytest-benchmark suite (bench/benchmarks.py)
+
+Each benchmark runs against a throwaway SQLite database filled by
+bench/synthetic.py at every scale in --bench-scales (default 1,10,100
+seasons). Results are saved as JSON under bench/results/ on every run, named
+after the commit, so two commits can be compared with:
+
+    pytest-benchmark --storage bench/results compare 0001 0002 --group-by=name
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+from pytest_benchmark.utils import get_tag
+
+# Use a throwaway database and cheap password hashing before the app is imported
+_db_dir = tempfile.mkdtemp(prefix='bench_suite_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
+os.environ['RATE_LIMIT_ENABLED'] = 'false'
+os.environ.setdefault('BCRYPT_LOG_ROUNDS', '10')
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+# Add the backend directory to Python path
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.dirname(BENCH_DIR))
+
+from app import app as flask_app
+from auth import auth_service
+from excel_export import tower_sheet_cache
+from models import db, User
+from routes import stats_cache
+from synthetic import ADMIN_EMAIL, collector_email, generate
+
+def pytest_addoption(parser):
+    parser.addoption('--bench-scales', default='1,10,100',
+                     help='comma separated dataset sizes, in seasons (default: 1,10,100)')
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_configure(config):
+    # Keep every run's JSON next to the suite, whatever directory pytest was started from
+    if config.option.benchmark_storage == 'file://./.benchmarks':
+        config.option.benchmark_storage = f"file://{os.path.join(BENCH_DIR, 'results')}"
+    if not config.option.benchmark_save and not config.option.benchmark_autosave:
+        config.option.benchmark_autosave = get_tag()
+
+def pytest_generate_tests(metafunc):
+    if 'dataset' in metafunc.fixturenames:
+        scales = [int(scale) for scale in metafunc.config.getoption('bench_scales').split(',')]
+        metafunc.parametrize('dataset', scales, indirect=True, ids=[f'x{scale}' for scale in scales], scope='session')
+
+@pytest.fixture(scope='session')
+def dataset(request):
+    """Rebuild the database at the requested scale; return generate()'s counts"""
+    with flask_app.app_context():
+        db.drop_all()
+        db.create_all()
+        counts = generate(request.param)
+        stats_cache.clear()
+        tower_sheet_cache.clear()
+        yield counts
+        db.session.remove()
+
+@pytest.fixture
+def client(dataset):
+    with flask_app.app_context():
+        yield flask_app.test_client()
+
+def _auth_headers(email):
+    user = User.query.filter_by(email=email).one()
+    token = auth_service.generate_token(user.id, user.email, auth_service.serialize_roles(user.user_roles))
+    return {'Authorization': f'Bearer {token}'}
+
+@pytest.fixture
+def admin_headers(client):
+    return _auth_headers(ADMIN_EMAIL)
+
+@pytest.fixture
+def collector_headers(client):
+    return _auth_headers(collector_email(1))
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+HTTP load test of the collector workflow against gunicorn
+
+Fills a throwaway database with bench/synthetic.py, starts gunicorn with
+gunicorn.conf.py and runs --users virtual collectors on an asyncio client
+with keep-alive connections. Each collector follows the app's flow: log in,
+open the form (sponsorships and layout), load the tower grid, then for each
+visit look up the floor and record a donation, refreshing the dashboard
+(stats and today's stats) every few visits; after --visits visits it logs
+in again. Collectors are spread over the towers.
+
+The database is SQLite by default. With --database postgres a local
+PostgreSQL cluster is created in a temp directory (initdb and pg_ctl must be
+on PATH), or --postgres-url points at an existing database, whose tables are
+DROPPED and re-created.
+
+Reports requests per second and latency percentiles per endpoint. --save
+writes them as JSON; --baseline compares against a saved run and exits 1
+when an endpoint's p95/p99 or the overall throughput regressed by more than
+--tolerance, or when errors appear.
+
+Usage:
+    python bench/loadtest.py [--users 50] [--duration 30] [--scale 10]
+        [--database sqlite|postgres] [--postgres-url URL] [--workers 2] [--threads 4]
+        [--save run.json] [--baseline run.json] [--tolerance 0.2]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+# Every collector logs in from 127.0.0.1
+os.environ['RATE_LIMIT_ENABLED'] = 'false'
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the backend directory to Python path
+sys.path.append(BACKEND_DIR)
+
+from synthetic import PASSWORD, collector_email
+
+HOST = '127.0.0.1'
+
+# Latencies within this many milliseconds of the baseline are never a regression
+MIN_REGRESSION_MS = 5.0
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client connection on asyncio streams"""
+
+    def __init__(self, port):
+        self.port = port
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None, token=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(HOST, self.port)
+        payload = json.dumps(body).encode() if body is not None else b''
+        head = [f'{method} {path} HTTP/1.1', f'Host: {HOST}:{self.port}', f'Content-Length: {len(payload)}']
+        if body is not None:
+            head.append('Content-Type: application/json')
+        if token:
+            head.append(f'Authorization: Bearer {token}')
+        self.writer.write(('\r\n'.join(head) + '\r\n\r\n').encode() + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('server closed the connection')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            data = b''.join(chunks)
+        elif 'content-length' in headers:
+            data = await self.reader.readexactly(int(headers['content-length']))
+        else:
+            data = await self.reader.read()
+            headers['connection'] = 'close'
+
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, data
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+class Recorder:
+    """Latency samples and errors per endpoint, kept only inside the measurement window"""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+        self.measure_from = self.measure_until = None
+
+    def measuring(self, started_at):
+        return self.measure_from is not None and self.measure_from <= started_at < self.measure_until
+
+    async def call(self, conn, name, method, path, body=None, token=None, expect=(200, 201)):
+        started_at = time.monotonic()
+        try:
+            status, data = await conn.request(method, path, body, token)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+            conn.close()
+            status, data = None, b''
+        if self.measuring(started_at):
+            if status in expect:
+                self.latencies.setdefault(name, []).append(time.monotonic() - started_at)
+            else:
+                self.errors[name] = self.errors.get(name, 0) + 1
+        if status not in expect:
+            return None
+        return json.loads(data) if data else {}
+
+async def collector(recorder, port, tower, visits, think, stop_at, rng):
+    """One virtual collector working through their tower until stop_at"""
+    conn = Connection(port)
+
+    async def pause():
+        if think:
+            await asyncio.sleep(rng.uniform(0, 2 * think))
+
+    try:
+        while time.monotonic() < stop_at:
+            login = await recorder.call(conn, 'login', 'POST', '/api/v1/auth/login',
+                                        {'email': collector_email(tower), 'password': PASSWORD})
+            if login is None:
+                await asyncio.sleep(1)
+                continue
+            token = login['token']
+
+            # Open the form: sponsorship choices and the building grid
+            await recorder.call(conn, 'sponsorships', 'GET', '/api/v1/sponsorships', token=token)
+            layout = await recorder.call(conn, 'layout', 'GET', '/api/v1/layout', token=token)
+            await recorder.call(conn, 'apartment status', 'GET', f'/api/v1/donations/apartments/status?tower={tower}',
+                                token=token)
+            if layout is None:
+                continue
+            shape = next(item for item in layout['towers'] if item['tower'] == tower)
+            excluded = set(layout['excluded'])
+
+            for visit in range(visits):
+                if time.monotonic() >= stop_at:
+                    break
+                await pause()
+                floor = rng.randint(1, shape['floors'])
+                units = [unit for unit in range(1, shape['units_per_floor'] + 1)
+                         if f"{shape['name']}{floor}{unit:02d}" not in excluded]
+                if not units:
+                    continue
+                await recorder.call(conn, 'apartment lookup', 'POST', '/api/v1/donations/apartments/lookup',
+                                    {'apartments': [[tower, floor, unit] for unit in units]}, token=token)
+                await pause()
+                await recorder.call(conn, 'create donation', 'POST',
+                                    f'/api/v1/donations/apartment/{tower}/{floor}/{rng.choice(units)}', {
+                                        'donor_name': 'Load test donor',
+                                        'amount': rng.choice([501, 1001, 1100, 2100]),
+                                        'status': 'completed',
+                                        'payment_method': 'upi-self',
+                                    }, token=token)
+                if visit % 3 == 2:
+                    await recorder.call(conn, 'stats', 'GET', '/api/v1/stats', token=token)
+                    await recorder.call(conn, 'stats today', 'GET', '/api/v1/stats/today', token=token)
+    finally:
+        conn.close()
+
+async def run_load(port, towers, args):
+    recorder = Recorder()
+    rng = random.Random(args.seed)
+    now = time.monotonic()
+    recorder.measure_from = now + args.ramp_up
+    recorder.measure_until = recorder.measure_from + args.duration
+
+    async def start(i):
+        # Collectors arrive spread over the ramp-up, so they don't all log in at once
+        await asyncio.sleep(args.ramp_up * i / args.users)
+        await collector(recorder, port, towers[i % len(towers)], args.visits, args.think,
+                        recorder.measure_until, random.Random(rng.random()))
+
+    await asyncio.gather(*(start(i) for i in range(args.users)))
+    return recorder
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+def summarize(samples, errors, duration):
+    ordered = sorted(samples)
+    return {
+        'requests': len(ordered),
+        'rps': round(len(ordered) / duration, 2),
+        'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        'errors': errors,
+    }
+
+def report(recorder, args):
+    names = sorted(set(recorder.latencies) | set(recorder.errors))
+    endpoints = {
+        name: summarize(recorder.latencies.get(name, []), recorder.errors.get(name, 0), args.duration)
+        for name in names
+    }
+    total = summarize([latency for samples in recorder.latencies.values() for latency in samples],
+                      sum(recorder.errors.values()), args.duration)
+    return {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'cpus': os.cpu_count(),
+            'database': args.database,
+            'users': args.users,
+            'duration': args.duration,
+            'scale': args.scale,
+            'workers': args.workers,
+            'threads': args.threads,
+            'worker_class': args.worker_class,
+            'think': args.think,
+        },
+        'endpoints': endpoints,
+        'total': total,
+    }
+
+def print_report(result):
+    meta = result['meta']
+    print("=" * 60)
+    print(f"LOAD TEST: {meta['users']} collectors, {meta['duration']:g}s, {meta['database']} x{meta['scale']}, "
+          f"{meta['workers']} {meta['worker_class']} workers, {meta['cpus']} CPUs")
+    print("=" * 60)
+    print(f"{'endpoint':18}  {'req':>6}  {'req/s':>7}  {'p50':>8}  {'p95':>8}  {'p99':>8}  {'max':>8}  {'errors':>6}")
+    rows = list(result['endpoints'].items()) + [('TOTAL', result['total'])]
+    for name, stats in rows:
+        print(f"{name:18}  {stats['requests']:6d}  {stats['rps']:7.1f}  {stats['p50_ms']:6.1f}ms  "
+              f"{stats['p95_ms']:6.1f}ms  {stats['p99_ms']:6.1f}ms  {stats['max_ms']:6.1f}ms  {stats['errors']:6d}")
+
+def find_regressions(result, baseline, tolerance):
+    """Human-readable regressions of result against a saved baseline run"""
+    regressions = []
+    for name, stats in result['endpoints'].items():
+        before = baseline['endpoints'].get(name)
+        if before is None:
+            continue
+        for key in ('p95_ms', 'p99_ms'):
+            if stats[key] > before[key] * (1 + tolerance) and stats[key] - before[key] > MIN_REGRESSION_MS:
+                regressions.append(f"{name}: {key[:3]} {before[key]:.1f}ms -> {stats[key]:.1f}ms")
+        if stats['errors'] > before['errors']:
+            regressions.append(f"{name}: errors {before['errors']} -> {stats['errors']}")
+    before_rps, rps = baseline['total']['rps'], result['total']['rps']
+    if rps < before_rps * (1 - tolerance):
+        regressions.append(f"throughput: {before_rps:.1f} -> {rps:.1f} req/s")
+    return regressions
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def start_postgres(data_dir, port):
+    """initdb and start a throwaway local cluster; return its URL"""
+    for tool in ('initdb', 'pg_ctl'):
+        if shutil.which(tool) is None:
+            raise SystemExit(f'{tool} not found on PATH; install PostgreSQL or pass --postgres-url')
+    subprocess.run(['initdb', '-D', data_dir, '-U', 'postgres', '-A', 'trust'], check=True,
+                   stdout=subprocess.DEVNULL)
+    subprocess.run(['pg_ctl', '-D', data_dir, '-w', '-l', os.path.join(data_dir, 'server.log'), '-o',
+                    f'-p {port} -k {data_dir} -c listen_addresses={HOST} -c max_connections=200', 'start'],
+                   check=True, stdout=subprocess.DEVNULL)
+    return f'postgresql://postgres@{HOST}:{port}/postgres'
+
+def stop_postgres(data_dir):
+    subprocess.run(['pg_ctl', '-D', data_dir, '-m', 'fast', 'stop'], stdout=subprocess.DEVNULL)
+
+def seed(database_url, scale):
+    """Re-create the schema and fill it with synthetic data; return the towers"""
+    os.environ['DATABASE_URL'] = database_url
+    from app import app, db
+    from building_layout import get_layout
+    from synthetic import generate
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        counts = generate(scale)
+        towers = list(get_layout().towers)
+        db.engine.dispose()
+    return towers, counts
+
+def start_server(database_url, args):
+    env = dict(os.environ)
+    env.update({
+        'DATABASE_URL': database_url,
+        'GUNICORN_WORKER_CLASS': args.worker_class,
+        'GUNICORN_BIND': f'{HOST}:{args.port}',
+        'GUNICORN_WORKERS': str(args.workers),
+        'GUNICORN_THREADS': str(args.threads),
+    })
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '--config', 'gunicorn.conf.py', 'app:app'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('gunicorn exited during startup')
+        try:
+            status, _ = asyncio.run(Connection(args.port).request('GET', '/health/ready'))
+            if status == 200:
+                return process
+        except OSError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('gunicorn did not become ready')
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the collector workflow against gunicorn')
+    parser.add_argument('--users', type=int, default=50, help='concurrent virtual collectors')
+    parser.add_argument('--duration', type=float, default=30, help='measured seconds, after the ramp-up')
+    parser.add_argument('--ramp-up', type=float, default=5, help='seconds over which collectors arrive')
+    parser.add_argument('--visits', type=int, default=10, help='apartment visits per login')
+    parser.add_argument('--think', type=float, default=0, help='mean seconds between a collector\'s actions')
+    parser.add_argument('--scale', type=int, default=1, help='seasons of synthetic data to seed')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--database', choices=['sqlite', 'postgres'], default='sqlite')
+    parser.add_argument('--postgres-url', help='existing PostgreSQL database to use (its tables are dropped)')
+    parser.add_argument('--postgres-port', type=int, default=5499, help='port for the throwaway cluster')
+    parser.add_argument('--worker-class', default='gthread')
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--save', help='write the results as JSON to this file')
+    parser.add_argument('--baseline', help='JSON from an earlier --save to check for regressions')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed slowdown, e.g. 0.2 = 20%%')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='bench_loadtest_')
+    postgres_dir = None
+    try:
+        if args.database == 'sqlite':
+            database_url = f"sqlite:///{os.path.join(work_dir, 'loadtest.db')}"
+        elif args.postgres_url:
+            database_url = args.postgres_url
+        else:
+            postgres_dir = os.path.join(work_dir, 'pgdata')
+            database_url = start_postgres(postgres_dir, args.postgres_port)
+
+        towers, counts = seed(database_url, args.scale)
+        print(f"Seeded {counts['donations']} donations over {counts['apartments']} apartments")
+
+        process = start_server(database_url, args)
+        try:
+            recorder = asyncio.run(run_load(args.port, towers, args))
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+    finally:
+        if postgres_dir:
+            stop_postgres(postgres_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    result = report(recorder, args)
+    print_report(result)
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump(result, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(result, baseline, args.tolerance)
+        print("-" * 60)
+        print(f"Against {args.baseline} (commit {baseline['meta'].get('commit')}, tolerance {args.tolerance:.0%}):")
+        for line in regressions:
+            print(f"  REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print("  no regressions")
+
+if __name__ == "__main__":
+    main()
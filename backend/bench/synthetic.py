@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Synthetic donation data for benchmarks
+
+generate(scale) fills the current database with one admin, one collector per
+tower, the sponsorships from donation-plan.csv and a donation drive at
+scale x our season size. A season visits every apartment in the building
+layout once over the last ten days; about 15% are follow-ups that get a
+second visit and about 10% are skipped. Completed donations carry realistic
+amounts, head counts and payment details, and some book a sponsorship
+(respecting max_count). The data is deterministic for a given scale and seed.
+
+Usage (fills DATABASE_URL, which must be empty):
+    python bench/synthetic.py [--scale 10] [--seed 42]
+"""
+
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+from datetime import datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+# Add the backend directory to Python path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BACKEND_DIR)
+
+from building_layout import apartment_key, apartment_label
+
+PASSWORD = 'Welcome@123'
+ADMIN_EMAIL = 'admin@bench.example.com'
+
+# Puja drive: ten evenings of collection, the last one today (so /stats/today has data)
+DRIVE_DAYS = 10
+DRIVE_EVENING = time(17, 0)  # in DRIVE_TIMEZONE
+
+AMOUNTS = [501, 1001, 1100, 1500, 2001, 2100, 2500, 5001, 11000, 21000]
+AMOUNT_WEIGHTS = [10, 25, 20, 10, 8, 10, 5, 7, 3, 2]
+PAYMENT_METHODS = ['upi-self', 'upi-self', 'upi-self', 'cash', 'upi-other']
+NOTES = ['', '', '', 'Paid by UPI', 'Come back on Sunday', 'Receipt requested']
+
+def collector_email(tower):
+    return f'collector{tower}@bench.example.com'
+
+def _load_sponsorships():
+    with open(os.path.join(BACKEND_DIR, 'donation-plan.csv'), encoding='utf-8') as f:
+        return [
+            {'name': row['name'], 'amount': int(float(row['amount'])), 'max_count': int(row['max_count'])}
+            for row in csv.DictReader(f)
+        ]
+
+def _visit(rng, tower, floor, unit, user, status, created_at):
+    donation = {
+        'tower': tower,
+        'floor': floor,
+        'unit': unit,
+        'apartment_key': apartment_key(tower, floor, unit),
+        'donor_name': f"Resident {apartment_label(tower, floor, unit)}",
+        'amount': 0,
+        'status': status,
+        'user_id': user['id'],
+        'volunteer_name': user['name'],
+        'created_at': created_at,
+        'updated_at': created_at,
+    }
+    if status == 'completed':
+        donation.update({
+            'amount': rng.choices(AMOUNTS, AMOUNT_WEIGHTS)[0],
+            'phone_number': f"9{rng.randint(100000000, 999999999)}",
+            'head_count': rng.randint(1, 6),
+            'payment_method': rng.choice(PAYMENT_METHODS),
+            'notes': rng.choice(NOTES),
+        })
+        if donation['payment_method'] == 'upi-other':
+            donation['upi_other_person'] = f"Relative of {donation['donor_name']}"
+    elif status == 'follow-up':
+        donation['notes'] = 'Nobody home'
+    return donation
+
+def generate(scale=1, seed=42):
+    """Fill the (empty) database; return counts of what was created"""
+    from app import app, db
+    from auth import auth_service
+    from building_layout import get_layout
+    from models import Donation, Sponsorship, User, UserRole
+
+    rng = random.Random(seed)
+    layout = get_layout()
+    tz = ZoneInfo(app.config.get('DRIVE_TIMEZONE', 'Asia/Kolkata'))
+    first_evening = datetime.combine(datetime.now(tz).date() - timedelta(days=DRIVE_DAYS - 1), DRIVE_EVENING, tzinfo=tz)
+    drive_start = first_evening.astimezone(timezone.utc).replace(tzinfo=None)
+    password_hash = auth_service.hash_password(PASSWORD)
+
+    admin = User(email=ADMIN_EMAIL, name='Bench Admin', password_hash=password_hash)
+    db.session.add(admin)
+    db.session.flush()
+    db.session.add(UserRole(user_id=admin.id, role='admin', assigned_towers=json.dumps(list(layout.towers))))
+    collectors = {}
+    for tower in layout.towers:
+        user = User(email=collector_email(tower), name=f'Collector {chr(64 + tower)}', password_hash=password_hash)
+        db.session.add(user)
+        db.session.flush()
+        db.session.add(UserRole(user_id=user.id, role='collector', assigned_towers=json.dumps([tower])))
+        collectors[tower] = {'id': user.id, 'name': user.name}
+
+    sponsorships = _load_sponsorships()
+    for sponsorship in sponsorships:
+        sponsorship['booked'] = 0
+        sponsorship['is_closed'] = False
+        row = Sponsorship(**sponsorship)
+        db.session.add(row)
+        db.session.flush()
+        sponsorship['id'] = row.id
+
+    donations = []
+    for _ in range(scale):
+        for tower in layout.towers:
+            for floor in range(1, layout.floors[tower] + 1):
+                for unit in range(1, layout.units[tower] + 1):
+                    if not layout.contains(tower, floor, unit):
+                        continue
+                    day, minute = rng.randrange(DRIVE_DAYS), rng.randint(0, 240)
+                    visited_at = drive_start + timedelta(days=day, minutes=minute)
+                    status = rng.choices(['completed', 'follow-up', 'skipped'], [75, 15, 10])[0]
+                    donations.append(_visit(rng, tower, floor, unit, collectors[tower], status, visited_at))
+                    if status == 'follow-up':
+                        # Next evening, or later the same evening on the last day
+                        revisit_at = drive_start + timedelta(days=min(day + 1, DRIVE_DAYS - 1),
+                                                             minutes=minute + rng.randint(1, 90))
+                        donations.append(_visit(rng, tower, floor, unit, collectors[tower],
+                                                rng.choice(['completed', 'completed', 'skipped']), revisit_at))
+
+    # A few generous donors book a sponsorship instead of a plain amount
+    for donation in donations:
+        if donation['status'] != 'completed' or rng.random() >= 0.02:
+            continue
+        sponsorship = rng.choice(sponsorships)
+        if sponsorship['is_closed']:
+            continue
+        sponsorship['booked'] += 1
+        sponsorship['is_closed'] = sponsorship['booked'] >= sponsorship['max_count']
+        donation.update({
+            'amount': sponsorship['amount'],
+            'sponsorship': sponsorship['name'],
+            'sponsorship_id': sponsorship['id'],
+        })
+
+    db.session.bulk_update_mappings(Sponsorship, [
+        {'id': s['id'], 'booked': s['booked'], 'is_closed': s['is_closed']} for s in sponsorships
+    ])
+    db.session.bulk_insert_mappings(Donation, donations)
+    db.session.commit()
+    return {
+        'users': len(collectors) + 1,
+        'sponsorships': len(sponsorships),
+        'donations': len(donations),
+        'apartments': layout.total_apartments,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill the database with a synthetic donation drive')
+    parser.add_argument('--scale', type=int, default=1, help='multiple of one season')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    from app import app, db
+    with app.app_context():
+        db.create_all()
+        counts = generate(args.scale, args.seed)
+
+    print("=" * 60)
+    print(f"SYNTHETIC DRIVE x{args.scale}")
+    print("=" * 60)
+    for name, count in counts.items():
+        print(f"{name:14}: {count}")
+    print(f"Passwords are {PASSWORD!r}; admin is {ADMIN_EMAIL}")
+
+if __name__ == "__main__":
+    main()
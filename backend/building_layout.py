@@ -0,0 +1,194 @@
+"""
+Building layout for the donation drive
+
+Describes which apartments exist (towers, floors per tower, units per floor,
+excluded flats) and precomputes the apartment universe once at startup, so
+membership checks, totals and completion percentages are O(1) lookups.
+"""
+
+import json
+import re
+
+APARTMENT_LABEL = re.compile(r'^([A-Za-z])(\d+)(\d{2})$')
+
+def apartment_label(tower, floor, unit):
+    """Format an apartment the way the app displays it, e.g. tower 1 floor 14 unit 2 -> A1402"""
+    return f"{chr(64 + tower)}{floor}{unit:02d}"
+
+def apartment_key(tower, floor, unit):
+    """Compact integer identity of an apartment, e.g. tower 1 floor 14 unit 2 -> 11402"""
+    return tower * 10000 + floor * 100 + unit
+
+def split_apartment_key(key):
+    """Inverse of apartment_key: 11402 -> (1, 14, 2)"""
+    return key // 10000, key // 100 % 100, key % 100
+
+def parse_apartment(value):
+    """Parse "A1402" or "1-14-2" into a (tower, floor, unit) tuple"""
+    value = str(value).strip()
+    match = APARTMENT_LABEL.match(value)
+    if match:
+        letter, floor, unit = match.groups()
+        return ord(letter.upper()) - 64, int(floor), int(unit)
+    parts = value.split('-')
+    if len(parts) == 3:
+        return tuple(int(part) for part in parts)
+    raise ValueError(f'Invalid apartment {value!r}, expected e.g. "A1402" or "1-14-2"')
+
+def _parse_int_list(value):
+    """Parse "1,2,3" or "1-10" (or a list) into a sorted list of ints"""
+    if isinstance(value, (list, tuple)):
+        return sorted({int(item) for item in value})
+    numbers = set()
+    for part in str(value).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition('-')
+        numbers.update(range(int(start), int(end or start) + 1))
+    return sorted(numbers)
+
+def _parse_tower_map(value):
+    """Parse an int, a {tower: n} dict or "14" / "1:14,2:12" per-tower overrides"""
+    if isinstance(value, int):
+        return value, {}
+    if isinstance(value, dict):
+        return None, {int(tower): int(n) for tower, n in value.items()}
+    default, overrides = None, {}
+    for part in str(value).split(','):
+        part = part.strip()
+        if not part:
+            continue
+        tower, separator, n = part.partition(':')
+        if separator:
+            overrides[int(tower)] = int(n)
+        else:
+            default = int(tower)
+    return default, overrides
+
+class BuildingLayout:
+    """Apartment universe with O(1) membership and per-tower totals
+
+    Apartments are packed into a bytearray indexed by
+    ((tower - 1) * max_floors + (floor - 1)) * max_units + (unit - 1).
+    """
+
+    def __init__(self, towers, floors_per_tower=14, units_per_floor=4, excluded=()):
+        self.towers = _parse_int_list(towers)
+        if not self.towers:
+            raise ValueError('Building layout needs at least one tower')
+
+        default_floors, floor_overrides = _parse_tower_map(floors_per_tower)
+        default_units, unit_overrides = _parse_tower_map(units_per_floor)
+        self.floors = {tower: floor_overrides.get(tower, default_floors) for tower in self.towers}
+        self.units = {tower: unit_overrides.get(tower, default_units) for tower in self.towers}
+        for tower in self.towers:
+            if not self.floors[tower] or not self.units[tower]:
+                raise ValueError(f'Building layout has no floors/units configured for tower {tower}')
+
+        self.max_tower = max(self.towers)
+        self.max_floors = max(self.floors.values())
+        self.max_units = max(self.units.values())
+        if self.max_floors > 99 or self.max_units > 99:
+            raise ValueError('Building layout supports at most 99 floors and 99 units per floor')
+
+        self.excluded = sorted({
+            tuple(int(part) for part in flat) if isinstance(flat, (list, tuple)) else parse_apartment(flat)
+            for flat in excluded
+        })
+
+        # Precompute the universe and per-tower totals
+        self._universe = bytearray(self.max_tower * self.max_floors * self.max_units)
+        self._tower_totals = {}
+        for tower in self.towers:
+            for floor in range(1, self.floors[tower] + 1):
+                for unit in range(1, self.units[tower] + 1):
+                    self._universe[self._index(tower, floor, unit)] = 1
+        for tower, floor, unit in self.excluded:
+            if self.contains(tower, floor, unit):
+                self._universe[self._index(tower, floor, unit)] = 0
+        for tower in self.towers:
+            start = self._index(tower, 1, 1)
+            self._tower_totals[tower] = sum(self._universe[start:start + self.max_floors * self.max_units])
+        self.total_apartments = sum(self._tower_totals.values())
+
+    def _index(self, tower, floor, unit):
+        return ((tower - 1) * self.max_floors + (floor - 1)) * self.max_units + (unit - 1)
+
+    def contains(self, tower, floor, unit):
+        """Check whether an apartment exists in the building"""
+        if not (1 <= tower <= self.max_tower and 1 <= floor <= self.max_floors and 1 <= unit <= self.max_units):
+            return False
+        return self._universe[self._index(tower, floor, unit)] == 1
+
+    def tower_total(self, tower):
+        """Number of apartments in a tower (0 for unknown towers)"""
+        return self._tower_totals.get(tower, 0)
+
+    def remaining(self, visited, tower=None):
+        """Apartments not yet visited, overall or for one tower"""
+        total = self.total_apartments if tower is None else self.tower_total(tower)
+        return max(0, total - visited)
+
+    def completion(self, visited, tower=None):
+        """Completion percentage (0-100), overall or for one tower"""
+        total = self.total_apartments if tower is None else self.tower_total(tower)
+        return min(100.0, visited / total * 100) if total else 0.0
+
+    def to_dict(self):
+        """Serializable description for clients rendering the apartment grid"""
+        return {
+            'towers': [
+                {
+                    'tower': tower,
+                    'name': chr(64 + tower),
+                    'floors': self.floors[tower],
+                    'units_per_floor': self.units[tower],
+                    'total_apartments': self._tower_totals[tower]
+                }
+                for tower in self.towers
+            ],
+            'excluded': [apartment_label(*flat) for flat in self.excluded],
+            'total_apartments': self.total_apartments
+        }
+
+    @classmethod
+    def from_config(cls, config):
+        """Build the layout from BUILDING_LAYOUT_FILE (JSON) or the BUILDING_* settings"""
+        layout_file = config.get('BUILDING_LAYOUT_FILE')
+        if layout_file:
+            with open(layout_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return cls(
+                towers=data['towers'],
+                floors_per_tower=data.get('floors_per_tower', 14),
+                units_per_floor=data.get('units_per_floor', 4),
+                excluded=data.get('excluded', [])
+            )
+
+        excluded = config.get('BUILDING_EXCLUDED_FLATS', '')
+        if isinstance(excluded, str):
+            excluded = [flat for flat in excluded.split(',') if flat.strip()]
+        return cls(
+            towers=config.get('BUILDING_TOWERS', '1-10'),
+            floors_per_tower=config.get('BUILDING_FLOORS_PER_TOWER', 14),
+            units_per_floor=config.get('BUILDING_UNITS_PER_FLOOR', 4),
+            excluded=excluded
+        )
+
+# Default layout (towers A-J, 14 floors, 4 units) until init_app loads the configured one
+_building_layout = BuildingLayout(towers='1-10')
+
+def init_app(app):
+    """Load the configured building layout once at startup"""
+    global _building_layout
+    _building_layout = BuildingLayout.from_config(app.config)
+    app.logger.info(
+        "Building layout loaded: %d towers, %d apartments",
+        len(_building_layout.towers), _building_layout.total_apartments
+    )
+    return _building_layout
+
+def get_layout():
+    """Return the active building layout"""
+    return _building_layout
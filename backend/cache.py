@@ -0,0 +1,58 @@
+"""
+Small in-process caches used on the hot request paths
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+class TTLCache:
+    """Thread-safe, size-bounded LRU cache whose entries expire
+
+    Each entry carries its own expiry (a time.time() timestamp), so callers can
+    cap it by a fixed TTL or by something like a token's own exp claim.
+    """
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """Return a live entry (refreshing its LRU position) or default"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at <= time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, expires_at=None):
+        """Store a value until expires_at (defaults to now + ttl)"""
+        if self.maxsize <= 0:
+            return
+        default_expiry = time.time() + self.ttl
+        if expires_at is None or expires_at > default_expiry:
+            expires_at = default_expiry
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
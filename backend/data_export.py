@@ -0,0 +1,182 @@
+"""
+Raw donation exports (CSV, NDJSON and Parquet) streamed straight from the database
+
+Rows are read as plain tuples with yield_per, so only one batch is held in
+memory at a time (PostgreSQL uses a server-side cursor), and each batch is
+encoded and handed to the response before the next is fetched.
+
+Parquet needs pyarrow (in requirements.txt); without it the endpoint answers 501.
+"""
+
+import csv
+import io
+import json
+from datetime import datetime
+from models import Donation, db
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Optional dependency, only needed for Parquet exports
+    pa = None
+    pq = None
+
+# Exported columns, in order
+EXPORT_COLUMNS = [
+    Donation.id,
+    Donation.tower,
+    Donation.floor,
+    Donation.unit,
+    Donation.apartment_key,
+    Donation.donor_name,
+    Donation.amount,
+    Donation.status,
+    Donation.phone_number,
+    Donation.head_count,
+    Donation.upi_other_person,
+    Donation.sponsorship,
+    Donation.sponsorship_id,
+    Donation.payment_method,
+    Donation.notes,
+    Donation.user_id,
+    Donation.volunteer_name,
+    Donation.created_at,
+    Donation.updated_at,
+]
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+# Rows fetched from the cursor (and encoded) per batch
+EXPORT_BATCH_SIZE = 1000
+
+def iter_donation_batches(criteria=(), batch_size=EXPORT_BATCH_SIZE):
+    """Yield lists of donation row tuples matching criteria, ordered by id"""
+    query = db.session.query(*EXPORT_COLUMNS).filter(*criteria).order_by(Donation.id)
+    result = query.yield_per(batch_size)
+    batch = []
+    for row in result:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+def generate_csv(criteria=(), batch_size=EXPORT_BATCH_SIZE):
+    """Yield the export as CSV text, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for batch in iter_donation_batches(criteria, batch_size):
+        writer.writerows(
+            [value.isoformat() if isinstance(value, datetime) else value for value in row]
+            for row in batch
+        )
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    # Header only when nothing matched
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def generate_ndjson(criteria=(), batch_size=EXPORT_BATCH_SIZE):
+    """Yield the export as newline-delimited JSON, one chunk per batch"""
+    for batch in iter_donation_batches(criteria, batch_size):
+        yield ''.join(
+            json.dumps(dict(zip(EXPORT_FIELDS, row)), default=_json_default, ensure_ascii=False) + '\n'
+            for row in batch
+        )
+
+# Rows per Parquet row group; larger groups compress and scan better
+PARQUET_ROW_GROUP_SIZE = 50000
+
+def parquet_available():
+    return pa is not None
+
+def _parquet_schema():
+    """Typed Parquet columns; tower, status and sponsorship are dictionary encoded"""
+    timestamp = pa.timestamp('us', tz='UTC')  # created_at/updated_at are stored as naive UTC
+    types = {
+        'id': pa.int64(),
+        'tower': pa.dictionary(pa.int32(), pa.int16()),
+        'floor': pa.int16(),
+        'unit': pa.int16(),
+        'apartment_key': pa.int32(),
+        'donor_name': pa.string(),
+        'amount': pa.int64(),
+        'status': pa.dictionary(pa.int32(), pa.string()),
+        'phone_number': pa.string(),
+        'head_count': pa.int16(),
+        'upi_other_person': pa.string(),
+        'sponsorship': pa.dictionary(pa.int32(), pa.string()),
+        'sponsorship_id': pa.int32(),
+        'payment_method': pa.string(),
+        'notes': pa.string(),
+        'user_id': pa.int32(),
+        'volunteer_name': pa.string(),
+        'created_at': timestamp,
+        'updated_at': timestamp,
+    }
+    return pa.schema([(field, types[field]) for field in EXPORT_FIELDS])
+
+class _ChunkSink:
+    """Write-only file for ParquetWriter that hands written bytes back in chunks
+
+    tell() reports the total bytes written, so the offsets recorded in the
+    Parquet footer stay correct while earlier chunks are already sent.
+    """
+
+    def __init__(self):
+        self.closed = False
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def _parquet_table(rows, schema):
+    """Build an Arrow table (one row group) from donation row tuples"""
+    columns = list(zip(*rows))
+    arrays = []
+    for field, values in zip(schema, columns):
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(values, type=field.type.value_type).dictionary_encode())
+        else:
+            arrays.append(pa.array(values, type=field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def generate_parquet(criteria=(), row_group_size=PARQUET_ROW_GROUP_SIZE):
+    """Yield the export as a zstd-compressed Parquet file, one chunk per row group"""
+    if pa is None:
+        raise RuntimeError('Parquet export requires the pyarrow package')
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    try:
+        for batch in iter_donation_batches(criteria, row_group_size):
+            writer.write_table(_parquet_table(batch, schema), row_group_size=row_group_size)
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
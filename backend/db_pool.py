@@ -0,0 +1,212 @@
+"""
+Database engine options and connection-pool metrics
+
+engine_options() builds SQLALCHEMY_ENGINE_OPTIONS from the DB_* settings.
+Each gunicorn worker process has its own pool, so by default a worker keeps
+one connection per request thread, and DB_MAX_CONNECTIONS caps the total over
+all workers (workers x (pool_size + max_overflow)) to stay under the
+database's connection limit.
+
+Pools are TimedQueuePool instances, which record how long each checkout
+waited for a connection (pool_metrics).
+
+SQLite connections get the SQLITE_* PRAGMAs as they are opened
+(sqlite_profile): WAL journaling, synchronous=NORMAL, a busy timeout so
+concurrent writers wait instead of failing with "database is locked", and
+memory-mapped I/O plus a larger page cache for reads.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+# Checkouts waiting longer than this are logged (pool too small for the load)
+SLOW_CHECKOUT_SECONDS = 0.5
+
+class PoolMetrics:
+    """Process-wide connection checkout counters"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Callables taking (seconds, timed_out) for every checkout, e.g. metrics.py
+        self.observers = []
+        self.reset()
+
+    def reset(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.slow_checkouts = 0
+
+    def observe_checkout(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if seconds >= SLOW_CHECKOUT_SECONDS:
+                self.slow_checkouts += 1
+        for observer in self.observers:
+            observer(seconds, timed_out)
+        if seconds >= SLOW_CHECKOUT_SECONDS:
+            logger.warning("Waited %.0f ms for a database connection%s",
+                           seconds * 1000, ' (timed out)' if timed_out else '')
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def snapshot(self, pool=None):
+        """Counters plus, when a pool is given, its current occupancy"""
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            data = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'slow_checkouts': self.slow_checkouts,
+                'wait_ms_avg': round(self.wait_seconds_total / attempts * 1000, 3) if attempts else 0.0,
+                'wait_ms_max': round(self.wait_seconds_max * 1000, 3),
+            }
+        if isinstance(pool, QueuePool):
+            data.update({
+                'pool_size': pool.size(),
+                'max_overflow': pool._max_overflow,
+                'checked_out': pool.checkedout(),
+                'checked_in': pool.checkedin(),
+                'overflow': max(0, pool.overflow()),
+            })
+        return data
+
+pool_metrics = PoolMetrics()
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records the time spent waiting for (or opening) a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.observe_checkout(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.observe_checkout(time.perf_counter() - start)
+        return connection
+
+@event.listens_for(TimedQueuePool, 'connect')
+def _on_connect(dbapi_connection, connection_record):
+    pool_metrics.count('connects')
+
+@event.listens_for(TimedQueuePool, 'invalidate')
+def _on_invalidate(dbapi_connection, connection_record, exception):
+    pool_metrics.count('invalidations')
+
+def pool_sizing(workers, threads, pool_size=0, max_overflow=2, max_connections=0):
+    """Return (pool_size, max_overflow) per worker process
+
+    pool_size 0 means one connection per request thread. With max_connections
+    set, both are reduced so workers x (pool_size + max_overflow) fits.
+    """
+    workers = max(1, workers)
+    pool_size = pool_size or max(1, threads)
+    max_overflow = max(0, max_overflow)
+    if max_connections:
+        per_worker = max(1, max_connections // workers)
+        if pool_size + max_overflow > per_worker:
+            logger.warning(
+                "Database pool reduced to fit DB_MAX_CONNECTIONS=%d over %d workers "
+                "(%d + %d overflow -> %d per worker)",
+                max_connections, workers, pool_size, max_overflow, per_worker
+            )
+            pool_size = min(pool_size, per_worker)
+            max_overflow = per_worker - pool_size
+    return pool_size, max_overflow
+
+def engine_options(config, uri=None):
+    """Engine options for uri (default SQLALCHEMY_DATABASE_URI) from the DB_* settings"""
+    url = make_url(uri or config['SQLALCHEMY_DATABASE_URI'])
+    options = {
+        'pool_pre_ping': config['DB_POOL_PRE_PING'],
+        'pool_recycle': config['DB_POOL_RECYCLE'],
+    }
+
+    # In-memory SQLite gets a StaticPool from Flask-SQLAlchemy
+    if url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'):
+        return options
+
+    pool_size, max_overflow = pool_sizing(
+        config['GUNICORN_WORKERS'],
+        config['GUNICORN_THREADS'],
+        config['DB_POOL_SIZE'],
+        config['DB_MAX_OVERFLOW'],
+        config['DB_MAX_CONNECTIONS']
+    )
+    options.update({
+        'poolclass': TimedQueuePool,
+        'pool_size': pool_size,
+        'max_overflow': max_overflow,
+        'pool_timeout': config['DB_POOL_TIMEOUT'],
+    })
+
+    if url.get_backend_name() == 'postgresql':
+        connect_args = {'connect_timeout': config['DB_CONNECT_TIMEOUT']}
+        if config['DB_STATEMENT_TIMEOUT_MS']:
+            connect_args['options'] = f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"
+        options['connect_args'] = connect_args
+    return options
+
+class SQLiteProfile:
+    """PRAGMAs run on every new SQLite connection"""
+
+    # (config key, PRAGMA)
+    SETTINGS = [
+        ('SQLITE_BUSY_TIMEOUT_MS', 'busy_timeout'),
+        ('SQLITE_JOURNAL_MODE', 'journal_mode'),
+        ('SQLITE_SYNCHRONOUS', 'synchronous'),
+        ('SQLITE_MMAP_SIZE', 'mmap_size'),
+        ('SQLITE_CACHE_SIZE_KB', 'cache_size'),
+    ]
+
+    def __init__(self):
+        self.pragmas = []
+
+    def init_app(self, app):
+        pragmas = []
+        for key, pragma in self.SETTINGS:
+            value = str(app.config.get(key) or '').strip()
+            if not value:
+                continue
+            if pragma == 'cache_size':
+                value = str(-abs(int(value)))  # Negative sizes are in KiB rather than pages
+            elif not value.replace('-', '').isalnum():
+                raise ValueError(f'Invalid {key}: {value!r}')
+            pragmas.append((pragma, value))
+        self.pragmas = pragmas
+
+    def apply(self, dbapi_connection):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in self.pragmas:
+                cursor.execute(f'PRAGMA {pragma}={value}')
+        finally:
+            cursor.close()
+
+sqlite_profile = SQLiteProfile()
+
+@event.listens_for(Engine, 'connect')
+def _on_engine_connect(dbapi_connection, connection_record):
+    if sqlite_profile.pragmas and isinstance(dbapi_connection, sqlite3.Connection):
+        sqlite_profile.apply(dbapi_connection)
@@ -0,0 +1,120 @@
+"""
+Read-replica routing for reporting queries
+
+With DATABASE_REPLICA_URL set, the replica is registered as the "replica"
+bind. Views decorated with @read_replica (stats and exports) run their
+queries against it; every other view, and every flush, uses the primary.
+Results cached across requests are computed on the primary (on_primary).
+
+Read-your-writes: after a user's request commits changes, that user reads
+from the primary for DB_REPLICA_STICKY_SECONDS, long enough to cover
+replication lag. The worker remembers the write per user, and a cookie
+carries it to the other gunicorn workers.
+"""
+
+import time
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from cache import TTLCache
+
+REPLICA_BIND = 'replica'
+STICKY_COOKIE = 'db_primary_until'
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica when the view asked for it"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and self.info.get('use_replica') and not self._flushing:
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_write(session, flush_context):
+    session.info['wrote'] = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _record_write(session):
+    if session.info.pop('wrote', False) and has_request_context():
+        replica_router.record_write(getattr(request, 'user_id', None))
+
+@event.listens_for(RoutingSession, 'after_soft_rollback')
+def _forget_write(session, previous_transaction):
+    session.info.pop('wrote', None)
+
+class ReplicaRouter:
+    def __init__(self, app=None):
+        self.app = app
+        self.sticky_seconds = 10
+        self.recent_writers = TTLCache(maxsize=10000, ttl=self.sticky_seconds)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('DATABASE_REPLICA_URL', '')
+        app.config.setdefault('DB_REPLICA_STICKY_SECONDS', 10)
+
+        self.sticky_seconds = app.config['DB_REPLICA_STICKY_SECONDS']
+        self.recent_writers = TTLCache(maxsize=10000, ttl=self.sticky_seconds)
+        app.after_request(self._set_sticky_cookie)
+
+    @property
+    def enabled(self):
+        return bool(self.app and self.app.config['DATABASE_REPLICA_URL'])
+
+    def record_write(self, user_id):
+        """Pin this user (and this browser, via the cookie) to the primary for a while"""
+        until = time.time() + self.sticky_seconds
+        if user_id is not None:
+            self.recent_writers.set(user_id, until, expires_at=until)
+        g.db_primary_until = until
+
+    def recently_wrote(self):
+        """Whether the current user wrote within the sticky window"""
+        user_id = getattr(request, 'user_id', None)
+        if user_id is not None and self.recent_writers.get(user_id):
+            return True
+        try:
+            return float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def _set_sticky_cookie(self, response):
+        until = g.pop('db_primary_until', None)
+        if until is not None and self.enabled:
+            response.set_cookie(STICKY_COOKIE, f'{until:.3f}', max_age=self.sticky_seconds,
+                                httponly=True, samesite='Lax')
+        return response
+
+def read_replica(f):
+    """Decorator running the view's queries on the replica, unless the user just wrote"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if replica_router.enabled and not replica_router.recently_wrote():
+            current_app.extensions['sqlalchemy'].session.info['use_replica'] = True
+        return f(*args, **kwargs)
+
+    return decorated_function
+
+@contextmanager
+def on_primary():
+    """Run the enclosed queries on the primary, even inside a @read_replica view
+
+    For results that outlive the request (e.g. cached aggregates), which must
+    not be computed from a lagging replica.
+    """
+    info = current_app.extensions['sqlalchemy'].session.info
+    use_replica = info.pop('use_replica', False)
+    try:
+        yield
+    finally:
+        if use_replica:
+            info['use_replica'] = True
+
+# Initialize replica router
+replica_router = ReplicaRouter()
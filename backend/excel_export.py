@@ -1,367 +1,231 @@
 import io
 from datetime import datetime
+from itertools import groupby
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
 from models import Donation, Sponsorship, db
 from sqlalchemy import func
+from building_layout import get_layout
+from cache import TTLCache
+from excel_styles import SheetWriter, register_styles
+from excel_tower_sheets import (
+    AUTO_FILTER_REF, render_tower_sheet_xml, render_tower_sheets_parallel,
+    splice_sheets, tower_sheet_title, write_tower_sheet
+)
+
+# Rendered tower sheet XML for incremental exports: {tower: (version, xml)}.
+# A version is (row count, max id, max updated_at) of the tower's donations, so
+# inserts and edits change it through max id / updated_at and deletes through
+# the count; a sheet is reused only while its tower's version is unchanged.
+tower_sheet_cache = TTLCache(maxsize=128, ttl=24 * 3600)
 
 class ExcelExporter:
-    def __init__(self):
+    def __init__(self, workers=1, incremental=False):
         self.workbook = Workbook()
+        register_styles(self.workbook)
+        self.workers = max(1, workers or 1)
+        self.incremental = incremental
+        self.rendered_towers = []
+        self.reused_towers = []
+        self._tower_sheet_xml = {}
         self.ws = self.workbook.active
         self.ws.title = "Summary"
-        
-        # Define styles
-        self.header_font = Font(bold=True, color="FFFFFF")
-        self.header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        self.subheader_font = Font(bold=True, color="FFFFFF")
-        self.subheader_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        self.border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
+        self.layout = get_layout()
+        self._status_counts = None
 
     def create_metadata_sheet(self):
         """Create the metadata sheet with summary information"""
         # Get statistics
         stats = self._get_statistics()
+        sheet = SheetWriter(self.ws, max_width=50)
         
         # Title
-        self.ws['A1'] = "DONATION COLLECTION REPORT"
-        self.ws['A1'].font = Font(bold=True, size=16)
-        self.ws.merge_cells('A1:H1')
-        self.ws['A1'].alignment = Alignment(horizontal='center')
+        sheet.title("DONATION COLLECTION REPORT", 'report_title', 'H')
         
         # Metadata section
-        row = 3
-        self.ws[f'A{row}'] = "METADATA"
-        self.ws[f'A{row}'].font = self.header_font
-        self.ws[f'A{row}'].fill = self.header_fill
-        self.ws.merge_cells(f'A{row}:H{row}')
+        sheet.skip()
+        sheet.title("METADATA", 'section_header', 'H')
         
-        row += 1
         metadata_data = [
-            ["Exported At", datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-            ["Last Collection At", stats['last_collection_date']],
-            ["Towers Covered", stats['towers_covered']],
-            ["Total Donation Amount", stats['total_amount']],
-            ["Apartments Visited", stats['apartments_visited']],
-            ["Apartments For Follow Up", stats['apartments_follow_up']],
-            ["Apartments Remaining", stats['apartments_remaining']],
-            ["Total Apartments", stats['total_apartments']]
+            ["Exported At", datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 'cell'],
+            ["Last Collection At", stats['last_collection_date'], 'cell'],
+            ["Towers Covered", stats['towers_covered'], 'cell'],
+            ["Total Donation Amount", stats['total_amount'], 'amount_cell'],
+            ["Apartments Visited", stats['apartments_visited'], 'cell'],
+            ["Apartments For Follow Up", stats['apartments_follow_up'], 'cell'],
+            ["Apartments Remaining", stats['apartments_remaining'], 'cell'],
+            ["Total Apartments", stats['total_apartments'], 'cell']
         ]
-        
-        for label, value in metadata_data:
-            self.ws[f'A{row}'] = label
-            self.ws[f'B{row}'] = value
-            self.ws[f'A{row}'].font = Font(bold=True)
-            self.ws[f'A{row}'].border = self.border
-            self.ws[f'B{row}'].border = self.border
-            if label == "Total Donation Amount":
-                self.ws[f'B{row}'].number_format = '#,##0'
-            row += 1
+        for label, value, style in metadata_data:
+            sheet.append([label, value], ['label', style])
         
         # Summary by Tower
-        row += 1
-        self.ws[f'A{row}'] = "SUMMARY BY TOWER"
-        self.ws[f'A{row}'].font = self.header_font
-        self.ws[f'A{row}'].fill = self.header_fill
-        self.ws.merge_cells(f'A{row}:H{row}')
-        
-        row += 1
-        tower_headers = ["Tower", "Total Amount", "Donations", "Follow-ups", "Skipped", "Remaining", "Completion %"]
-        for col, header in enumerate(tower_headers, 1):
-            cell = self.ws[f'{get_column_letter(col)}{row}']
-            cell.value = header
-            cell.font = self.subheader_font
-            cell.fill = self.subheader_fill
-            cell.border = self.border
-            cell.alignment = Alignment(horizontal='center')
+        sheet.skip()
+        sheet.title("SUMMARY BY TOWER", 'section_header', 'H')
+        sheet.append(
+            ["Tower", "Total Amount", "Donations", "Follow-ups", "Skipped", "Remaining", "Completion %"],
+            'table_subheader'
+        )
         
-        row += 1
-        for tower in range(1, 11):  # Towers 1-10
+        tower_row_styles = ['cell', 'amount_cell', 'cell', 'cell', 'cell', 'cell', 'percent_cell']
+        for tower in self.layout.towers:
             tower_stats = self._get_tower_statistics(tower)
             if tower_stats['total_apartments'] > 0:
-                self.ws[f'A{row}'] = f"Tower {chr(64 + tower)}"
-                self.ws[f'B{row}'] = float(tower_stats['total_amount'])
-                self.ws[f'C{row}'] = tower_stats['donations']
-                self.ws[f'D{row}'] = tower_stats['follow_ups']
-                self.ws[f'E{row}'] = tower_stats['skipped']
-                self.ws[f'F{row}'] = tower_stats['remaining']
-                completion_pct = (tower_stats['donations'] + tower_stats['follow_ups'] + tower_stats['skipped']) / tower_stats['total_apartments'] * 100
-                self.ws[f'G{row}'] = f"{completion_pct:.1f}%"
-                
-                for col in range(1, 8):
-                    cell = self.ws[f'{get_column_letter(col)}{row}']
-                    cell.border = self.border
-                    if col == 2:  # Amount column
-                        cell.number_format = '#,##0'
-                    elif col == 7:  # Percentage column
-                        cell.number_format = '0.0%'
-                row += 1
-        
-        # Auto-adjust column widths
-        for column in self.ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            self.ws.column_dimensions[column_letter].width = adjusted_width
+                sheet.append([
+                    f"Tower {chr(64 + tower)}",
+                    float(tower_stats['total_amount']),
+                    tower_stats['donations'],
+                    tower_stats['follow_ups'],
+                    tower_stats['skipped'],
+                    tower_stats['remaining'],
+                    tower_stats['completion_pct'] / 100
+                ], tower_row_styles)
+        
+        sheet.fit_columns()
 
     def create_sponsorship_sheet(self):
         """Create the sponsorship summary sheet with filtering"""
         # Create new sheet
-        ws = self.workbook.create_sheet("Sponsorship Summary")
+        sheet = SheetWriter(self.workbook.create_sheet("Sponsorship Summary"), max_width=30)
         
         # Title
-        ws['A1'] = "SPONSORSHIP SUMMARY REPORT"
-        ws['A1'].font = Font(bold=True, size=16)
-        ws.merge_cells('A1:H1')
-        ws['A1'].alignment = Alignment(horizontal='center')
+        sheet.title("SPONSORSHIP SUMMARY REPORT", 'report_title', 'H')
         
-        # Get sponsorship statistics
-        sponsorship_stats = self._get_sponsorship_statistics()
+        # Get sponsorship statistics and all sponsorships
+        sponsorships = Sponsorship.query.all()
+        sponsorship_stats = self._get_sponsorship_statistics(sponsorships)
         
         # Metadata section
-        row = 3
-        ws[f'A{row}'] = "SPONSORSHIP METADATA"
-        ws[f'A{row}'].font = self.header_font
-        ws[f'A{row}'].fill = self.header_fill
-        ws.merge_cells(f'A{row}:H{row}')
+        sheet.skip()
+        sheet.title("SPONSORSHIP METADATA", 'section_header', 'H')
         
-        row += 1
         metadata_data = [
-            ["Exported At", datetime.now().strftime("%Y-%m-%d %H:%M:%S")],
-            ["Total Sponsorships", sponsorship_stats['total_sponsorships']],
-            # ["Total Sponsorship Value", f"₹{sponsorship_stats['total_value']:,.2f}"],
-            ["Booked Sponsorships", sponsorship_stats['booked_sponsorships']],
-            ["Available Sponsorships", sponsorship_stats['available_sponsorships']],
-            ["Total Bookings", sponsorship_stats['total_bookings']],
-            # ["Total Max Capacity", sponsorship_stats['total_max_capacity']],
-            ["Utilization Rate", f"{sponsorship_stats['utilization_rate']:.1f}%"]
+            ["Exported At", datetime.now().strftime("%Y-%m-%d %H:%M:%S"), 'cell'],
+            ["Total Sponsorships", sponsorship_stats['total_sponsorships'], 'cell'],
+            # ["Total Sponsorship Value", f"₹{sponsorship_stats['total_value']:,.2f}", 'cell'],
+            ["Booked Sponsorships", sponsorship_stats['booked_sponsorships'], 'cell'],
+            ["Available Sponsorships", sponsorship_stats['available_sponsorships'], 'cell'],
+            ["Total Bookings", sponsorship_stats['total_bookings'], 'cell'],
+            # ["Total Max Capacity", sponsorship_stats['total_max_capacity'], 'cell'],
+            ["Utilization Rate", sponsorship_stats['utilization_rate'] / 100, 'percent_cell']
         ]
-        
-        for label, value in metadata_data:
-            ws[f'A{row}'] = label
-            ws[f'B{row}'] = value
-            ws[f'A{row}'].font = Font(bold=True)
-            ws[f'A{row}'].border = self.border
-            ws[f'B{row}'].border = self.border
-            row += 1
+        for label, value, style in metadata_data:
+            sheet.append([label, value], ['label', style])
         
         # Sponsorship Details Table
-        row += 2
-        ws[f'A{row}'] = "SPONSORSHIP DETAILS"
-        ws[f'A{row}'].font = self.header_font
-        ws[f'A{row}'].fill = self.header_fill
-        ws.merge_cells(f'A{row}:H{row}')
-        
-        row += 1
-        headers = [
+        sheet.skip(2)
+        sheet.title("SPONSORSHIP DETAILS", 'section_header', 'H')
+        sheet.header([
             "ID", "Sponsorship Name", "Amount", "Max Count", 
             "Booked Count", "Available", "Status", "Created Date"
-        ]
-        
-        for col, header in enumerate(headers, 1):
-            cell = ws[f'{get_column_letter(col)}{row}']
-            cell.value = header
-            cell.font = self.subheader_font
-            cell.fill = self.subheader_fill
-            cell.border = self.border
-            cell.alignment = Alignment(horizontal='center')
+        ], 'table_subheader')
         
-        # Enable filters for the header row
-        ws.auto_filter.ref = f"A{row}:{get_column_letter(len(headers))}{row}"
-        
-        # Get all sponsorships
-        sponsorships = Sponsorship.query.all()
-        
-        row += 1
+        sponsorship_row_styles = ['cell', 'cell', 'amount_cell', 'count_cell', 'count_cell', 'count_cell', 'cell', 'cell']
         for sponsorship in sponsorships:
             available = sponsorship.max_count - sponsorship.booked
             status = "Closed" if sponsorship.is_closed else "Available" if available > 0 else "Partially Booked"
-            
-            ws[f'A{row}'] = sponsorship.id
-            ws[f'B{row}'] = sponsorship.name
-            ws[f'C{row}'] = float(sponsorship.amount)
-            ws[f'D{row}'] = sponsorship.max_count
-            ws[f'E{row}'] = sponsorship.booked
-            ws[f'F{row}'] = available
-            ws[f'G{row}'] = status
-            ws[f'H{row}'] = sponsorship.created_at.strftime("%Y-%m-%d")
-            
-            # Apply borders and formatting
-            for col in range(1, 9):
-                cell = ws[f'{get_column_letter(col)}{row}']
-                cell.border = self.border
-                if col == 3:  # Amount column
-                    cell.number_format = '#,##0'
-                elif col == 4 or col == 5 or col == 6:  # Count columns
-                    cell.number_format = '0'
-            
-            row += 1
+            sheet.append([
+                sponsorship.id,
+                sponsorship.name,
+                float(sponsorship.amount),
+                sponsorship.max_count,
+                sponsorship.booked,
+                available,
+                status,
+                sponsorship.created_at.strftime("%Y-%m-%d")
+            ], sponsorship_row_styles)
         
         # Sponsorship Donations Table
-        row += 2
-        ws[f'A{row}'] = "DONATIONS WITH SPONSORSHIP"
-        ws[f'A{row}'].font = self.header_font
-        ws[f'A{row}'].fill = self.header_fill
-        ws.merge_cells(f'A{row}:K{row}')
-        
-        row += 1
-        donation_headers = [
+        sheet.skip(2)
+        sheet.title("DONATIONS WITH SPONSORSHIP", 'section_header', 'K')
+        sheet.header([
             "Donation ID", "Tower", "Apartment", "Donor Name", "Amount", 
             "Sponsorship Name", "Phone Number", "Head Count", "UPI/Other Person", 
             "Notes", "Date"
-        ]
-        
-        for col, header in enumerate(donation_headers, 1):
-            cell = ws[f'{get_column_letter(col)}{row}']
-            cell.value = header
-            cell.font = self.subheader_font
-            cell.fill = self.subheader_fill
-            cell.border = self.border
-            cell.alignment = Alignment(horizontal='center')
-        
-        # Enable filters for the donation header row
-        ws.auto_filter.ref = f"A{row}:{get_column_letter(len(donation_headers))}{row}"
+        ], 'table_subheader')
         
         # Get donations with sponsorship
-        donations_with_sponsorship = Donation.query.filter(
+        donations_with_sponsorship = db.session.query(
+            Donation.id, Donation.tower, Donation.floor, Donation.unit, Donation.donor_name,
+            Donation.amount, Donation.sponsorship, Donation.phone_number, Donation.head_count,
+            Donation.upi_other_person, Donation.notes, Donation.created_at
+        ).filter(
             Donation.sponsorship.isnot(None),
             Donation.sponsorship != ""
         ).order_by(Donation.created_at.desc()).all()
         
-        row += 1
-        for donation in donations_with_sponsorship:
-            apartment = f"{chr(64 + donation.tower)}{donation.floor}{donation.unit:02d}"
-            
-            ws[f'A{row}'] = donation.id
-            ws[f'B{row}'] = f"Tower {chr(64 + donation.tower)}"
-            ws[f'C{row}'] = apartment
-            ws[f'D{row}'] = donation.donor_name
-            ws[f'E{row}'] = float(donation.amount)
-            ws[f'F{row}'] = donation.sponsorship or ""
-            ws[f'G{row}'] = donation.phone_number or ""
-            ws[f'H{row}'] = donation.head_count or ""
-            ws[f'I{row}'] = donation.upi_other_person or ""
-            ws[f'J{row}'] = donation.notes or ""
-            ws[f'K{row}'] = donation.created_at.strftime("%Y-%m-%d")
-            
-            # Apply borders and formatting
-            for col in range(1, 12):
-                cell = ws[f'{get_column_letter(col)}{row}']
-                cell.border = self.border
-                if col == 5:  # Amount column
-                    cell.number_format = '#,##0'
-                elif col == 8:  # Head count column
-                    cell.number_format = '0'
-            
-            row += 1
-        
-        # Auto-adjust column widths
-        for column in ws.columns:
-            max_length = 0
-            column_letter = get_column_letter(column[0].column)
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 30)
-            ws.column_dimensions[column_letter].width = adjusted_width
+        donation_row_styles = ['cell'] * 4 + ['amount_cell', 'cell', 'cell', 'count_cell', 'cell', 'cell', 'cell']
+        for (donation_id, tower, floor, unit, donor_name, amount, sponsorship, phone_number,
+                head_count, upi_other_person, notes, created_at) in donations_with_sponsorship:
+            sheet.append([
+                donation_id,
+                f"Tower {chr(64 + tower)}",
+                f"{chr(64 + tower)}{floor}{unit:02d}",
+                donor_name,
+                float(amount),
+                sponsorship or "",
+                phone_number or "",
+                head_count or "",
+                upi_other_person or "",
+                notes or "",
+                created_at.strftime("%Y-%m-%d")
+            ], donation_row_styles)
+        
+        sheet.fit_columns()
 
     def create_tower_sheets(self):
-        """Create individual sheets for each tower"""
-        sheets_created = 0
-        for tower in range(1, 11):  # Towers 1-10
-            tower_donations = self._get_tower_donations(tower)
-            if not tower_donations:
-                continue
-                
-            # Create new sheet
-            ws = self.workbook.create_sheet(f"Tower {chr(64 + tower)}")
-            sheets_created += 1
-            
-            # Title
-            ws['A1'] = f"TOWER {chr(64 + tower)} - DONATION DETAILS"
-            ws['A1'].font = Font(bold=True, size=14)
-            ws.merge_cells('A1:K1')
-            ws['A1'].alignment = Alignment(horizontal='center')
-            
-            # Headers
-            row = 3
-            headers = [
-                "Floor", "Unit", "Apartment", "Donor Name", "Amount", 
-                "Phone Number", "Head Count", "UPI/Other Person", 
-                "Sponsorship", "Notes", "Status", "Date"
-            ]
-            
-            for col, header in enumerate(headers, 1):
-                cell = ws[f'{get_column_letter(col)}{row}']
-                cell.value = header
-                cell.font = self.header_font
-                cell.fill = self.header_fill
-                cell.border = self.border
-                cell.alignment = Alignment(horizontal='center')
-            
-            # Enable filters for the header row
-            ws.auto_filter.ref = f"A{row}:{get_column_letter(len(headers))}{row}"
-            
-            # Data
-            row += 1
-            for donation in tower_donations:
-                apartment = f"{chr(64 + tower)}{donation.floor}{donation.unit:02d}"
-                
-                ws[f'A{row}'] = donation.floor
-                ws[f'B{row}'] = donation.unit
-                ws[f'C{row}'] = apartment
-                ws[f'D{row}'] = donation.donor_name
-                ws[f'E{row}'] = donation.amount
-                ws[f'F{row}'] = donation.phone_number or ""
-                ws[f'G{row}'] = donation.head_count or ""
-                ws[f'H{row}'] = donation.upi_other_person or ""
-                ws[f'I{row}'] = donation.sponsorship or ""
-                ws[f'J{row}'] = donation.notes or ""
-                ws[f'K{row}'] = donation.status
-                ws[f'L{row}'] = donation.created_at.strftime("%Y-%m-%d")
-                
-                # Apply borders and formatting
-                for col in range(1, 13):
-                    cell = ws[f'{get_column_letter(col)}{row}']
-                    cell.border = self.border
-                    if col == 5:  # Amount column
-                        cell.number_format = '#,##0'
-                
-                row += 1
-            
-            # Auto-adjust column widths
-            for column in ws.columns:
-                max_length = 0
-                column_letter = get_column_letter(column[0].column)
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = min(max_length + 2, 30)
-                ws.column_dimensions[column_letter].width = adjusted_width
+        """Create individual sheets for each tower
+
+        With more than one worker the sheets are rendered concurrently in a
+        process pool; placeholders keep their place in the workbook and the
+        rendered XML is spliced in when the file is saved.
+        """
+        if self.incremental:
+            return self._create_tower_sheets_incremental()
+
+        tower_rows = self._get_tower_rows()
+        self.rendered_towers = list(tower_rows)
+        if self.workers > 1 and len(tower_rows) > 1:
+            rendered = render_tower_sheets_parallel(tower_rows, self.workers)
+            for tower in tower_rows:
+                ws = self.workbook.create_sheet(tower_sheet_title(tower))
+                ws.auto_filter.ref = AUTO_FILTER_REF
+                self._tower_sheet_xml[ws.title] = rendered[tower]
+            return
+
+        for tower, rows in tower_rows.items():
+            ws = self.workbook.create_sheet(tower_sheet_title(tower))
+            write_tower_sheet(ws, tower, rows)
+
+    def _create_tower_sheets_incremental(self):
+        """Create tower sheets, re-rendering only towers whose donations changed since the last export"""
+        versions = self._get_tower_versions()
+        cached = {}
+        for tower, version in versions.items():
+            entry = tower_sheet_cache.get(tower)
+            if entry is not None and entry[0] == version:
+                cached[tower] = entry[1]
 
-    def _get_sponsorship_statistics(self):
+        stale = [tower for tower in versions if tower not in cached]
+        tower_rows = self._get_tower_rows(stale) if stale else {}
+        if self.workers > 1 and len(tower_rows) > 1:
+            rendered = render_tower_sheets_parallel(tower_rows, self.workers)
+        else:
+            rendered = {tower: render_tower_sheet_xml(tower, rows) for tower, rows in tower_rows.items()}
+        for tower, xml in rendered.items():
+            tower_sheet_cache.set(tower, (versions[tower], xml))
+
+        for tower in versions:
+            xml = rendered.get(tower) or cached.get(tower)
+            if xml is None:
+                continue  # Every row was deleted after the versions were read
+            ws = self.workbook.create_sheet(tower_sheet_title(tower))
+            ws.auto_filter.ref = AUTO_FILTER_REF
+            self._tower_sheet_xml[ws.title] = xml
+        self.rendered_towers = list(rendered)
+        self.reused_towers = list(cached)
+
+    def _get_sponsorship_statistics(self, sponsorships):
         """Get sponsorship statistics for the metadata section"""
-        # Get all sponsorships
-        sponsorships = Sponsorship.query.all()
-        
         total_sponsorships = len(sponsorships)
         total_value = sum(float(s.amount) * s.max_count for s in sponsorships)
         booked_sponsorships = sum(1 for s in sponsorships if s.is_closed)
@@ -381,27 +245,48 @@ class ExcelExporter:
             'utilization_rate': utilization_rate
         }
 
+    def _get_status_counts(self):
+        """Get {(tower, status): (count, amount)} from one grouped query, cached per export"""
+        if self._status_counts is None:
+            rows = db.session.query(
+                Donation.tower,
+                Donation.status,
+                func.count(Donation.id),
+                func.sum(Donation.amount)
+            ).group_by(Donation.tower, Donation.status).all()
+            self._status_counts = {(tower, status): (count, amount or 0) for tower, status, count, amount in rows}
+        return self._status_counts
+
+    def _count(self, status, tower=None):
+        """Number of donations with a status, overall or for one tower"""
+        return sum(
+            count for (row_tower, row_status), (count, _) in self._get_status_counts().items()
+            if row_status == status and (tower is None or row_tower == tower)
+        )
+
     def _get_statistics(self):
         """Get overall statistics for the metadata sheet"""
+        status_counts = self._get_status_counts()
+        
         # Total amount
-        total_amount = db.session.query(func.sum(Donation.amount)).filter_by(status='completed').scalar() or 0
+        total_amount = sum(amount for (_, status), (_, amount) in status_counts.items() if status == 'completed')
         
         # Last collection date
-        last_donation = Donation.query.order_by(Donation.created_at.desc()).first()
-        last_collection_date = last_donation.created_at.strftime("%Y-%m-%d %H:%M:%S") if last_donation else "No donations yet"
+        last_collected_at = db.session.query(func.max(Donation.created_at)).scalar()
+        last_collection_date = last_collected_at.strftime("%Y-%m-%d %H:%M:%S") if last_collected_at else "No donations yet"
         
         # Counts by status
-        completed_count = Donation.query.filter_by(status='completed').count()
-        follow_up_count = Donation.query.filter_by(status='follow-up').count()
-        skipped_count = Donation.query.filter_by(status='skipped').count()
+        completed_count = self._count('completed')
+        follow_up_count = self._count('follow-up')
+        skipped_count = self._count('skipped')
         
-        # Total apartments (14 floors * 4 units * 10 towers)
-        total_apartments = 14 * 4 * 10
+        # Total apartments from the configured building layout
+        total_apartments = self.layout.total_apartments
         apartments_visited = completed_count + follow_up_count + skipped_count
-        apartments_remaining = total_apartments - apartments_visited
+        apartments_remaining = self.layout.remaining(apartments_visited)
         
         # Towers covered (towers with at least one donation)
-        towers_covered = db.session.query(func.count(func.distinct(Donation.tower))).scalar() or 0
+        towers_covered = len({tower for tower, _ in status_counts})
         
         return {
             'total_amount': float(total_amount),
@@ -416,18 +301,19 @@ class ExcelExporter:
     def _get_tower_statistics(self, tower):
         """Get statistics for a specific tower"""
         # Total apartments in tower
-        total_apartments = 14 * 4  # 14 floors * 4 units
+        total_apartments = self.layout.tower_total(tower)
         
         # Counts by status for this tower
-        donations = Donation.query.filter_by(tower=tower, status='completed').count()
-        follow_ups = Donation.query.filter_by(tower=tower, status='follow-up').count()
-        skipped = Donation.query.filter_by(tower=tower, status='skipped').count()
+        donations = self._count('completed', tower)
+        follow_ups = self._count('follow-up', tower)
+        skipped = self._count('skipped', tower)
         
         # Total amount for this tower
-        total_amount = db.session.query(func.sum(Donation.amount)).filter_by(tower=tower, status='completed').scalar() or 0
+        total_amount = self._get_status_counts().get((tower, 'completed'), (0, 0))[1]
         
         # Remaining apartments
-        remaining = total_apartments - (donations + follow_ups + skipped)
+        visited = donations + follow_ups + skipped
+        remaining = self.layout.remaining(visited, tower)
         
         return {
             'total_apartments': total_apartments,
@@ -435,12 +321,32 @@ class ExcelExporter:
             'follow_ups': follow_ups,
             'skipped': skipped,
             'remaining': remaining,
+            'completion_pct': self.layout.completion(visited, tower),
             'total_amount': float(total_amount)
         }
 
-    def _get_tower_donations(self, tower):
-        """Get all donations for a specific tower"""
-        return Donation.query.filter_by(tower=tower).order_by(Donation.floor.desc(), Donation.unit).all()
+    def _get_tower_versions(self):
+        """Get {tower: (count, max id, max updated_at)} for the towers in the layout that have donations"""
+        rows = db.session.query(
+            Donation.tower,
+            func.count(Donation.id),
+            func.max(Donation.id),
+            func.max(Donation.updated_at)
+        ).filter(
+            Donation.tower.in_(self.layout.towers)
+        ).group_by(Donation.tower).order_by(Donation.tower).all()
+        return {tower: (count, max_id, max_updated_at) for tower, count, max_id, max_updated_at in rows}
+
+    def _get_tower_rows(self, towers=None):
+        """Get {tower: rows} for the given towers (default: the layout) that have donations, in one query"""
+        rows = db.session.query(
+            Donation.tower, Donation.floor, Donation.unit, Donation.donor_name, Donation.amount,
+            Donation.phone_number, Donation.head_count, Donation.upi_other_person,
+            Donation.sponsorship, Donation.notes, Donation.status, Donation.created_at
+        ).filter(
+            Donation.tower.in_(self.layout.towers if towers is None else towers)
+        ).order_by(Donation.tower, Donation.floor.desc(), Donation.unit).all()
+        return {tower: [row[1:] for row in tower_group] for tower, tower_group in groupby(rows, key=lambda row: row[0])}
 
     def generate_excel(self):
         """Generate the complete Excel file"""
@@ -462,13 +368,24 @@ class ExcelExporter:
             self.workbook.save(excel_file)
             excel_file.seek(0)
             
+            # Splice in tower sheets rendered by worker processes
+            if self._tower_sheet_xml:
+                excel_file = splice_sheets(excel_file, {
+                    self.workbook[title].path.lstrip('/'): xml
+                    for title, xml in self._tower_sheet_xml.items()
+                })
+            
             return excel_file
         except Exception as e:
             # Log the error for debugging
             print(f"Error generating Excel file: {str(e)}")
             raise
 
-def export_donations_to_excel():
-    """Main function to export donations to Excel"""
-    exporter = ExcelExporter()
+def export_donations_to_excel(workers=1, incremental=False):
+    """Main function to export donations to Excel
+
+    workers > 1 renders tower sheets in parallel; incremental reuses the
+    tower sheets of earlier exports whose donations have not changed.
+    """
+    exporter = ExcelExporter(workers=workers, incremental=incremental)
     return exporter.generate_excel()
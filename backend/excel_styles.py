@@ -0,0 +1,109 @@
+"""
+Named styles and a row writer shared by the Excel export sheets
+
+Every cell format the export uses is a named style registered once per
+workbook (register_styles), so a cell is formatted with one style assignment
+instead of separate border/font/fill/number format assignments. Rows are
+written with Worksheet.append and column widths are tracked as values are
+written, instead of rescanning every cell afterwards.
+"""
+
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter
+
+HEADER_FONT = Font(bold=True, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+SUBHEADER_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+CENTER = Alignment(horizontal='center')
+BORDER = Border(
+    left=Side(style='thin'),
+    right=Side(style='thin'),
+    top=Side(style='thin'),
+    bottom=Side(style='thin')
+)
+
+def _named_styles():
+    """Fresh NamedStyle objects (a NamedStyle binds to the workbook it is added to)"""
+    return [
+        NamedStyle('report_title', font=Font(bold=True, size=16), alignment=CENTER),
+        NamedStyle('sheet_title', font=Font(bold=True, size=14), alignment=CENTER),
+        NamedStyle('section_header', font=HEADER_FONT, fill=HEADER_FILL),
+        NamedStyle('table_header', font=HEADER_FONT, fill=HEADER_FILL, border=BORDER, alignment=CENTER),
+        NamedStyle('table_subheader', font=HEADER_FONT, fill=SUBHEADER_FILL, border=BORDER, alignment=CENTER),
+        NamedStyle('label', font=Font(bold=True), border=BORDER),
+        NamedStyle('cell', font=DEFAULT_FONT, border=BORDER),
+        NamedStyle('amount_cell', font=DEFAULT_FONT, border=BORDER, number_format='#,##0'),
+        NamedStyle('count_cell', font=DEFAULT_FONT, border=BORDER, number_format='0'),
+        NamedStyle('percent_cell', font=DEFAULT_FONT, border=BORDER, number_format='0.0%'),
+    ]
+
+def register_styles(workbook):
+    """Register the named styles on a fresh workbook, before any cell is styled
+
+    The cell formats are registered in a fixed order too, so workbooks built
+    in different processes assign the same style ids.
+    """
+    styles = _named_styles()
+    for style in styles:
+        workbook.add_named_style(style)
+    ws = workbook.create_sheet("_styles")
+    for row, style in enumerate(styles, 1):
+        cell = ws.cell(row=row, column=1)
+        cell.style = style.name
+        cell.style_id  # Assigns the cell format index
+    workbook.remove(ws)
+
+class SheetWriter:
+    """Appends styled rows to a worksheet and tracks column widths"""
+
+    # Narrowest column, in characters of content
+    MIN_WIDTH = 4
+
+    def __init__(self, ws, max_width=30):
+        self.ws = ws
+        self.row = 0
+        self.max_width = max_width
+        self.widths = {}
+
+    def append(self, values, styles=None):
+        """Append a row; styles is one style name for every value or a per-column list"""
+        self.ws.append(values)
+        self.row += 1
+        widths = self.widths
+        for col, value in enumerate(values, 1):
+            if value is not None:
+                width = len(str(value))
+                if width > widths.get(col, 0):
+                    widths[col] = width
+        if styles:
+            if isinstance(styles, str):
+                styles = [styles] * len(values)
+            cell = self.ws.cell
+            row = self.row
+            for col, style in enumerate(styles, 1):
+                if style:
+                    cell(row=row, column=col).style = style
+        return self.row
+
+    def skip(self, rows=1):
+        """Leave empty rows"""
+        for _ in range(rows):
+            self.ws.append([])
+        self.row += rows
+
+    def title(self, text, style, last_column):
+        """Append a title row merged across columns A..last_column"""
+        self.append([text], [style])
+        self.ws.merge_cells(f'A{self.row}:{last_column}{self.row}')
+
+    def header(self, headers, style):
+        """Append a table header row with an auto-filter"""
+        self.append(headers, style)
+        self.ws.auto_filter.ref = f"A{self.row}:{get_column_letter(len(headers))}{self.row}"
+
+    def fit_columns(self):
+        """Size every written column to its widest value"""
+        for col in range(1, max(self.widths, default=0) + 1):
+            width = max(self.widths.get(col, 0), self.MIN_WIDTH)
+            self.ws.column_dimensions[get_column_letter(col)].width = min(width + 2, self.max_width)
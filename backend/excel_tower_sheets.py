@@ -0,0 +1,95 @@
+"""
+Tower sheet rendering for the Excel export
+
+This module has no app or database imports so tower sheets can be rendered in
+worker processes. A worker renders its sheet into a scratch workbook and
+returns the serialized worksheet XML, which is spliced into the final xlsx.
+Every workbook registers the named styles first, in the same order
+(excel_styles.register_styles), so the style ids inside that XML mean the
+same thing in the final workbook.
+"""
+
+import io
+import multiprocessing
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+# Private openpyxl API: requirements.txt pins the exact version, tests/test_excel_export.py checks the output
+from openpyxl.worksheet._writer import WorksheetWriter
+from excel_styles import SheetWriter, register_styles
+
+TOWER_HEADERS = [
+    "Floor", "Unit", "Apartment", "Donor Name", "Amount",
+    "Phone Number", "Head Count", "UPI/Other Person",
+    "Sponsorship", "Notes", "Status", "Date"
+]
+HEADER_ROW = 3
+AUTO_FILTER_REF = f"A{HEADER_ROW}:{get_column_letter(len(TOWER_HEADERS))}{HEADER_ROW}"
+
+# Row-level format: every column bordered, Amount (E) as a number
+TOWER_ROW_STYLES = ['cell'] * 4 + ['amount_cell'] + ['cell'] * 7
+
+def tower_sheet_title(tower):
+    return f"Tower {chr(64 + tower)}"
+
+def write_tower_sheet(ws, tower, rows):
+    """Fill a tower sheet from (floor, unit, donor_name, amount, phone_number, head_count,
+    upi_other_person, sponsorship, notes, status, created_at) rows"""
+    letter = chr(64 + tower)
+    sheet = SheetWriter(ws, max_width=30)
+    sheet.title(f"TOWER {letter} - DONATION DETAILS", 'sheet_title', 'K')
+    sheet.skip()
+    sheet.header(TOWER_HEADERS, 'table_header')
+
+    for floor, unit, donor_name, amount, phone_number, head_count, upi_other_person, sponsorship, notes, status, created_at in rows:
+        sheet.append([
+            floor,
+            unit,
+            f"{letter}{floor}{unit:02d}",
+            donor_name,
+            amount,
+            phone_number or "",
+            head_count or "",
+            upi_other_person or "",
+            sponsorship or "",
+            notes or "",
+            status,
+            created_at.strftime("%Y-%m-%d")
+        ], TOWER_ROW_STYLES)
+
+    sheet.fit_columns()
+
+def render_tower_sheet_xml(tower, rows):
+    """Render one tower sheet in a scratch workbook and return its worksheet XML (runs in a worker)"""
+    workbook = Workbook()  # The default sheet stays first, so the tower sheet is not the selected tab
+    register_styles(workbook)
+    ws = workbook.create_sheet(tower_sheet_title(tower))
+    write_tower_sheet(ws, tower, rows)
+    writer = WorksheetWriter(ws, out=io.BytesIO())
+    writer.write()
+    return writer.read()
+
+def _mp_context():
+    """Worker processes start from a clean forkserver where available (never fork the web worker)"""
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload(['excel_tower_sheets'])
+        return context
+    return multiprocessing.get_context('spawn')
+
+def render_tower_sheets_parallel(tower_rows, workers):
+    """Render {tower: rows} concurrently; return {tower: worksheet XML}"""
+    with ProcessPoolExecutor(max_workers=workers, mp_context=_mp_context()) as executor:
+        futures = {tower: executor.submit(render_tower_sheet_xml, tower, rows) for tower, rows in tower_rows.items()}
+        return {tower: future.result() for tower, future in futures.items()}
+
+def splice_sheets(xlsx_file, sheet_xml):
+    """Replace worksheet parts ({"xl/worksheets/sheetN.xml": xml}) in a saved xlsx"""
+    output = io.BytesIO()
+    with zipfile.ZipFile(xlsx_file) as source, zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as target:
+        for item in source.infolist():
+            data = sheet_xml.get(item.filename)
+            target.writestr(item, data if data is not None else source.read(item.filename))
+    output.seek(0)
+    return output
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Local stub server standing in for Google's OAuth tokeninfo/userinfo endpoints
+
+Point the backend at it to exercise Google sign-in without real credentials:
+
+    python google_stub_server.py --port 8765 --delay 0.2
+    GOOGLE_CLIENT_ID=stub-client-id \\
+    GOOGLE_TOKENINFO_URL=http://127.0.0.1:8765/oauth2/v3/tokeninfo \\
+    GOOGLE_USERINFO_URL=http://127.0.0.1:8765/oauth2/v2/userinfo \\
+    python run.py
+
+Any access token of the form "stub-<email>" is accepted; anything else gets 400.
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+class GoogleStubHandler(BaseHTTPRequestHandler):
+    """Answers tokeninfo and userinfo the way Google does for valid/invalid tokens"""
+
+    client_id = 'stub-client-id'
+    delay = 0.0
+    request_count = 0
+    _count_lock = threading.Lock()
+
+    def _email_for(self, token):
+        if token and token.startswith('stub-') and '@' in token:
+            return token[len('stub-'):]
+        return None
+
+    def _send_json(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        with GoogleStubHandler._count_lock:
+            GoogleStubHandler.request_count += 1
+        if self.delay:
+            time.sleep(self.delay)
+
+        url = urlparse(self.path)
+        if url.path == '/oauth2/v3/tokeninfo':
+            token = parse_qs(url.query).get('access_token', [None])[0]
+            email = self._email_for(token)
+            if not email:
+                return self._send_json(400, {'error_description': 'Invalid Value'})
+            return self._send_json(200, {
+                'aud': self.client_id,
+                'email': email,
+                'expires_in': '3599',
+                'scope': 'openid email profile'
+            })
+
+        if url.path == '/oauth2/v2/userinfo':
+            auth_header = self.headers.get('Authorization', '')
+            email = self._email_for(auth_header[len('Bearer '):] if auth_header.startswith('Bearer ') else None)
+            if not email:
+                return self._send_json(401, {'error': {'code': 401, 'message': 'Invalid Credentials'}})
+            return self._send_json(200, {
+                'id': str(int(hashlib.sha256(email.encode('utf-8')).hexdigest()[:15], 16)),
+                'email': email,
+                'verified_email': True,
+                'name': email.split('@')[0].title()
+            })
+
+        self._send_json(404, {'error': 'Not found'})
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+def start_stub_server(port=0, delay=0.0, client_id='stub-client-id'):
+    """Start the stub in a background thread and return (server, base_url)"""
+    handler = type('ConfiguredGoogleStubHandler', (GoogleStubHandler,), {
+        'delay': delay,
+        'client_id': client_id
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Stub Google OAuth endpoints')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help='Seconds to wait before each response')
+    parser.add_argument('--client-id', default='stub-client-id')
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(args.port, args.delay, args.client_id)
+    print(f"Google stub listening on {base_url} (client id: {args.client_id})")
+    print("Press Ctrl+C to stop")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
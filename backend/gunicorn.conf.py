@@ -0,0 +1,122 @@
+"""
+Gunicorn configuration for the donation app backend
+
+Every setting can be overridden from the environment:
+
+    GUNICORN_WORKER_CLASS   gthread (default), sync or gevent
+    GUNICORN_WORKERS        worker processes (default derived from the CPU count)
+    GUNICORN_THREADS        threads per gthread worker (default 4)
+    GUNICORN_WORKER_CONNECTIONS  concurrent requests per gevent worker (default 100)
+    GUNICORN_BIND, GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_KEEPALIVE,
+    GUNICORN_MAX_REQUESTS, GUNICORN_MAX_REQUESTS_JITTER, GUNICORN_PRELOAD
+
+gthread is the default because logins (bcrypt) and exports are CPU bound and
+database calls release the GIL; gevent needs "pip install gevent" (plus
+psycogreen on PostgreSQL) and suits many slow, mostly idle connections.
+
+Usage:
+    gunicorn --config gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+import os
+import shutil
+import tempfile
+
+def _cpu_count():
+    """CPUs this process may run on (respects taskset/cpuset limits)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+def _env_int(name, default):
+    value = os.getenv(name, '')
+    return int(value) if value.strip() else default
+
+cpus = _cpu_count()
+
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread').lower()
+if worker_class not in ('sync', 'gthread', 'gevent'):
+    raise ValueError(f'Unsupported GUNICORN_WORKER_CLASS: {worker_class}')
+if worker_class == 'gevent':
+    try:
+        import gevent  # noqa: F401
+    except ImportError:
+        raise ImportError('GUNICORN_WORKER_CLASS=gevent requires the gevent package (pip install gevent)')
+
+# Sync workers serve one request at a time, so they need the most processes;
+# gthread and gevent workers overlap requests that wait on the database
+_default_workers = {
+    'sync': 2 * cpus + 1,
+    'gthread': cpus + 1,
+    'gevent': cpus,
+}[worker_class]
+workers = _env_int('GUNICORN_WORKERS', _default_workers)
+threads = _env_int('GUNICORN_THREADS', 4) if worker_class == 'gthread' else 1
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 100)
+
+# The app sizes its database pool from the resolved concurrency (see db_pool.py)
+os.environ['GUNICORN_WORKERS'] = str(workers)
+os.environ['GUNICORN_THREADS'] = str(worker_connections if worker_class == 'gevent' else threads)
+
+# Workers write Prometheus samples here; /metrics merges them (see metrics.py).
+# A new server starts empty, since files from a previous run would be merged in
+# (the marker keeps a config reload on SIGHUP from wiping live counters).
+prometheus_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'donation-app-metrics')
+)
+if not os.environ.get('GUNICORN_METRICS_DIR_READY'):
+    shutil.rmtree(prometheus_dir, ignore_errors=True)
+    os.makedirs(prometheus_dir, exist_ok=True)
+    os.environ['GUNICORN_METRICS_DIR_READY'] = '1'
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Load the app once in the master so workers share its memory copy-on-write.
+# gevent patches the standard library when a worker starts, which must happen
+# before the app is imported, so gevent workers load the app themselves.
+preload_app = os.getenv('GUNICORN_PRELOAD', 'false' if worker_class == 'gevent' else 'true').lower() == 'true'
+
+# Recycle each worker after this many requests (jittered so they do not restart together)
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 1000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', 100)
+
+# Excel exports of a full season can take a while, so allow long requests
+timeout = _env_int('GUNICORN_TIMEOUT', 120)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+# nginx keeps upstream connections open between requests
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+# Worker heartbeat files on tmpfs, so a slow container disk cannot stall workers
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.getenv('LOG_LEVEL', 'INFO').lower()
+
+def child_exit(server, worker):
+    """Drop live gauges of a worker that exited (recycled or crashed)"""
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
+
+def post_fork(server, worker):
+    """Give each worker its own database connections
+
+    With preload_app the engine is created in the master; connections it may
+    have opened must not be shared across processes.
+    """
+    if worker_class == 'gevent':
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            pass
+
+    if not server.cfg.preload_app:
+        return
+    from app import app, db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
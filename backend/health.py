@@ -0,0 +1,126 @@
+"""
+Liveness and readiness probes
+
+/health/live only says the worker is serving requests. /health/ready checks
+the dependencies: a SELECT 1 on the primary (and replica, if configured)
+that must finish within HEALTH_CHECK_TIMEOUT seconds, pool saturation, and
+the schema version recorded by migrations.py against models.SCHEMA_VERSION.
+If the primary database is down or slower than the timeout, the probe
+answers 503.
+
+A result is cached per worker for HEALTH_CACHE_SECONDS and concurrent probes
+share one check, so probes never add load to a struggling database.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from datetime import datetime, timezone
+from flask import jsonify
+
+class HealthChecks:
+    def __init__(self, app=None):
+        self.app = app
+        self._lock = threading.Lock()
+        self._cached = None
+        self._cached_at = 0.0
+        self._executor = None
+        self._pending = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('HEALTH_CHECK_TIMEOUT', 1.0)
+        app.config.setdefault('HEALTH_CACHE_SECONDS', 2.0)
+
+        # At most one check per database in flight: one stuck on a dead connection never piles up more
+        self._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='health-check')
+        app.add_url_rule('/health/live', 'health_live', self.live)
+        app.add_url_rule('/health/ready', 'health_ready', self.ready)
+
+    def live(self):
+        return jsonify({'status': 'alive', 'timestamp': datetime.now(timezone.utc).isoformat()})
+
+    def ready(self):
+        result = self.check()
+        return jsonify(result), 200 if result['status'] == 'ready' else 503
+
+    def check(self):
+        """Cached readiness result, refreshed by at most one caller at a time"""
+        with self._lock:
+            if self._cached is not None and time.monotonic() - self._cached_at < self.app.config['HEALTH_CACHE_SECONDS']:
+                return self._cached
+            self._cached = self._run_checks()
+            self._cached_at = time.monotonic()
+            return self._cached
+
+    def _run_checks(self):
+        timeout = self.app.config['HEALTH_CHECK_TIMEOUT']
+        db = self.app.extensions['sqlalchemy']
+        with self.app.app_context():
+            engines = dict(db.engines)
+
+        checks = {}
+        migrations = None
+        for bind, engine in engines.items():
+            checks[bind or 'primary'] = check = self._check_database(bind, engine, timeout)
+            if bind is None:
+                migrations = check.pop('migrations', None)
+            else:
+                check.pop('migrations', None)
+
+        primary = checks.get('primary', {})
+        result = {
+            'status': 'ready' if primary.get('ok') else 'unavailable',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'checks': {
+                'database': checks,
+                'pool': {bind or 'primary': _pool_usage(engine.pool) for bind, engine in engines.items()},
+            },
+        }
+        if migrations is not None:
+            result['checks']['migrations'] = migrations
+        return result
+
+    def _check_database(self, bind, engine, timeout):
+        """SELECT 1 (and the schema version) on a connection, bounded by timeout"""
+        pending = self._pending.get(bind)
+        if pending is not None and not pending.done():
+            return {'ok': False, 'error': 'previous check still running'}
+
+        start = time.perf_counter()
+        pending = self._pending[bind] = self._executor.submit(_select_one, engine)
+        try:
+            migrations = pending.result(timeout=timeout)
+        except FutureTimeoutError:
+            return {'ok': False, 'error': f'no answer within {timeout:g}s'}
+        except Exception as e:
+            return {'ok': False, 'error': str(e)}
+        return {'ok': True, 'latency_ms': round((time.perf_counter() - start) * 1000, 1), 'migrations': migrations}
+
+def _select_one(engine):
+    """Run the probe query; return the schema version state"""
+    from models import SCHEMA_VERSION
+    with engine.connect() as conn:
+        conn.exec_driver_sql('SELECT 1')
+        try:
+            current = conn.exec_driver_sql('SELECT MAX(version) FROM schema_version').scalar()
+        except Exception:
+            conn.rollback()
+            current = None
+    return {'current': current, 'expected': SCHEMA_VERSION, 'pending': current is None or current < SCHEMA_VERSION}
+
+def _pool_usage(pool):
+    if not hasattr(pool, 'checkedout'):
+        return {}
+    capacity = pool.size() + max(0, pool._max_overflow)
+    checked_out = pool.checkedout()
+    return {
+        'checked_out': checked_out,
+        'capacity': capacity,
+        'saturation': round(checked_out / capacity, 2) if capacity else 0.0,
+    }
+
+# Initialize health checks
+health_checks = HealthChecks()
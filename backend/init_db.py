@@ -11,7 +11,7 @@ import csv
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from app import app, db
-from models import User, UserRole, Invite, Donor, Campaign, Donation, Sponsorship
+from models import User, UserRole, Invite, Donor, Campaign, Donation, Sponsorship, SchemaVersion, SCHEMA_VERSION
 
 def seed_sponsorships_from_csv():
     """Seed the database with sponsorship data from donation-plan.csv file"""
@@ -65,10 +65,16 @@ def init_database():
     with app.app_context():
         try:
             print("Creating database tables...")
+            fresh = not db.inspect(db.engine).has_table(Donation.__tablename__)
             
             # Create all tables
             db.create_all()
             
+            # A new database is created at the current schema version
+            if fresh and not db.session.get(SchemaVersion, SCHEMA_VERSION):
+                db.session.add(SchemaVersion(version=SCHEMA_VERSION))
+                db.session.commit()
+            
             print("✅ Database tables created successfully!")
             
             # Verify tables were created
@@ -0,0 +1,147 @@
+"""
+Prometheus metrics, served at /metrics
+
+Under gunicorn each worker writes its samples to memory-mapped files in
+PROMETHEUS_MULTIPROC_DIR (set up by gunicorn.conf.py) and a scrape merges
+the files of every worker, so whichever worker answers sees the whole
+server. Without that variable (dev server, scripts) the metrics live in the
+process. Recording a sample is a lock and an mmap write, a few microseconds.
+
+Set METRICS_TOKEN to require "Authorization: Bearer <token>" on /metrics.
+"""
+
+import hmac
+import os
+import time
+from flask import Response, g, has_request_context, jsonify, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest, multiprocess
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Metric files are created on import, so the shared directory must exist first
+if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.makedirs(os.environ['PROMETHEUS_MULTIPROC_DIR'], exist_ok=True)
+
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds', 'Request latency by route',
+    ['method', 'endpoint', 'status'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+DB_QUERIES = Counter('db_queries_total', 'SQL statements executed, by route', ['endpoint'])
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    'db_pool_checkout_wait_seconds', 'Time waiting for (or opening) a pooled connection',
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10)
+)
+DB_POOL_TIMEOUTS = Counter('db_pool_timeouts_total', 'Connection checkouts that timed out')
+DB_POOL_CHECKED_OUT = Gauge('db_pool_checked_out', 'Connections in use', ['bind'], multiprocess_mode='livesum')
+DB_POOL_SIZE = Gauge('db_pool_size', 'Connections kept in the pool', ['bind'], multiprocess_mode='livesum')
+EXPORT_DURATION = Histogram(
+    'export_duration_seconds', 'Time to produce an export', ['format'],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+)
+EXPORT_SIZE = Histogram(
+    'export_size_bytes', 'Size of an export', ['format'],
+    buckets=(1e4, 1e5, 1e6, 5e6, 1e7, 5e7, 1e8)
+)
+BCRYPT_DURATION = Histogram(
+    'bcrypt_duration_seconds', 'bcrypt hashing and checks, including the wait for a bcrypt thread', ['operation'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+SPONSORSHIP_CONFLICTS = Counter(
+    'sponsorship_booking_conflicts_total', 'Bookings rejected because the sponsorship was already closed'
+)
+
+# Seconds between pool gauge refreshes in each worker
+POOL_GAUGE_INTERVAL = 1.0
+
+class Metrics:
+    def __init__(self, app=None):
+        self.app = app
+        self._pool_gauges_at = 0.0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('METRICS_ENABLED', True)
+        app.config.setdefault('METRICS_TOKEN', '')
+        if not app.config['METRICS_ENABLED']:
+            return
+
+        from db_pool import pool_metrics
+        pool_metrics.observers.append(self._observe_checkout)
+        if not event.contains(Engine, 'before_cursor_execute', _count_query):
+            event.listen(Engine, 'before_cursor_execute', _count_query)
+        app.before_request(_start_timer)
+        app.after_request(self._observe_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view)
+
+    def _observe_checkout(self, seconds, timed_out):
+        if timed_out:
+            DB_POOL_TIMEOUTS.inc()
+        else:
+            DB_POOL_CHECKOUT_WAIT.observe(seconds)
+
+    def _observe_request(self, response):
+        now = time.perf_counter()
+        started_at = g.pop('metrics_started_at', None)
+        if started_at is not None:
+            REQUEST_DURATION.labels(request.method, request.endpoint or 'unmatched', response.status_code).observe(
+                now - started_at
+            )
+        # Every worker reports its own pool, whichever worker serves the scrape
+        if now - self._pool_gauges_at >= POOL_GAUGE_INTERVAL:
+            self.update_pool_gauges()
+        return response
+
+    def update_pool_gauges(self):
+        """Refresh this worker's pool occupancy gauges"""
+        self._pool_gauges_at = time.perf_counter()
+        db = self.app.extensions['sqlalchemy']
+        with self.app.app_context():
+            for bind, engine in db.engines.items():
+                pool = engine.pool
+                if hasattr(pool, 'checkedout'):
+                    DB_POOL_CHECKED_OUT.labels(bind or 'primary').set(pool.checkedout())
+                    DB_POOL_SIZE.labels(bind or 'primary').set(pool.size())
+
+    def metrics_view(self):
+        token = self.app.config['METRICS_TOKEN']
+        if token:
+            provided = request.headers.get('Authorization', '').removeprefix('Bearer ')
+            if not hmac.compare_digest(provided, token):
+                return jsonify({'error': 'Invalid metrics token'}), 401
+
+        self.update_pool_gauges()
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+        return Response(generate_latest(registry), mimetype=CONTENT_TYPE_LATEST)
+
+def _start_timer():
+    g.metrics_started_at = time.perf_counter()
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    endpoint = (request.endpoint or 'unmatched') if has_request_context() else 'none'
+    DB_QUERIES.labels(endpoint).inc()
+
+def observe_export(export_format, started_at, size):
+    """Record one finished export"""
+    EXPORT_DURATION.labels(export_format).observe(time.perf_counter() - started_at)
+    EXPORT_SIZE.labels(export_format).observe(size)
+
+def measure_stream(export_format, chunks):
+    """Pass a streamed export through, recording its duration and size when it completes"""
+    started_at = time.perf_counter()
+    size = 0
+    for chunk in chunks:
+        size += len(chunk.encode('utf-8')) if isinstance(chunk, str) else len(chunk)
+        yield chunk
+    observe_export(export_format, started_at, size)
+
+# Initialize metrics
+metrics = Metrics()
@@ -4,7 +4,7 @@ Run this script to update the database schema
 """
 
 from app import app, db
-from models import Donation, Donor, Campaign, User, Invite, UserRole, Sponsorship
+from models import Donation, Donor, Campaign, User, Invite, UserRole, Sponsorship, SchemaVersion, SCHEMA_VERSION
 from auth import auth_service
 from datetime import datetime, timedelta
 import json
@@ -176,6 +176,60 @@ def migrate_sponsorship_is_closed():
         
         print("Sponsorship is_closed migration completed!")
 
+def migrate_user_role_towers():
+    """Migrate user_roles to add the native towers column and backfill it from the JSON string"""
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        existing_columns = [col['name'] for col in inspector.get_columns('user_roles')]
+        
+        if 'towers' not in existing_columns:
+            # INTEGER[] on PostgreSQL, a BIGINT bitmask everywhere else (see models.TowerList)
+            column_type = 'INTEGER[]' if db.engine.dialect.name == 'postgresql' else 'BIGINT'
+            with db.engine.connect() as conn:
+                conn.execute(db.text(f'ALTER TABLE user_roles ADD COLUMN towers {column_type}'))
+                conn.commit()
+            print("Added towers column to user_roles table")
+        else:
+            print("towers column already exists in user_roles table")
+        
+        # Backfill from assigned_towers (the validator on UserRole does the conversion)
+        backfilled = 0
+        for user_role in UserRole.query.filter(UserRole.towers.is_(None)).all():
+            user_role.assigned_towers = user_role.assigned_towers
+            backfilled += 1
+        db.session.commit()
+        print(f"Backfilled towers for {backfilled} user roles")
+        
+        print("User role towers migration completed!")
+
+def migrate_donation_apartment_key():
+    """Migrate donations to add the apartment_key column, backfill it and index it"""
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        existing_columns = [col['name'] for col in inspector.get_columns('donations')]
+        
+        with db.engine.connect() as conn:
+            if 'apartment_key' not in existing_columns:
+                conn.execute(db.text('ALTER TABLE donations ADD COLUMN apartment_key INTEGER'))
+                print("Added apartment_key column to donations table")
+            else:
+                print("apartment_key column already exists in donations table")
+            
+            # Backfill with the same formula as building_layout.apartment_key
+            result = conn.execute(db.text(
+                'UPDATE donations SET apartment_key = tower * 10000 + floor * 100 + unit '
+                'WHERE apartment_key IS NULL AND tower IS NOT NULL AND floor IS NOT NULL AND unit IS NOT NULL'
+            ))
+            print(f"Backfilled apartment_key for {result.rowcount} donations")
+            
+            conn.execute(db.text(
+                'CREATE INDEX IF NOT EXISTS ix_donations_apartment_key_status '
+                'ON donations (apartment_key, status)'
+            ))
+            conn.commit()
+        
+        print("Donation apartment_key migration completed!")
+
 def create_default_admin():
     """Create a default admin user"""
     with app.app_context():
@@ -376,6 +430,27 @@ def seed_sponsorships_from_csv():
             print(f"Error reading CSV file: {e}")
             db.session.rollback()
 
+def migrate_donation_created_at_index():
+    """Migrate donations to index created_at for date-range statistics"""
+    with app.app_context():
+        with db.engine.connect() as conn:
+            conn.execute(db.text(
+                'CREATE INDEX IF NOT EXISTS ix_donations_created_at ON donations (created_at)'
+            ))
+            conn.commit()
+        
+        print("Donation created_at index migration completed!")
+
+def record_schema_version():
+    """Record that the schema is at SCHEMA_VERSION (read by /health/ready)"""
+    with app.app_context():
+        SchemaVersion.__table__.create(db.engine, checkfirst=True)
+        if not db.session.get(SchemaVersion, SCHEMA_VERSION):
+            db.session.add(SchemaVersion(version=SCHEMA_VERSION))
+            db.session.commit()
+        
+        print(f"Schema version {SCHEMA_VERSION} recorded!")
+
 if __name__ == "__main__":
     print("Starting database migration...")
     create_tables()
@@ -384,6 +459,10 @@ if __name__ == "__main__":
     migrate_sponsorship_table()
     migrate_donation_sponsorship()
     migrate_sponsorship_is_closed()
+    migrate_user_role_towers()
+    migrate_donation_apartment_key()
+    migrate_donation_created_at_index()
+    record_schema_version()
     create_default_admin()
     create_sample_invites()
     seed_sample_data()
@@ -1,8 +1,53 @@
 from app import db
 from datetime import datetime
+from sqlalchemy import any_, bindparam, func
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import validates
+from sqlalchemy.types import TypeDecorator
+from building_layout import apartment_key
+import json
 import secrets
 import string
 
+# Bump with every schema migration added to migrations.py; /health/ready
+# reports databases whose recorded version is behind
+SCHEMA_VERSION = 8
+
+class TowerList(TypeDecorator):
+    """List of tower numbers stored natively: INTEGER[] on PostgreSQL, a bitmask elsewhere
+
+    Bit n-1 of the mask represents tower n, so a BIGINT covers towers 1-63.
+    """
+    impl = db.BigInteger
+    cache_ok = True
+    
+    MAX_MASK_TOWER = 63
+    
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.ARRAY(db.Integer))
+        return dialect.type_descriptor(db.BigInteger())
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        towers = sorted({int(tower) for tower in value})
+        if dialect.name == 'postgresql':
+            return towers
+        mask = 0
+        for tower in towers:
+            if not 1 <= tower <= self.MAX_MASK_TOWER:
+                raise ValueError(f'Tower {tower} cannot be stored in a tower bitmask')
+            mask |= 1 << (tower - 1)
+        return mask
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if dialect.name == 'postgresql':
+            return sorted(value)
+        return [bit + 1 for bit in range(self.MAX_MASK_TOWER) if value >> bit & 1]
+
 class User(db.Model):
     """User model for authentication"""
     __tablename__ = 'users'
@@ -62,8 +107,15 @@ class UserRole(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     role = db.Column(db.String(20), nullable=False)  # collector, admin
     assigned_towers = db.Column(db.String(200), nullable=True)  # JSON string of tower assignments
+    towers = db.Column(TowerList, nullable=True)  # Native copy of assigned_towers, kept in sync below
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    @validates('assigned_towers')
+    def _sync_towers(self, key, value):
+        """Keep the native tower column in step with the JSON string"""
+        self.towers = json.loads(value) if value else []
+        return value
+    
     def __repr__(self):
         return f'<UserRole {self.user_id} - {self.role}>'
 
@@ -133,6 +185,7 @@ class Donation(db.Model):
     tower = db.Column(db.Integer, nullable=False)
     floor = db.Column(db.Integer, nullable=False)
     unit = db.Column(db.Integer, nullable=False)
+    apartment_key = db.Column(db.Integer, nullable=True)  # tower*10000 + floor*100 + unit, kept in sync below
     donor_name = db.Column(db.String(100), nullable=False)  # Direct donor name for apartment donations
     phone_number = db.Column(db.String(20))
     head_count = db.Column(db.Integer)
@@ -156,5 +209,46 @@ class Donation(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)  # Collector
     sponsorship_id = db.Column(db.Integer, db.ForeignKey('sponsorships.id'), nullable=True)  # Sponsorship
     
+    # Several rows may exist per apartment (follow-up, then completed), so the index is
+    # on (apartment_key, status) rather than unique on the apartment alone
+    __table_args__ = (
+        db.Index('ix_donations_apartment_key_status', 'apartment_key', 'status'),
+        db.Index('ix_donations_created_at', 'created_at'),
+    )
+    
+    @validates('tower', 'floor', 'unit')
+    def _sync_apartment_key(self, key, value):
+        """Keep apartment_key in step with tower/floor/unit"""
+        parts = {'tower': self.tower, 'floor': self.floor, 'unit': self.unit, key: value}
+        if None not in parts.values():
+            self.apartment_key = apartment_key(int(parts['tower']), int(parts['floor']), int(parts['unit']))
+        return value
+    
+    @staticmethod
+    def apartment_key_in(keys):
+        """Filter on a list of apartment keys sent as a single parameter
+
+        PostgreSQL gets one array bind (= ANY(:keys)); other databases get an IN list.
+        """
+        keys = [int(key) for key in keys]
+        if db.engine.dialect.name == 'postgresql':
+            return Donation.apartment_key == any_(
+                bindparam('apartment_keys', keys, type_=postgresql.ARRAY(db.Integer))
+            )
+        return Donation.apartment_key.in_(keys)
+    
+    @staticmethod
+    def latest_per_apartment(*criteria):
+        """Query for the most recent donation row of each apartment matching criteria"""
+        latest_ids = db.session.query(func.max(Donation.id)).filter(*criteria).group_by(Donation.apartment_key)
+        return Donation.query.filter(Donation.id.in_(latest_ids.scalar_subquery()))
+    
     def __repr__(self):
         return f'<Donation {self.id} - {self.donor_name} - ₹{self.amount}>'
+
+class SchemaVersion(db.Model):
+    """Schema versions recorded by migrations.py and init_db.py"""
+    __tablename__ = 'schema_version'
+    
+    version = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow)
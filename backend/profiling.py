@@ -0,0 +1,173 @@
+"""
+Opt-in per-request profiling with cProfile
+
+With PROFILING_ENABLED, an admin can profile one request by sending
+"X-Profile: 1" with their token; PROFILE_ALL_REQUESTS profiles every request
+(staging only, it roughly doubles request time). The profiler runs from
+before_request until teardown, so the body of a streamed export is
+included. Each profile is written to PROFILE_DIR/<endpoint>/ as a .prof file
+(open it with pstats or snakeviz) next to a .json summary, and only the
+newest PROFILE_KEEP per endpoint are kept. The admin endpoints in routes.py
+list and download them.
+
+Only one request per worker process is profiled at a time: since Python
+3.12 a profiler is process-wide and enabling a second one raises, and even
+before that the one active profiler also records other threads' work.
+Requests that arrive while another is being profiled are served normally,
+unprofiled.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from flask import g, request
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID = re.compile(r'^\d{8}T\d{6}_\d{6}_\d+$')
+ENDPOINT_NAME = re.compile(r'^\w[\w.]*$')
+
+class RequestProfiler:
+    def __init__(self, app=None):
+        self.app = app
+        self.directory = None
+        self.keep = 10
+        # Held from _start to _finish by the one request being profiled in this process
+        self._active = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('PROFILING_ENABLED', False)
+        app.config.setdefault('PROFILE_ALL_REQUESTS', False)
+        app.config.setdefault('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'donation-app-profiles'))
+        app.config.setdefault('PROFILE_KEEP', 10)
+
+        self.directory = app.config['PROFILE_DIR']
+        self.keep = app.config['PROFILE_KEEP']
+        if not (app.config['PROFILING_ENABLED'] or app.config['PROFILE_ALL_REQUESTS']):
+            return
+
+        app.before_request(self._start)
+        app.after_request(self._record_status)
+        app.teardown_request(self._finish)
+
+    def _wanted(self):
+        if self.app.config['PROFILE_ALL_REQUESTS']:
+            return True
+        if request.headers.get(PROFILE_HEADER) != '1':
+            return False
+        # Checked here rather than by require_role: the view has not run yet
+        from auth import auth_service
+        token = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        payload = auth_service.verify_token(token) if token else None
+        return bool(payload) and any(role['role'] == 'admin' for role in payload.get('roles', []))
+
+    def _start(self):
+        if not self._wanted() or not self._active.acquire(blocking=False):
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiling tool (a debugger, coverage) is active in this process
+            self._active.release()
+            return
+        g.profile_started_at = time.perf_counter()
+        g.profiler = profiler
+
+    def _record_status(self, response):
+        if 'profiler' in g:
+            g.profile_status = response.status_code
+        return response
+
+    def _finish(self, exception=None):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        profiler.disable()
+        self._active.release()
+        duration_ms = (time.perf_counter() - g.pop('profile_started_at')) * 1000
+        try:
+            self._save(profiler, request.endpoint or 'unmatched', duration_ms, g.pop('profile_status', 500))
+        except OSError:
+            logger.exception('Could not save request profile')
+
+    def _save(self, profiler, endpoint, duration_ms, status):
+        directory = os.path.join(self.directory, endpoint)
+        os.makedirs(directory, exist_ok=True)
+        now = datetime.now(timezone.utc)
+        profile_id = f"{now.strftime('%Y%m%dT%H%M%S_%f')}_{os.getpid()}"
+        profiler.dump_stats(os.path.join(directory, f'{profile_id}.prof'))
+        summary = {
+            'id': profile_id,
+            'endpoint': endpoint,
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'status': status,
+            'duration_ms': round(duration_ms, 1),
+            'created_at': now.isoformat(),
+            'pid': os.getpid(),
+        }
+        with open(os.path.join(directory, f'{profile_id}.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f)
+        self._prune(directory)
+
+    def _prune(self, directory):
+        """Delete all but the newest PROFILE_KEEP profiles of one endpoint"""
+        ids = sorted(name[:-5] for name in os.listdir(directory) if name.endswith('.json'))
+        for profile_id in ids[:-self.keep] if self.keep > 0 else ids:
+            for extension in ('.json', '.prof'):
+                try:
+                    os.remove(os.path.join(directory, profile_id + extension))
+                except FileNotFoundError:
+                    pass  # Another worker pruned it first
+
+    def list_profiles(self):
+        """{endpoint: [summary, ...]} with the newest profile first"""
+        profiles = {}
+        if not os.path.isdir(self.directory):
+            return profiles
+        for endpoint in sorted(os.listdir(self.directory)):
+            directory = os.path.join(self.directory, endpoint)
+            if not os.path.isdir(directory):
+                continue
+            summaries = []
+            for name in sorted(os.listdir(directory), reverse=True):
+                if not name.endswith('.json'):
+                    continue
+                try:
+                    with open(os.path.join(directory, name), encoding='utf-8') as f:
+                        summaries.append(json.load(f))
+                except (OSError, ValueError):
+                    continue  # Pruned or still being written
+            if summaries:
+                profiles[endpoint] = summaries
+        return profiles
+
+    def profile_path(self, endpoint, profile_id):
+        """Path of a saved .prof file, or None (ids are validated, so no path traversal)"""
+        if not PROFILE_ID.match(profile_id) or not ENDPOINT_NAME.match(endpoint):
+            return None
+        path = os.path.join(self.directory, endpoint, f'{profile_id}.prof')
+        return path if os.path.isfile(path) else None
+
+def format_profile(path, sort='cumulative', limit=50):
+    """pstats text report of a saved profile"""
+    out = io.StringIO()
+    stats = pstats.Stats(path, stream=out)
+    stats.strip_dirs().sort_stats(sort).print_stats(limit)
+    return out.getvalue()
+
+# Initialize request profiler
+request_profiler = RequestProfiler()
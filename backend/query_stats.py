@@ -0,0 +1,119 @@
+"""
+Opt-in per-request query instrumentation
+
+With QUERY_INSTRUMENTATION enabled, SQLAlchemy cursor events count every
+statement a request runs and time it. Each response gets a Server-Timing
+header (db time and query count, plus total app time), each request logs
+one JSON line when it finishes, and statements slower than SLOW_QUERY_MS are
+logged with their parameters. Statements repeated N_PLUS_ONE_THRESHOLD times
+in one request are called out in the request line, which is how N+1 loops
+show up.
+
+When disabled (the default) no event listeners are registered at all.
+"""
+
+import json
+import logging
+import time
+from collections import Counter
+from flask import g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Longest statement / parameter text written to the logs
+MAX_LOGGED_CHARS = 500
+
+class QueryInstrumentation:
+    def __init__(self, app=None):
+        self.app = app
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('QUERY_INSTRUMENTATION', False)
+        app.config.setdefault('SLOW_QUERY_MS', 200)
+        app.config.setdefault('SLOW_QUERY_LOG_PARAMS', True)
+        app.config.setdefault('N_PLUS_ONE_THRESHOLD', 10)
+
+        self.slow_query_seconds = app.config['SLOW_QUERY_MS'] / 1000
+        self.log_params = app.config['SLOW_QUERY_LOG_PARAMS']
+        self.n_plus_one_threshold = app.config['N_PLUS_ONE_THRESHOLD']
+        self.enabled = app.config['QUERY_INSTRUMENTATION']
+        if not self.enabled:
+            return
+
+        if not event.contains(Engine, 'before_cursor_execute', self._before_cursor_execute):
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+        app.before_request(self._start_request)
+        app.after_request(self._add_server_timing)
+        app.teardown_request(self._log_request)
+
+    def _start_request(self):
+        g.query_started_at = time.perf_counter()
+        g.query_count = 0
+        g.query_seconds = 0.0
+        g.query_statements = Counter()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        in_request = has_request_context() and 'query_count' in g
+        if in_request:
+            g.query_count += 1
+            g.query_seconds += elapsed
+            g.query_statements[statement] += 1
+        if elapsed >= self.slow_query_seconds:
+            entry = {
+                'event': 'slow_query',
+                'duration_ms': round(elapsed * 1000, 1),
+                'statement': _truncate(statement),
+            }
+            if self.log_params:
+                entry['parameters'] = _truncate(repr(parameters))
+            if in_request:
+                entry.update({'method': request.method, 'path': request.path})
+            logger.warning(json.dumps(entry))
+
+    def _add_server_timing(self, response):
+        """Queries run so far; a streamed body's queries only reach the log line"""
+        if 'query_count' in g:
+            total = time.perf_counter() - g.query_started_at
+            response.headers.add(
+                'Server-Timing',
+                f'db;dur={g.query_seconds * 1000:.1f};desc="{g.query_count} queries", app;dur={total * 1000:.1f}'
+            )
+        return response
+
+    def _log_request(self, exception=None):
+        if 'query_count' not in g:
+            return
+        entry = {
+            'event': 'request_queries',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'queries': g.query_count,
+            'db_ms': round(g.query_seconds * 1000, 1),
+            'total_ms': round((time.perf_counter() - g.query_started_at) * 1000, 1),
+        }
+        level = logging.INFO
+        if g.query_statements:
+            statement, count = g.query_statements.most_common(1)[0]
+            if count >= self.n_plus_one_threshold:
+                entry['repeated_statement'] = {'count': count, 'statement': _truncate(statement)}
+                level = logging.WARNING
+        logger.log(level, json.dumps(entry))
+
+def _truncate(text):
+    text = ' '.join(str(text).split())
+    return text if len(text) <= MAX_LOGGED_CHARS else text[:MAX_LOGGED_CHARS] + '...'
+
+# Initialize query instrumentation
+query_instrumentation = QueryInstrumentation()
@@ -0,0 +1,203 @@
+"""
+Token-bucket rate limiting for the login endpoint
+
+Attempts are limited per client IP and per email before any database query or
+bcrypt check runs. Buckets live in process memory by default; set
+RATE_LIMIT_STORAGE_URL to a sqlite:/// file to share them between gunicorn
+workers on the same host.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import request, jsonify
+
+def parse_rate(rate):
+    """Parse "count/seconds" (e.g. "5/300") into (capacity, refill tokens per second)"""
+    count, _, seconds = str(rate).partition('/')
+    capacity = int(count)
+    period = float(seconds or 60)
+    if capacity <= 0 or period <= 0:
+        raise ValueError(f'Invalid rate limit {rate!r}, expected "count/seconds"')
+    return capacity, capacity / period
+
+def _take(tokens, updated_at, now, capacity, refill_rate):
+    """Refill a bucket and try to take one token
+
+    Returns (allowed, remaining tokens, retry_after seconds).
+    """
+    if tokens is None:
+        tokens = capacity
+    else:
+        tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+    if tokens >= 1:
+        return True, tokens - 1, 0
+    return False, tokens, (1 - tokens) / refill_rate
+
+class MemoryRateLimitStore:
+    """Per-process buckets; the oldest keys are dropped beyond max_keys"""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill_rate):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (None, now))
+            allowed, tokens, retry_after = _take(tokens, updated_at, now, capacity, refill_rate)
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+class SQLiteRateLimitStore:
+    """Buckets in a local SQLite file, shared by every worker process on the host"""
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        # A short-lived connection, so none is inherited by forked gunicorn workers
+        conn = sqlite3.connect(self.path, timeout=5)
+        try:
+            with conn:
+                conn.execute(
+                    'CREATE TABLE IF NOT EXISTS rate_limit_buckets '
+                    '(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)'
+                )
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, capacity, refill_rate):
+        now = time.time()  # Wall clock, since monotonic clocks differ between processes
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?', (key,)
+            ).fetchone()
+            tokens, updated_at = row if row else (None, now)
+            allowed, tokens, retry_after = _take(tokens, updated_at, now, capacity, refill_rate)
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)',
+                (key, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return allowed, retry_after
+
+    def reset(self, key):
+        self._connect().execute('DELETE FROM rate_limit_buckets WHERE key = ?', (key,))
+
+def create_store(storage_url):
+    """Build a bucket store from "memory://" or "sqlite:///path/to/file.db" """
+    if not storage_url or storage_url.startswith('memory://'):
+        return MemoryRateLimitStore()
+    if storage_url.startswith('sqlite:///'):
+        path = storage_url[len('sqlite:///'):]
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return SQLiteRateLimitStore(path)
+    raise ValueError(f'Unsupported RATE_LIMIT_STORAGE_URL: {storage_url}')
+
+class LoginRateLimiter:
+    def __init__(self, app=None):
+        self.app = app
+        self.store = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.config.setdefault('RATE_LIMIT_ENABLED', True)
+        app.config.setdefault('RATE_LIMIT_STORAGE_URL', 'memory://')
+        app.config.setdefault('RATE_LIMIT_PROXY_COUNT', 0)
+        app.config.setdefault('LOGIN_RATE_LIMIT_PER_IP', '20/60')
+        app.config.setdefault('LOGIN_RATE_LIMIT_PER_EMAIL', '5/300')
+
+        self.ip_rate = parse_rate(app.config['LOGIN_RATE_LIMIT_PER_IP'])
+        self.email_rate = parse_rate(app.config['LOGIN_RATE_LIMIT_PER_EMAIL'])
+        self.store = create_store(app.config['RATE_LIMIT_STORAGE_URL'])
+
+    def client_ip(self):
+        """Client address, as seen by the outermost of RATE_LIMIT_PROXY_COUNT trusted proxies
+
+        Each proxy appends the address it was connected from to X-Forwarded-For,
+        so with N proxies the client is the N-th entry from the right. Entries
+        further left come from the client and could be forged.
+        """
+        proxy_count = self.app.config['RATE_LIMIT_PROXY_COUNT']
+        if proxy_count > 0:
+            forwarded = [hop.strip() for hop in request.headers.get('X-Forwarded-For', '').split(',') if hop.strip()]
+            if len(forwarded) >= proxy_count:
+                return forwarded[-proxy_count]
+        return request.remote_addr or 'unknown'
+
+    def email_key(self, email):
+        return f"login:email:{email.strip().lower()}"
+
+    def check(self, email=None):
+        """Consume one attempt for this IP (and email); return retry_after seconds if rejected"""
+        capacity, refill_rate = self.ip_rate
+        allowed, retry_after = self.store.take(f"login:ip:{self.client_ip()}", capacity, refill_rate)
+        if not allowed:
+            return retry_after
+
+        if email:
+            capacity, refill_rate = self.email_rate
+            allowed, retry_after = self.store.take(self.email_key(email), capacity, refill_rate)
+            if not allowed:
+                return retry_after
+
+        return None
+
+    def reset_email(self, email):
+        """Clear the per-email lockout after a successful login"""
+        if self.store is not None and email:
+            self.store.reset(self.email_key(email))
+
+    def limit(self, f):
+        """Decorator rejecting over-limit attempts before the view touches the DB"""
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not self.app.config['RATE_LIMIT_ENABLED']:
+                return f(*args, **kwargs)
+
+            data = request.get_json(silent=True)
+            email = data.get('email') if isinstance(data, dict) else None
+            retry_after = self.check(email if isinstance(email, str) else None)
+            if retry_after is not None:
+                retry_after = max(1, int(retry_after + 0.999))
+                response = jsonify({
+                    'error': 'Too many login attempts, please try again later',
+                    'retry_after': retry_after
+                })
+                response.headers['Retry-After'] = str(retry_after)
+                return response, 429
+
+            return f(*args, **kwargs)
+
+        return decorated_function
+
+# Initialize login rate limiter
+login_rate_limiter = LoginRateLimiter()
@@ -1,22 +1,116 @@
-from flask import Blueprint, jsonify, request, send_file
+from flask import Blueprint, Response, current_app, jsonify, request, send_file, stream_with_context
 from models import db, Donor, Donation, Campaign, User, Sponsorship
 from schemas import donor_schema, donors_schema, donation_schema, donations_schema, campaign_schema, campaigns_schema, sponsorship_schema, sponsorships_schema, qr_code_upload_schema
-from auth import require_auth, require_tower_access, require_role
-from sqlalchemy import func
+from auth import auth_service, require_auth, require_tower_access, require_role
+from sqlalchemy import event, func
 from excel_export import export_donations_to_excel
-from datetime import datetime
+from data_export import generate_csv, generate_ndjson, generate_parquet, parquet_available
+from building_layout import get_layout, apartment_key, split_apartment_key
+from cache import TTLCache
+from db_pool import pool_metrics
+from db_routing import RoutingSession, on_primary, read_replica
+from metrics import SPONSORSHIP_CONFLICTS, measure_stream, observe_export
+from profiling import format_profile, request_profiler
+from datetime import date, datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
 import base64
 import io
+import os
+import time
 
 # Create API blueprint
 api_bp = Blueprint('api', __name__)
 
+# Upper bound on apartments per bulk lookup request
+MAX_APARTMENT_LOOKUP = 5000
+
+# Aggregate statistics cached per worker for STATS_CACHE_TTL seconds. A worker
+# drops its entries once its own donation writes commit; the other workers do
+# not hear about the write and may serve stale values for up to the TTL.
+stats_cache = TTLCache(maxsize=64, ttl=3600)
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _mark_donation_write(session, flush_context):
+    if any(isinstance(obj, Donation) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info['donations_changed'] = True
+
+@event.listens_for(RoutingSession, 'after_commit')
+def _invalidate_stats_cache(session):
+    # Cleared only once committed: clearing at flush let a concurrent request
+    # recompute from the old committed rows and cache them for the full TTL
+    if session.info.pop('donations_changed', False):
+        stats_cache.clear()
+
+@event.listens_for(RoutingSession, 'after_soft_rollback')
+def _discard_donation_write(session, previous_transaction):
+    # A read after the flush in this session may have cached the uncommitted totals
+    if session.info.pop('donations_changed', False):
+        stats_cache.clear()
+
+def _cached_stats(key, compute):
+    """Return a cached aggregate, computing and caching it on a miss
+
+    Misses are computed on the primary: a lagging replica could miss a
+    just-committed donation and that result would be served for the full TTL.
+    """
+    value = stats_cache.get(key)
+    if value is None:
+        with on_primary():
+            value = compute()
+        stats_cache.set(key, value, expires_at=time.time() + current_app.config.get('STATS_CACHE_TTL', 30))
+    return value
+
 # Health check endpoint
 @api_bp.route('/health', methods=['GET'])
 def health():
     """API health check"""
     return jsonify({'status': 'healthy', 'api': 'v1'})
 
+@api_bp.route('/admin/db-pool', methods=['GET'])
+@require_auth
+@require_role('admin')
+def get_db_pool_stats():
+    """Connection pool occupancy and checkout wait times for the worker serving this request"""
+    stats = pool_metrics.snapshot(db.engine.pool)
+    stats['pid'] = os.getpid()
+    return jsonify(stats)
+
+@api_bp.route('/admin/profiles', methods=['GET'])
+@require_auth
+@require_role('admin')
+def list_profiles():
+    """Saved request profiles per endpoint, newest first (see profiling.py)"""
+    return jsonify({
+        'enabled': current_app.config['PROFILING_ENABLED'] or current_app.config['PROFILE_ALL_REQUESTS'],
+        'keep_per_endpoint': current_app.config['PROFILE_KEEP'],
+        'profiles': request_profiler.list_profiles()
+    })
+
+@api_bp.route('/admin/profiles/<endpoint>/<profile_id>', methods=['GET'])
+@require_auth
+@require_role('admin')
+def get_profile(endpoint, profile_id):
+    """Download a saved profile (.prof for pstats/snakeviz)
+
+    Supported query params:
+    - format: "text" -> pstats report instead of the .prof file
+    - sort: pstats sort key for the text report (default cumulative)
+    - limit: functions in the text report (default 50)
+    """
+    path = request_profiler.profile_path(endpoint, profile_id)
+    if path is None:
+        return jsonify({'error': 'Profile not found'}), 404
+
+    if request.args.get('format') == 'text':
+        sort = request.args.get('sort', 'cumulative')
+        if sort not in ('cumulative', 'tottime', 'calls', 'ncalls', 'time'):
+            return jsonify({'error': f'Invalid sort {sort!r}'}), 400
+        limit = max(1, min(request.args.get('limit', 50, type=int), 500))
+        return Response(format_profile(path, sort, limit), mimetype='text/plain')
+
+    return send_file(path, mimetype='application/octet-stream', as_attachment=True,
+                     download_name=f'{endpoint}_{profile_id}.prof')
+
 # Donor endpoints
 @api_bp.route('/donors', methods=['GET'])
 @require_auth
@@ -150,6 +244,7 @@ def update_donation(donation_id):
                 return jsonify({'error': 'Sponsorship not found'}), 404
             
             if sponsorship.is_closed:
+                SPONSORSHIP_CONFLICTS.inc()
                 return jsonify({'error': 'Sponsorship is already closed'}), 400
             
             # Increment booked count
@@ -191,6 +286,7 @@ def create_donation():
                 return jsonify({'error': 'Sponsorship not found'}), 404
             
             if sponsorship.is_closed:
+                SPONSORSHIP_CONFLICTS.inc()
                 return jsonify({'error': 'Sponsorship is already closed'}), 400
             
             # Increment booked count
@@ -239,18 +335,136 @@ def delete_donation(donation_id):
 @require_auth
 @require_tower_access('tower')
 def get_apartment_donation(tower, floor, unit):
-    """Get donation for a specific apartment"""
+    """Get the latest donation for a specific apartment"""
     donation = Donation.query.filter_by(
-        tower=tower, 
-        floor=floor, 
-        unit=unit
-    ).first()
+        apartment_key=apartment_key(tower, floor, unit)
+    ).order_by(Donation.id.desc()).first()
     
     if donation:
         return jsonify(donation_schema.dump(donation))
     else:
         return jsonify({'message': 'No donation found for this apartment'}), 404
 
+def _denied_towers(towers):
+    """Check tower access once for a set of towers; return the sorted towers denied"""
+    accessible = auth_service.accessible_towers(request.user_id)
+    if accessible is None:
+        return []
+    return sorted(towers - accessible)
+
+@api_bp.route('/donations/apartments/lookup', methods=['POST'])
+@require_auth
+@read_replica
+def lookup_apartments():
+    """Get the latest record for many apartments at once (e.g. for printing route sheets)
+
+    Request body: {"apartments": [{"tower": 1, "floor": 2, "unit": 3}, ...]}
+    (each entry may also be a [tower, floor, unit] list).
+
+    Runs one query for all apartments and checks tower access once per
+    distinct tower. The response is streamed as
+    {"results": [{"tower", "floor", "unit", "apartment_key", "donation"}, ...]}
+    with "donation" null for apartments that have no record; apartments
+    with records come first.
+    """
+    data = request.get_json(silent=True) or {}
+    apartments = data.get('apartments') if isinstance(data, dict) else None
+    if not isinstance(apartments, list) or not apartments:
+        return jsonify({'error': 'apartments must be a non-empty list'}), 400
+    if len(apartments) > MAX_APARTMENT_LOOKUP:
+        return jsonify({'error': f'At most {MAX_APARTMENT_LOOKUP} apartments per lookup'}), 400
+
+    layout = get_layout()
+    keys = []
+    try:
+        for apartment in apartments:
+            if isinstance(apartment, dict):
+                numbers = apartment['tower'], apartment['floor'], apartment['unit']
+            else:
+                numbers = tuple(apartment)
+            if len(numbers) != 3 or any(isinstance(number, bool) for number in numbers):
+                raise TypeError
+            tower, floor, unit = (int(number) for number in numbers)
+            # Checked before building keys: a floor or unit outside 1-99 would alias another flat's key
+            if not layout.contains(tower, floor, unit):
+                return jsonify({'error': f'Apartment {tower}-{floor}-{unit} is not part of the building layout'}), 400
+            keys.append(apartment_key(tower, floor, unit))
+    except (KeyError, TypeError, ValueError):
+        return jsonify({'error': 'Each apartment needs integer tower, floor and unit'}), 400
+    keys = list(dict.fromkeys(keys))  # De-duplicate, keeping request order
+
+    denied = _denied_towers({split_apartment_key(key)[0] for key in keys})
+    if denied:
+        return jsonify({'error': f'Access denied to towers {denied}'}), 403
+
+    query = Donation.latest_per_apartment(Donation.apartment_key_in(keys)).yield_per(500)
+    json_dumps = current_app.json.dumps
+
+    def generate():
+        missing = dict.fromkeys(keys)
+        yield '{"results": ['
+        separator = ''
+        for donation in query:
+            missing.pop(donation.apartment_key, None)
+            yield separator + json_dumps({
+                'tower': donation.tower,
+                'floor': donation.floor,
+                'unit': donation.unit,
+                'apartment_key': donation.apartment_key,
+                'donation': donation_schema.dump(donation)
+            })
+            separator = ', '
+        for key in missing:
+            tower, floor, unit = split_apartment_key(key)
+            yield separator + json_dumps({
+                'tower': tower,
+                'floor': floor,
+                'unit': unit,
+                'apartment_key': key,
+                'donation': None
+            })
+            separator = ', '
+        yield ']}'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+@api_bp.route('/donations/apartments/status', methods=['GET'])
+@require_auth
+@read_replica
+def get_apartment_statuses():
+    """Get the latest status of each visited apartment, for the grid view
+
+    Supported query params:
+    - tower: int -> only apartments in this tower
+    - keys: comma-separated apartment keys (tower*10000 + floor*100 + unit)
+      -> answers "which of these apartments are done" in one query
+
+    Returns {apartment_key: status} for apartments that have any record.
+    """
+    tower = request.args.get('tower', type=int)
+    keys = request.args.get('keys', '')
+
+    try:
+        keys = [int(key) for key in keys.split(',') if key.strip()]
+    except ValueError:
+        return jsonify({'error': 'keys must be comma-separated integers'}), 400
+
+    towers = {tower} if tower else {split_apartment_key(key)[0] for key in keys}
+    if not towers:
+        return jsonify({'error': 'Provide a tower or apartment keys'}), 400
+    denied = _denied_towers(towers)
+    if denied:
+        return jsonify({'error': f'Access denied to tower {denied[0]}'}), 403
+
+    criteria = []
+    if tower:
+        criteria.append(Donation.tower == tower)
+    if keys:
+        criteria.append(Donation.apartment_key_in(keys))
+
+    rows = Donation.latest_per_apartment(*criteria).with_entities(Donation.apartment_key, Donation.status).all()
+    return jsonify({str(key): status for key, status in rows})
+
 @api_bp.route('/donations/apartment/<int:tower>/<int:floor>/<int:unit>', methods=['POST'])
 @require_auth
 @require_tower_access('tower')
@@ -273,6 +487,7 @@ def create_apartment_donation(tower, floor, unit):
                 return jsonify({'error': 'Sponsorship not found'}), 404
             
             if sponsorship.is_closed:
+                SPONSORSHIP_CONFLICTS.inc()
                 return jsonify({'error': 'Sponsorship is already closed'}), 400
             
             # Increment booked count
@@ -437,6 +652,8 @@ def delete_sponsorship(sponsorship_id):
 def book_sponsorship(sponsorship_id):
     """Book a sponsorship (mark as closed)"""
     sponsorship = Sponsorship.query.get_or_404(sponsorship_id)
+    if sponsorship.is_closed:
+        SPONSORSHIP_CONFLICTS.inc()
     
     try:
         sponsorship.is_closed = True
@@ -463,6 +680,7 @@ def unbook_sponsorship(sponsorship_id):
 # Statistics endpoint
 @api_bp.route('/stats', methods=['GET'])
 @require_auth
+@read_replica
 def get_stats():
     """Get donation statistics"""
     try:
@@ -481,55 +699,301 @@ def get_stats():
         # Skipped count
         skipped = Donation.query.filter_by(status='skipped').count()
 
+        # Progress against the building layout
+        layout = get_layout()
+        apartments_visited = total_donations + follow_ups + skipped
+
         return jsonify({
             'total_donations': total_donations,
             'total_amount': float(total_amount),
             'average_donation': float(avg_donation),
             'follow_ups': follow_ups,
-            'skipped': skipped
+            'skipped': skipped,
+            'total_apartments': layout.total_apartments,
+            'apartments_visited': apartments_visited,
+            'apartments_remaining': layout.remaining(apartments_visited),
+            'completion_percentage': round(layout.completion(apartments_visited), 1)
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-# Today's statistics endpoint
-@api_bp.route('/stats/today', methods=['GET'])
+# Collector leaderboard endpoint
+COLLECTOR_SORT_KEYS = {
+    'amount': lambda c: (c['total_amount'], c['total_donations']),
+    'donations': lambda c: (c['total_donations'], c['total_amount']),
+    'visited': lambda c: (c['apartments_visited'], c['total_amount']),
+    'last_activity': lambda c: c['last_activity'] or ''
+}
+
+def _compute_collector_stats():
+    """Per-collector totals from one query grouped by collector, tower and status"""
+    rows = db.session.query(
+        User.id,
+        User.name,
+        User.email,
+        Donation.tower,
+        Donation.status,
+        func.count(Donation.id),
+        func.coalesce(func.sum(Donation.amount), 0),
+        func.max(Donation.created_at)
+    ).join(Donation, Donation.user_id == User.id).group_by(
+        User.id, User.name, User.email, Donation.tower, Donation.status
+    ).all()
+
+    collectors = {}
+    for user_id, name, email, tower, status, count, amount, last_activity in rows:
+        collector = collectors.get(user_id)
+        if collector is None:
+            collector = collectors[user_id] = {
+                'user_id': user_id,
+                'name': name,
+                'email': email,
+                'total_donations': 0,
+                'total_amount': 0.0,
+                'follow_ups': 0,
+                'skipped': 0,
+                'apartments_visited': 0,
+                'last_activity': None,
+                'towers': {}
+            }
+        tower_stats = collector['towers'].setdefault(tower, {
+            'tower': tower,
+            'total_donations': 0,
+            'total_amount': 0.0,
+            'apartments_visited': 0
+        })
+        collector['apartments_visited'] += count
+        tower_stats['apartments_visited'] += count
+        if status == 'completed':
+            collector['total_donations'] += count
+            collector['total_amount'] += float(amount)
+            tower_stats['total_donations'] += count
+            tower_stats['total_amount'] += float(amount)
+        elif status == 'follow-up':
+            collector['follow_ups'] += count
+        elif status == 'skipped':
+            collector['skipped'] += count
+        if last_activity and (collector['last_activity'] is None or last_activity.isoformat() > collector['last_activity']):
+            collector['last_activity'] = last_activity.isoformat()
+
+    for collector in collectors.values():
+        collector['towers'] = [collector['towers'][tower] for tower in sorted(collector['towers'])]
+    return list(collectors.values())
+
+@api_bp.route('/stats/collectors', methods=['GET'])
 @require_auth
-def get_today_stats():
-    """Get today's donation statistics"""
+@require_role('admin')
+@read_replica
+def get_collector_stats():
+    """Get the per-collector leaderboard (admin only)
+
+    Supported query params:
+    - sort: amount (default) | donations | visited | last_activity, highest first
+    - page: int (1-based)
+    - page_size: int (default 20, max 100)
+
+    Notes:
+    - Totals come from one grouped query and are cached per worker
+      (see STATS_CACHE_TTL); committing a donation write clears this worker's cache
+    - Each collector includes a per-tower split
+    - Pagination metadata is provided via headers: X-Total-Count, X-Page, X-Page-Size
+    """
+    sort = request.args.get('sort', 'amount')
+    if sort not in COLLECTOR_SORT_KEYS:
+        return jsonify({'error': f"sort must be one of {', '.join(COLLECTOR_SORT_KEYS)}"}), 400
+    page = max(1, request.args.get('page', 1, type=int))
+    page_size = max(1, min(request.args.get('page_size', 20, type=int), 100))
+
     try:
-        # Get today's date range (start and end of today)
-        today = datetime.now().date()
-        today_start = datetime.combine(today, datetime.min.time())
-        today_end = datetime.combine(today, datetime.max.time())
+        leaderboard = _cached_stats(('collectors', sort), lambda: sorted(
+            _compute_collector_stats(), key=COLLECTOR_SORT_KEYS[sort], reverse=True
+        ))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        # Today's donations (completed status only)
-        today_donations = Donation.query.filter(
-            Donation.status == 'completed',
-            Donation.created_at >= today_start,
-            Donation.created_at <= today_end
+    offset = (page - 1) * page_size
+    results = [
+        dict(collector, rank=rank)
+        for rank, collector in enumerate(leaderboard[offset:offset + page_size], start=offset + 1)
+    ]
+
+    response = jsonify(results)
+    response.headers['X-Total-Count'] = str(len(leaderboard))
+    response.headers['X-Page'] = str(page)
+    response.headers['X-Page-Size'] = str(page_size)
+    return response
+
+# Building layout endpoint
+@api_bp.route('/layout', methods=['GET'])
+@require_auth
+def get_building_layout():
+    """Get the building layout used to render the apartment grid"""
+    return jsonify(get_layout().to_dict())
+
+# Drive-timezone helpers (rows are stored as naive UTC via datetime.utcnow)
+def _drive_timezone():
+    return ZoneInfo(current_app.config.get('DRIVE_TIMEZONE', 'Asia/Kolkata'))
+
+def _to_utc(local_dt):
+    """Convert an aware datetime to the naive UTC form stored in created_at"""
+    return local_dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+def _parse_local_datetime(value, tz, end_of_day=False):
+    """Parse an ISO date or datetime query param; naive values are in the drive timezone
+
+    A bare date means the start of that day, or the start of the next day
+    when end_of_day is set (so ?to=2024-10-12 includes the whole 12th).
+    """
+    if len(value) == 10:
+        day = date.fromisoformat(value)
+        if end_of_day:
+            day += timedelta(days=1)
+        return datetime.combine(day, datetime.min.time(), tzinfo=tz)
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=tz)
+    return parsed.astimezone(tz)
+
+def _truncate(local_dt, bucket):
+    """Start of the hour/day bucket containing a local datetime (returned naive)"""
+    local_dt = local_dt.replace(tzinfo=None, minute=0, second=0, microsecond=0)
+    return local_dt.replace(hour=0) if bucket == 'day' else local_dt
+
+def _bucket_expression(bucket, tz, reference):
+    """SQL expression for the local bucket start of Donation.created_at
+
+    PostgreSQL converts each row with the zone rules (DST-safe). SQLite has no
+    zone database, so rows are shifted by the zone's UTC offset at the start of
+    the range, which is exact for fixed-offset zones such as Asia/Kolkata.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        local = func.timezone(tz.key, func.timezone('UTC', Donation.created_at))
+        return func.date_trunc(bucket, local)
+    offset_minutes = int(reference.utcoffset().total_seconds() // 60)
+    fmt = '%Y-%m-%d 00:00:00' if bucket == 'day' else '%Y-%m-%d %H:00:00'
+    return func.strftime(fmt, Donation.created_at, f'{offset_minutes:+d} minutes')
+
+# Upper bound on buckets per time-series request
+MAX_TIMESERIES_BUCKETS = 1000
+
+@api_bp.route('/stats/timeseries', methods=['GET'])
+@require_auth
+@read_replica
+def get_stats_timeseries():
+    """Get donation counts and amounts per hour or day
+
+    Supported query params:
+    - bucket: hour | day (default day)
+    - from, to: ISO date or datetime; naive values are in DRIVE_TIMEZONE
+      (default: the last 7 days, or the last 24 hours for hourly buckets)
+    - tower: int -> only this tower
+
+    Notes:
+    - Buckets are aligned to DRIVE_TIMEZONE and labelled with its offset
+    - Every bucket in the range is returned, including empty ones
+    - Computed with one query grouped by bucket and status over the
+      created_at index
+    """
+    bucket = request.args.get('bucket', 'day')
+    if bucket not in ('hour', 'day'):
+        return jsonify({'error': 'bucket must be hour or day'}), 400
+    tower = request.args.get('tower', type=int)
+
+    tz = _drive_timezone()
+    try:
+        now = datetime.now(tz)
+        end = _parse_local_datetime(request.args['to'], tz, end_of_day=True) if request.args.get('to') else now
+        if request.args.get('from'):
+            start = _parse_local_datetime(request.args['from'], tz)
+        else:
+            start = end - (timedelta(hours=24) if bucket == 'hour' else timedelta(days=7))
+    except ValueError as e:
+        return jsonify({'error': f'Invalid from/to: {e}'}), 400
+    if start >= end:
+        return jsonify({'error': 'from must be before to'}), 400
+
+    step = timedelta(hours=1) if bucket == 'hour' else timedelta(days=1)
+    first_bucket = _truncate(start, bucket)
+    if (end.replace(tzinfo=None) - first_bucket) / step > MAX_TIMESERIES_BUCKETS:
+        return jsonify({'error': f'Range too large, at most {MAX_TIMESERIES_BUCKETS} buckets'}), 400
+
+    try:
+        bucket_start = _bucket_expression(bucket, tz, start)
+        query = db.session.query(
+            bucket_start,
+            Donation.status,
+            func.count(Donation.id),
+            func.coalesce(func.sum(Donation.amount), 0)
+        ).filter(
+            Donation.created_at >= _to_utc(start),
+            Donation.created_at < _to_utc(end)
         )
+        if tower:
+            query = query.filter(Donation.tower == tower)
+        rows = query.group_by(bucket_start, Donation.status).all()
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        # Total donations today
-        total_donations = today_donations.count()
+    # Every bucket in the range, keyed by its naive local start
+    buckets = {}
+    current = first_bucket
+    while current < end.replace(tzinfo=None):
+        buckets[current] = {'total_donations': 0, 'total_amount': 0.0, 'follow_ups': 0, 'skipped': 0}
+        current += step
 
-        # Total amount collected today
-        total_amount = db.session.query(func.sum(Donation.amount)).filter(
-            Donation.status == 'completed',
-            Donation.created_at >= today_start,
-            Donation.created_at <= today_end
-        ).scalar() or 0
+    for value, status, count, amount in rows:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        counts = buckets.get(value.replace(tzinfo=None))
+        if counts is None:
+            continue
+        if status == 'completed':
+            counts['total_donations'] += count
+            counts['total_amount'] += float(amount)
+        elif status == 'follow-up':
+            counts['follow_ups'] += count
+        elif status == 'skipped':
+            counts['skipped'] += count
+
+    return jsonify({
+        'bucket': bucket,
+        'timezone': tz.key,
+        'from': start.isoformat(),
+        'to': end.isoformat(),
+        'tower': tower,
+        'series': [
+            dict(counts, bucket_start=local_start.replace(tzinfo=tz).isoformat())
+            for local_start, counts in buckets.items()
+        ]
+    })
 
-        # Average donation today
-        avg_donation = db.session.query(func.avg(Donation.amount)).filter(
+# Today's statistics endpoint
+@api_bp.route('/stats/today', methods=['GET'])
+@require_auth
+@read_replica
+def get_today_stats():
+    """Get today's donation statistics ("today" in DRIVE_TIMEZONE)"""
+    try:
+        # Get today's range in the drive timezone, as naive UTC bounds
+        tz = _drive_timezone()
+        today_start = datetime.combine(datetime.now(tz).date(), datetime.min.time(), tzinfo=tz)
+        tomorrow_start = today_start + timedelta(days=1)
+
+        # Count, total and average of today's completed donations in one query
+        total_donations, total_amount, avg_donation = db.session.query(
+            func.count(Donation.id),
+            func.sum(Donation.amount),
+            func.avg(Donation.amount)
+        ).filter(
             Donation.status == 'completed',
-            Donation.created_at >= today_start,
-            Donation.created_at <= today_end
-        ).scalar() or 0
+            Donation.created_at >= _to_utc(today_start),
+            Donation.created_at < _to_utc(tomorrow_start)
+        ).one()
 
         return jsonify({
             'total_donations': total_donations,
-            'total_amount': float(total_amount),
-            'average_donation': float(avg_donation)
+            'total_amount': float(total_amount or 0),
+            'average_donation': float(avg_donation or 0)
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -537,10 +1001,16 @@ def get_today_stats():
 # Excel Export endpoint
 @api_bp.route('/export/excel', methods=['GET'])
 @require_auth
+@read_replica
 def export_excel():
     """Export all donations to Excel file"""
     try:
-        excel_file = export_donations_to_excel()
+        started_at = time.perf_counter()
+        excel_file = export_donations_to_excel(
+            workers=current_app.config.get('EXCEL_EXPORT_WORKERS', 1),
+            incremental=current_app.config.get('EXCEL_EXPORT_INCREMENTAL', False)
+        )
+        observe_export('xlsx', started_at, excel_file.getbuffer().nbytes)
         
         # Generate filename with timestamp
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -555,6 +1025,69 @@ def export_excel():
     except Exception as e:
         return jsonify({'error': f'Failed to generate Excel file: {str(e)}'}), 500
 
+def _export_filters():
+    """Build donation filters from the export query params (raises ValueError on bad input)
+
+    Supported query params:
+    - tower: int
+    - status: one or more statuses, comma separated (e.g. completed,follow-up)
+    - user_id: int -> collector
+    - from, to: ISO date or datetime; naive values are in DRIVE_TIMEZONE
+    """
+    criteria = []
+    tower = request.args.get('tower')
+    if tower:
+        criteria.append(Donation.tower == int(tower))
+    status = request.args.get('status')
+    if status:
+        criteria.append(Donation.status.in_([item.strip() for item in status.split(',') if item.strip()]))
+    user_id = request.args.get('user_id')
+    if user_id:
+        criteria.append(Donation.user_id == int(user_id))
+    tz = _drive_timezone()
+    if request.args.get('from'):
+        criteria.append(Donation.created_at >= _to_utc(_parse_local_datetime(request.args['from'], tz)))
+    if request.args.get('to'):
+        criteria.append(Donation.created_at < _to_utc(_parse_local_datetime(request.args['to'], tz, end_of_day=True)))
+    return criteria
+
+def _stream_export(generate, mimetype, extension):
+    """Stream a raw donation export as a file download"""
+    try:
+        criteria = _export_filters()
+    except ValueError as e:
+        return jsonify({'error': f'Invalid export filter: {e}'}), 400
+
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    response = Response(stream_with_context(measure_stream(extension, generate(criteria))), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename=donations_{timestamp}.{extension}'
+    # Let nginx pass chunks through instead of buffering the whole export
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@api_bp.route('/export/donations.csv', methods=['GET'])
+@require_auth
+@read_replica
+def export_donations_csv():
+    """Stream donations as CSV (filters: tower, status, user_id, from, to)"""
+    return _stream_export(generate_csv, 'text/csv', 'csv')
+
+@api_bp.route('/export/donations.ndjson', methods=['GET'])
+@require_auth
+@read_replica
+def export_donations_ndjson():
+    """Stream donations as newline-delimited JSON (filters: tower, status, user_id, from, to)"""
+    return _stream_export(generate_ndjson, 'application/x-ndjson', 'ndjson')
+
+@api_bp.route('/export/donations.parquet', methods=['GET'])
+@require_auth
+@read_replica
+def export_donations_parquet():
+    """Stream donations as a typed Parquet file (filters: tower, status, user_id, from, to)"""
+    if not parquet_available():
+        return jsonify({'error': 'Parquet export is not available on this server (pyarrow is not installed)'}), 501
+    return _stream_export(generate_parquet, 'application/vnd.apache.parquet', 'parquet')
+
 # QR Code endpoints
 @api_bp.route('/users/qr-code', methods=['POST'])
 @require_auth
@@ -3,6 +3,7 @@ from marshmallow.validate import Range, Length, OneOf, Email
 from models import Donor, Donation, Campaign, User, Invite, UserRole, Sponsorship
 from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 from datetime import datetime, timedelta
+from building_layout import get_layout, apartment_label
 
 # Authentication Schemas
 class UserSchema(SQLAlchemyAutoSchema):
@@ -50,6 +51,7 @@ class UserRoleSchema(SQLAlchemyAutoSchema):
     # Custom validation
     role = fields.Str(required=True, validate=OneOf(['collector', 'admin']))
     assigned_towers = fields.Str(validate=Length(max=200))
+    towers = fields.List(fields.Int(), dump_only=True)  # Native tower list, mirrors assigned_towers
 
 # Registration and Login Schemas
 class RegisterSchema(Schema):
@@ -142,6 +144,18 @@ class DonationSchema(SQLAlchemyAutoSchema):
     user_id = fields.Int(required=False)
     sponsorship_id = fields.Int(required=False)
 
+    @validates_schema
+    def validate_apartment_in_layout(self, data, **kwargs):
+        """Tower/floor/unit must name an apartment that exists in the building layout."""
+        tower, floor, unit = data.get('tower'), data.get('floor'), data.get('unit')
+        if tower is None or floor is None or unit is None:
+            return
+        if not get_layout().contains(tower, floor, unit):
+            raise ValidationError(
+                f'Apartment {apartment_label(tower, floor, unit)} is not part of the building layout',
+                field_name='unit'
+            )
+
     @validates_schema
     def validate_amount_against_sponsorship(self, data, **kwargs):
         """If a sponsorship is chosen, amount must be more than the sponsorship amount."""
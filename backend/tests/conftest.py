@@ -0,0 +1,52 @@
+"""
+Shared fixtures: the app on a throwaway SQLite database
+
+Run from the backend directory with `pytest`. pytest-flask provides the
+`client` fixture on top of the `app` fixture below.
+"""
+
+import os
+import sys
+import tempfile
+
+# Use a throwaway database and cheap password hashing before the app is imported
+_db_dir = tempfile.mkdtemp(prefix='donation_app_tests_')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ['BCRYPT_LOG_ROUNDS'] = '4'
+os.environ.setdefault('LOG_LEVEL', 'WARNING')
+
+# Add the backend directory to Python path
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+import json
+import pytest
+from app import app as flask_app
+from auth import auth_service
+from models import db, User, UserRole
+
+PASSWORD = 'Welcome@123'
+ADMIN_EMAIL = 'admin@example.com'
+COLLECTOR_EMAIL = 'collector@example.com'
+
+@pytest.fixture(scope='session')
+def app():
+    with flask_app.app_context():
+        db.create_all()
+        for email, role, towers in ((ADMIN_EMAIL, 'admin', list(range(1, 11))), (COLLECTOR_EMAIL, 'collector', [1, 2])):
+            user = User(email=email, name=role.title(), password_hash=auth_service.hash_password(PASSWORD))
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(UserRole(user_id=user.id, role=role, assigned_towers=json.dumps(towers)))
+        db.session.commit()
+    return flask_app
+
+@pytest.fixture
+def auth_headers(app):
+    """Bearer headers for a seeded user, issued without a login round trip"""
+    def headers(email=COLLECTOR_EMAIL):
+        with app.app_context():
+            user = User.query.filter_by(email=email).one()
+            token = auth_service.generate_token(user.id, user.email, auth_service.serialize_roles(user.user_roles))
+        return {'Authorization': f'Bearer {token}'}
+    return headers
@@ -0,0 +1,48 @@
+"""
+Bulk apartment lookup (POST /api/v1/donations/apartments/lookup)
+"""
+
+import pytest
+from models import db, Donation
+from building_layout import apartment_key
+from conftest import ADMIN_EMAIL
+
+LOOKUP_URL = '/api/v1/donations/apartments/lookup'
+
+@pytest.fixture(scope='module')
+def recorded_flat(app):
+    """A donation for A101 (key 10101), which floor 0 unit 101 would alias without range checks"""
+    with app.app_context():
+        donation = Donation(tower=1, floor=1, unit=1, apartment_key=apartment_key(1, 1, 1),
+                            donor_name='Resident A101', amount=1100, status='completed')
+        db.session.add(donation)
+        db.session.commit()
+
+def test_lookup_returns_recorded_flat(client, auth_headers, recorded_flat):
+    response = client.post(LOOKUP_URL, headers=auth_headers(ADMIN_EMAIL), json={
+        'apartments': [{'tower': 1, 'floor': 1, 'unit': 1}, [1, 1, 2]]
+    })
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [result['apartment_key'] for result in results] == [10101, 10102]
+    assert results[0]['donation']['donor_name'] == 'Resident A101'
+    assert results[1]['donation'] is None
+
+@pytest.mark.parametrize('apartment', [
+    {'tower': 1, 'floor': 0, 'unit': 101},  # would alias tower 1 floor 1 unit 1
+    [1, 100, 0],                            # would alias tower 2
+    [1, 15, 1],                             # above the top floor
+    [1, 1, 5],                              # more units than the floor has
+    [11, 1, 1],                             # no such tower
+    [1, 1, -99],
+])
+def test_lookup_rejects_apartments_outside_the_layout(client, auth_headers, recorded_flat, apartment):
+    response = client.post(LOOKUP_URL, headers=auth_headers(ADMIN_EMAIL), json={'apartments': [apartment]})
+    assert response.status_code == 400
+    assert 'not part of the building layout' in response.get_json()['error']
+
+@pytest.mark.parametrize('apartment', [[True, 1, 1], {'tower': 1, 'floor': 1}, [1, 1], ['A', 1, 1]])
+def test_lookup_rejects_malformed_apartments(client, auth_headers, apartment):
+    response = client.post(LOOKUP_URL, headers=auth_headers(ADMIN_EMAIL), json={'apartments': [apartment]})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == 'Each apartment needs integer tower, floor and unit'
@@ -0,0 +1,81 @@
+"""
+Excel export (excel_export.py)
+
+Tower sheets rendered in worker processes and spliced into the workbook
+(excel_tower_sheets.py) must match the sequentially written file.
+"""
+
+import io
+import zipfile
+from datetime import datetime, timedelta
+
+import pytest
+import excel_export
+from openpyxl import load_workbook
+from building_layout import apartment_key
+from excel_export import export_donations_to_excel, tower_sheet_cache
+from models import db, Donation
+
+class FrozenDatetime(datetime):
+    """The Summary and Sponsorship sheets print the export time"""
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 9, 28, 19, 30, 0)
+
+@pytest.fixture(scope='module')
+def tower_donations(app):
+    visited_at = datetime(2025, 9, 27, 18, 0)
+    with app.app_context():
+        for tower in (3, 4, 5):
+            for floor in range(1, 4):
+                for unit, status in enumerate(('completed', 'follow-up', 'skipped', 'completed'), 1):
+                    completed = status == 'completed'
+                    db.session.add(Donation(
+                        tower=tower, floor=floor, unit=unit, apartment_key=apartment_key(tower, floor, unit),
+                        donor_name=f'Resident {tower}-{floor}-{unit}', amount=1100 * floor if completed else 0,
+                        status=status, phone_number='9876543210' if completed else None,
+                        head_count=unit if completed else None, payment_method='upi-other' if completed else None,
+                        upi_other_person='Relative' if completed else None,
+                        notes='Nobody home' if status == 'follow-up' else None,
+                        created_at=visited_at + timedelta(days=floor), updated_at=visited_at + timedelta(days=floor)
+                    ))
+        db.session.commit()
+
+def _export_parts(app, monkeypatch, **options):
+    """{part name: bytes} of an export, minus docProps (it carries the save time)"""
+    monkeypatch.setattr(excel_export, 'datetime', FrozenDatetime)
+    tower_sheet_cache.clear()
+    with app.app_context():
+        data = export_donations_to_excel(**options).getvalue()
+    with zipfile.ZipFile(io.BytesIO(data)) as xlsx:
+        return {name: xlsx.read(name) for name in xlsx.namelist() if not name.startswith('docProps/')}
+
+@pytest.mark.parametrize('options', [{'workers': 2}, {'incremental': True}, {'workers': 2, 'incremental': True}],
+                         ids=['parallel', 'incremental', 'parallel-incremental'])
+def test_spliced_tower_sheets_match_sequential_export(app, monkeypatch, tower_donations, options):
+    sequential = _export_parts(app, monkeypatch, workers=1)
+    spliced = _export_parts(app, monkeypatch, **options)
+
+    tower_sheets = [name for name in sequential if name.startswith('xl/worksheets/sheet')]
+    assert len(tower_sheets) >= 5  # Summary, Sponsorship Summary and towers 3-5
+    assert spliced.keys() == sequential.keys()
+    assert spliced['xl/styles.xml'] == sequential['xl/styles.xml']
+    for name in tower_sheets:
+        assert spliced[name] == sequential[name], name
+    assert spliced == sequential
+
+def test_percentages_are_numbers_formatted_as_percent(app, tower_donations):
+    with app.app_context():
+        workbook = load_workbook(export_donations_to_excel())
+
+    completion = [row[6] for row in workbook['Summary'].iter_rows(min_col=1, max_col=7)
+                  if isinstance(row[0].value, str) and row[0].value.startswith('Tower ')]
+    assert completion
+    for cell in completion:
+        assert isinstance(cell.value, (int, float)) and 0 <= cell.value <= 1
+        assert cell.number_format == '0.0%'
+
+    utilization = next(row[1] for row in workbook['Sponsorship Summary'].iter_rows(max_col=2)
+                       if row[0].value == 'Utilization Rate')
+    assert isinstance(utilization.value, (int, float))
+    assert utilization.number_format == '0.0%'
@@ -0,0 +1,80 @@
+"""
+Google sign-in (AuthService.verify_google_token) against the local stub server
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from auth import auth_service
+from google_stub_server import GoogleStubHandler, start_stub_server
+from models import db, Invite
+
+CLIENT_ID = 'stub-client-id'
+GOOGLE_SETTINGS = ('GOOGLE_CLIENT_ID', 'GOOGLE_TOKENINFO_URL', 'GOOGLE_USERINFO_URL', 'GOOGLE_HTTP_TIMEOUT')
+
+@pytest.fixture
+def google_stub(app):
+    """Start a stub (optionally slow, or issuing tokens for another client) and point the app at it"""
+    saved = {key: app.config[key] for key in GOOGLE_SETTINGS}
+    servers = []
+
+    def start(delay=0.0, client_id=CLIENT_ID, timeout=2.0):
+        server, base_url = start_stub_server(delay=delay, client_id=client_id)
+        servers.append(server)
+        app.config.update(
+            GOOGLE_CLIENT_ID=CLIENT_ID,
+            GOOGLE_TOKENINFO_URL=f'{base_url}/oauth2/v3/tokeninfo',
+            GOOGLE_USERINFO_URL=f'{base_url}/oauth2/v2/userinfo',
+            GOOGLE_HTTP_TIMEOUT=timeout,
+        )
+        auth_service.google_token_cache.clear()
+        GoogleStubHandler.request_count = 0
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+    app.config.update(saved)
+    auth_service.google_token_cache.clear()
+
+def test_sign_in_with_invite(app, client, google_stub):
+    google_stub()
+    with app.app_context():
+        db.session.add(Invite(email='new.collector@example.com', name='New Collector', invite_code='GOOGLE01',
+                              role='collector', assigned_towers='[3]',
+                              expires_at=datetime.utcnow() + timedelta(days=1)))
+        db.session.commit()
+
+    response = client.post('/api/v1/auth/google-auth', json={
+        'google_token': 'stub-new.collector@example.com', 'invite_code': 'GOOGLE01'
+    })
+    assert response.status_code == 200, response.get_json()
+    body = response.get_json()
+    assert body['token']
+    assert body['user']['email'] == 'new.collector@example.com'
+    assert body['roles'] == [{'role': 'collector', 'assigned_towers': [3]}]
+
+def test_invalid_token_is_rejected(google_stub):
+    google_stub()
+    assert auth_service.verify_google_token('not-a-stub-token') is None
+
+def test_token_for_another_client_is_rejected(google_stub):
+    google_stub(client_id='some-other-app')
+    assert auth_service.verify_google_token('stub-collector@example.com') is None
+
+def test_slow_google_times_out(google_stub):
+    google_stub(delay=2.0, timeout=0.3)
+    started_at = time.perf_counter()
+    assert auth_service.verify_google_token('stub-collector@example.com') is None
+    assert time.perf_counter() - started_at < 1.5
+
+def test_cache_hit_makes_no_upstream_request(google_stub):
+    google_stub()
+    user_info = auth_service.verify_google_token('stub-collector@example.com')
+    assert user_info['email'] == 'collector@example.com'
+    assert GoogleStubHandler.request_count == 2  # tokeninfo and userinfo
+
+    assert auth_service.verify_google_token('stub-collector@example.com') == user_info
+    assert GoogleStubHandler.request_count == 2
@@ -0,0 +1,111 @@
+"""
+Login rate limiting (rate_limit.py) through POST /api/v1/auth/login
+"""
+
+import os
+import subprocess
+import sys
+
+import pytest
+from auth import auth_service
+from rate_limit import login_rate_limiter
+from conftest import BACKEND_DIR, COLLECTOR_EMAIL, PASSWORD
+
+RATE_LIMIT_SETTINGS = (
+    'RATE_LIMIT_ENABLED', 'RATE_LIMIT_STORAGE_URL', 'LOGIN_RATE_LIMIT_PER_IP', 'LOGIN_RATE_LIMIT_PER_EMAIL'
+)
+
+# A second "worker": a fresh process importing the app against the same limiter store
+OTHER_WORKER = """
+from app import app
+client = app.test_client()
+print(','.join(
+    str(client.post('/api/v1/auth/login', json={'email': 'nobody@example.com', 'password': 'wrong'}).status_code)
+    for _ in range(3)
+))
+"""
+
+@pytest.fixture
+def rate_limits(app):
+    """Re-initialize the limiter with the given settings (and fresh buckets); restored afterwards"""
+    saved = {key: app.config[key] for key in RATE_LIMIT_SETTINGS}
+
+    def configure(**settings):
+        app.config.update(RATE_LIMIT_ENABLED=True, **settings)
+        login_rate_limiter.init_app(app)
+
+    yield configure
+    app.config.update(saved)
+    login_rate_limiter.init_app(app)
+
+def login(client, email, password='wrong-password'):
+    return client.post('/api/v1/auth/login', json={'email': email, 'password': password})
+
+def test_per_ip_limit_returns_429_with_retry_after(client, rate_limits):
+    rate_limits(LOGIN_RATE_LIMIT_PER_IP='3/60', LOGIN_RATE_LIMIT_PER_EMAIL='100/60')
+    for i in range(3):
+        assert login(client, f'nobody{i}@example.com').status_code == 401
+
+    response = login(client, 'someone-else@example.com')
+    assert response.status_code == 429
+    retry_after = int(response.headers['Retry-After'])
+    assert 1 <= retry_after <= 20
+    assert response.get_json()['retry_after'] == retry_after
+
+def test_per_email_limit_returns_429_with_retry_after(client, rate_limits):
+    rate_limits(LOGIN_RATE_LIMIT_PER_IP='100/60', LOGIN_RATE_LIMIT_PER_EMAIL='2/300')
+    assert login(client, COLLECTOR_EMAIL).status_code == 401
+    assert login(client, COLLECTOR_EMAIL).status_code == 401
+
+    response = login(client, COLLECTOR_EMAIL)
+    assert response.status_code == 429
+    assert 1 <= int(response.headers['Retry-After']) <= 150
+    # Other accounts from the same address are unaffected
+    assert login(client, 'nobody@example.com').status_code == 401
+
+def test_limited_request_skips_database_and_bcrypt(client, rate_limits, monkeypatch):
+    rate_limits(LOGIN_RATE_LIMIT_PER_IP='100/60', LOGIN_RATE_LIMIT_PER_EMAIL='1/300')
+    assert login(client, COLLECTOR_EMAIL).status_code == 401
+
+    calls = []
+    monkeypatch.setattr(auth_service, 'load_user_with_roles', lambda **filters: calls.append('load_user'))
+    monkeypatch.setattr(auth_service, 'verify_password', lambda *args: calls.append('bcrypt'))
+    assert login(client, COLLECTOR_EMAIL).status_code == 429
+    assert calls == []
+
+def test_successful_login_resets_email_limit(client, rate_limits):
+    rate_limits(LOGIN_RATE_LIMIT_PER_IP='100/60', LOGIN_RATE_LIMIT_PER_EMAIL='2/300')
+    assert login(client, COLLECTOR_EMAIL).status_code == 401
+    assert login(client, COLLECTOR_EMAIL, PASSWORD).status_code == 200
+
+    # Without the reset this third attempt in the window would already be rejected
+    assert login(client, COLLECTOR_EMAIL).status_code == 401
+    assert login(client, COLLECTOR_EMAIL).status_code == 401
+    assert login(client, COLLECTOR_EMAIL).status_code == 429
+
+def test_sqlite_store_is_shared_between_workers(app, client, rate_limits, tmp_path):
+    settings = {
+        'RATE_LIMIT_STORAGE_URL': f"sqlite:///{tmp_path / 'rate_limits.db'}",
+        'LOGIN_RATE_LIMIT_PER_IP': '4/60',
+        'LOGIN_RATE_LIMIT_PER_EMAIL': '100/60',
+    }
+    rate_limits(**settings)
+
+    env = dict(os.environ, DATABASE_URL=app.config['SQLALCHEMY_DATABASE_URI'], **settings)
+    worker = subprocess.run([sys.executable, '-c', OTHER_WORKER], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, check=True)
+    assert worker.stdout.strip().splitlines()[-1] == '401,401,401'
+
+    # This process shares the other worker's bucket: one attempt left
+    assert login(client, 'nobody@example.com').status_code == 401
+    assert login(client, 'nobody@example.com').status_code == 429
+
+def test_client_ip_uses_trusted_proxy_hop(app, monkeypatch):
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_PROXY_COUNT', 2)
+    forwarded = {'X-Forwarded-For': 'forged, 203.0.113.7, 10.0.0.2'}
+    with app.test_request_context(headers=forwarded, environ_base={'REMOTE_ADDR': '127.0.0.1'}):
+        assert login_rate_limiter.client_ip() == '203.0.113.7'
+
+    monkeypatch.setitem(app.config, 'RATE_LIMIT_PROXY_COUNT', 0)
+    with app.test_request_context(headers=forwarded, environ_base={'REMOTE_ADDR': '127.0.0.1'}):
+        assert login_rate_limiter.client_ip() == '127.0.0.1'
@@ -0,0 +1,46 @@
+"""
+Concurrent collection writes on SQLite with the WAL/busy-timeout profile (db_pool.SQLiteProfile)
+"""
+
+import threading
+
+from models import db, Donation
+
+THREADS = 16
+WRITES_PER_THREAD = 10
+
+def test_journal_mode_is_wal(app):
+    with app.app_context():
+        assert db.session.execute(db.text('PRAGMA journal_mode')).scalar() == 'wal'
+        assert db.session.execute(db.text('PRAGMA busy_timeout')).scalar() > 0
+
+def test_concurrent_collections_never_hit_database_is_locked(app, auth_headers):
+    headers = auth_headers()
+    with app.app_context():
+        before = Donation.query.filter_by(tower=2).count()
+
+    failures = []
+    start = threading.Barrier(THREADS)
+
+    def collect(worker):
+        client = app.test_client()
+        start.wait()
+        for i in range(WRITES_PER_THREAD):
+            floor, unit = worker % 14 + 1, i % 4 + 1
+            response = client.post(f'/api/v1/donations/apartment/2/{floor}/{unit}', headers=headers, json={
+                'donor_name': f'Donor {worker}-{i}', 'amount': 1100, 'status': 'completed',
+                'payment_method': 'cash',
+            })
+            if response.status_code != 201:
+                failures.append(response.get_data(as_text=True))
+
+    threads = [threading.Thread(target=collect, args=(worker,)) for worker in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not [failure for failure in failures if 'database is locked' in failure]
+    assert failures == []
+    with app.app_context():
+        assert Donation.query.filter_by(tower=2).count() == before + THREADS * WRITES_PER_THREAD
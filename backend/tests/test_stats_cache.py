@@ -0,0 +1,51 @@
+"""
+Per-worker stats cache (routes.stats_cache): cleared when donation writes commit
+"""
+
+from building_layout import apartment_key
+from models import db, Donation
+from routes import stats_cache
+from conftest import ADMIN_EMAIL, COLLECTOR_EMAIL
+
+def _donation(unit):
+    return Donation(tower=6, floor=1, unit=unit, apartment_key=apartment_key(6, 1, unit),
+                    donor_name='Cache test', amount=501, status='completed')
+
+def test_flush_keeps_the_cache_until_commit(app):
+    with app.app_context():
+        stats_cache.set('probe', 1)
+        db.session.add(_donation(1))
+        db.session.flush()
+        assert stats_cache.get('probe') == 1
+        db.session.commit()
+        assert stats_cache.get('probe') is None
+
+def test_rolled_back_flush_clears_the_cache(app):
+    with app.app_context():
+        db.session.add(_donation(2))
+        db.session.flush()
+        stats_cache.set('probe', 1)  # e.g. computed from the uncommitted row
+        db.session.rollback()
+        assert stats_cache.get('probe') is None
+
+def test_commit_without_donation_changes_keeps_the_cache(app):
+    with app.app_context():
+        stats_cache.set('probe', 1)
+        db.session.commit()
+        assert stats_cache.get('probe') == 1
+    stats_cache.clear()
+
+def test_leaderboard_shows_a_new_donation(client, auth_headers):
+    admin, collector = auth_headers(ADMIN_EMAIL), auth_headers(COLLECTOR_EMAIL)
+
+    def collector_amount():
+        response = client.get('/api/v1/stats/collectors?page_size=100', headers=admin)
+        assert response.status_code == 200
+        return sum(row['total_amount'] for row in response.get_json() if row['email'] == COLLECTOR_EMAIL)
+
+    before = collector_amount()
+    response = client.post('/api/v1/donations/apartment/1/3/1', headers=collector, json={
+        'donor_name': 'Leaderboard donor', 'amount': 2100, 'status': 'completed', 'payment_method': 'cash',
+    })
+    assert response.status_code == 201, response.get_json()
+    assert collector_amount() == before + 2100
@@ -9,7 +9,7 @@ import { Profile } from "@/components/profile"
 import { ThemeToggle } from "@/components/theme-toggle"
 import { LogOut, Plus, TrendingUp, ChevronLeft, ChevronRight, Download, User as UserIcon, Gift, X as XIcon } from "lucide-react"
 import { User, UserRole } from "@/services/auth"
-import { donationsService, Donation, DonationStats, TodayStats } from "@/services/donations"
+import { donationsService, Donation, DonationStats, TodayStats, BuildingLayout } from "@/services/donations"
 
 interface DonationDashboardProps {
   user: User
@@ -37,17 +37,31 @@ export function DonationDashboard({ user, roles, onLogout, onNavigateToUserManag
   const [recentDonations, setRecentDonations] = useState<Donation[]>([])
   const [recentTotalCount, setRecentTotalCount] = useState(0)
   const [recentLoading, setRecentLoading] = useState(false)
+  const [layout, setLayout] = useState<BuildingLayout | null>(null)
 
 
   // Get assigned towers from user roles
   const assignedTowers = roles.reduce((towers: number[], role) => {
     if (role.role === 'admin') {
-      // Admin has access to all towers
-      return [1, 2, 3, 4, 5, 6, 7, 8, 10]
+      // Admin has access to all towers in the building layout
+      return layout ? layout.towers.map(t => t.tower) : [1, 2, 3, 4, 5, 6, 7, 8, 10]
     }
     return [...towers, ...role.assigned_towers]
   }, [])
 
+  // Floors/units per tower come from the building layout (14 floors x 4 units until it loads)
+  const excludedApartments = useMemo(() => new Set(layout?.excluded ?? []), [layout])
+  const getTowerLayout = (tower: number) => {
+    const towerLayout = layout?.towers.find(t => t.tower === tower)
+    return { floors: towerLayout?.floors ?? 14, units: towerLayout?.units_per_floor ?? 4 }
+  }
+
+  useEffect(() => {
+    donationsService.getLayout()
+      .then(setLayout)
+      .catch(error => console.error('Failed to load building layout:', error))
+  }, [])
+
   // Remove duplicates and sort
   const uniqueAssignedTowers = [...new Set(assignedTowers)].sort((a, b) => a - b)
 
@@ -109,8 +123,19 @@ export function DonationDashboard({ user, roles, onLogout, onNavigateToUserManag
     loadRecentPage()
   }, [currentPage, pageSize, isAdmin, user.id])
 
+  // Latest donation per apartment, keyed like the backend's apartment_key (tower*10000 + floor*100 + unit)
+  const donationsByApartment = useMemo(() => {
+    const byApartment = new Map<number, Donation>()
+    for (const d of donations) {
+      const key = d.tower * 10000 + d.floor * 100 + d.unit
+      const existing = byApartment.get(key)
+      if (!existing || d.id > existing.id) byApartment.set(key, d)
+    }
+    return byApartment
+  }, [donations])
+
   const getApartmentStatus = (tower: number, floor: number, unit: number) => {
-    const donation = donations.find((d) => d.tower === tower && d.floor === floor && d.unit === unit)
+    const donation = donationsByApartment.get(tower * 10000 + floor * 100 + unit)
     if (donation) {
       if (donation.status === 'completed') return "donated"
       if (donation.status === 'follow-up') return "follow-up"
@@ -402,15 +427,23 @@ export function DonationDashboard({ user, roles, onLogout, onNavigateToUserManag
                 </CardDescription>
               </CardHeader>
               <CardContent className="p-3">
-                <div className="grid grid-cols-4 gap-1 text-xs">
-                  {/* Generate 14 floors, 4 units each */}
-                  {Array.from({ length: 14 }, (_, floorIndex) => {
-                    const floor = 14 - floorIndex // Start from 14th floor down to 1st
-                    return Array.from({ length: 4 }, (_, unitIndex) => {
+                <div
+                  className="grid gap-1 text-xs"
+                  style={{ gridTemplateColumns: `repeat(${getTowerLayout(tower).units}, minmax(0, 1fr))` }}
+                >
+                  {/* Generate floors and units from the building layout */}
+                  {Array.from({ length: getTowerLayout(tower).floors }, (_, floorIndex) => {
+                    const floor = getTowerLayout(tower).floors - floorIndex // Start from the top floor down to 1st
+                    return Array.from({ length: getTowerLayout(tower).units }, (_, unitIndex) => {
                       const unit = unitIndex + 1
                       const status = getApartmentStatus(tower, floor, unit)
                       const apartmentNumber = getApartmentNumber(tower, floor, unit)
 
+                      // Keep the grid aligned where a flat is excluded from the layout
+                      if (excludedApartments.has(apartmentNumber)) {
+                        return <div key={`${floor}-${unit}`} className="h-8 w-full" />
+                      }
+
                       const getButtonClasses = () => {
                         const baseClasses = "h-8 w-full flex items-center justify-center rounded text-xs font-medium transition-colors active:scale-95"
                         
@@ -526,15 +559,23 @@ export function DonationDashboard({ user, roles, onLogout, onNavigateToUserManag
                         </CardDescription>
                       </CardHeader>
                       <CardContent className="p-3">
-                        <div className="grid grid-cols-4 gap-1 text-xs">
-                          {/* Generate 14 floors, 4 units each */}
-                          {Array.from({ length: 14 }, (_, floorIndex) => {
-                            const floor = 14 - floorIndex // Start from 14th floor down to 1st
-                            return Array.from({ length: 4 }, (_, unitIndex) => {
+                        <div
+                          className="grid gap-1 text-xs"
+                          style={{ gridTemplateColumns: `repeat(${getTowerLayout(tower).units}, minmax(0, 1fr))` }}
+                        >
+                          {/* Generate floors and units from the building layout */}
+                          {Array.from({ length: getTowerLayout(tower).floors }, (_, floorIndex) => {
+                            const floor = getTowerLayout(tower).floors - floorIndex // Start from the top floor down to 1st
+                            return Array.from({ length: getTowerLayout(tower).units }, (_, unitIndex) => {
                               const unit = unitIndex + 1
                               const status = getApartmentStatus(tower, floor, unit)
                               const apartmentNumber = getApartmentNumber(tower, floor, unit)
 
+                              // Keep the grid aligned where a flat is excluded from the layout
+                              if (excludedApartments.has(apartmentNumber)) {
+                                return <div key={`${floor}-${unit}`} className="h-8 w-full" />
+                              }
+
                               const getButtonClasses = () => {
                                 const baseClasses = "h-8 w-full flex items-center justify-center rounded text-xs font-medium transition-colors active:scale-95"
                                 
@@ -30,6 +30,45 @@ export interface DonationStats {
   average_donation: number
   follow_ups: number
   skipped: number
+  total_apartments?: number
+  apartments_visited?: number
+  apartments_remaining?: number
+  completion_percentage?: number
+}
+
+export interface TowerLayout {
+  tower: number
+  name: string
+  floors: number
+  units_per_floor: number
+  total_apartments: number
+}
+
+export interface BuildingLayout {
+  towers: TowerLayout[]
+  excluded: string[]  // Apartment labels such as "A101"
+  total_apartments: number
+}
+
+export interface CollectorTowerStats {
+  tower: number
+  total_donations: number
+  total_amount: number
+  apartments_visited: number
+}
+
+export interface CollectorStats {
+  rank: number
+  user_id: number
+  name: string
+  email: string
+  total_donations: number
+  total_amount: number
+  follow_ups: number
+  skipped: number
+  apartments_visited: number
+  last_activity: string | null
+  towers: CollectorTowerStats[]
 }
 
 export interface TodayStats {
@@ -38,6 +77,23 @@ export interface TodayStats {
   average_donation: number
 }
 
+export interface TimeseriesPoint {
+  bucket_start: string
+  total_donations: number
+  total_amount: number
+  follow_ups: number
+  skipped: number
+}
+
+export interface StatsTimeseries {
+  bucket: 'hour' | 'day'
+  timezone: string
+  from: string
+  to: string
+  tower: number | null
+  series: TimeseriesPoint[]
+}
+
 export interface CreateDonationData {
   donor_name: string
   amount: number  // Integer amount in rupees
@@ -225,6 +281,11 @@ class DonationsService {
     return await this.makeRequest('/stats')
   }
 
+  // Get the building layout (towers, floors, units) for the apartment grid
+  async getLayout(): Promise<BuildingLayout> {
+    return await this.makeRequest('/layout')
+  }
+
   // Get today's donation statistics
   async getTodayStats(): Promise<TodayStats> {
     return await this.makeRequest('/stats/today')
@@ -251,6 +312,29 @@ class DonationsService {
     return this.getDonationsPaginated({ user_id: userId, page, page_size })
   }
 
+  // Get donation counts and amounts per hour or day (bucketed in the drive's timezone)
+  async getStatsTimeseries(params: { bucket?: 'hour' | 'day'; from?: string; to?: string; tower?: number } = {}): Promise<StatsTimeseries> {
+    const query = new URLSearchParams()
+    if (params.bucket) query.set('bucket', params.bucket)
+    if (params.from) query.set('from', params.from)
+    if (params.to) query.set('to', params.to)
+    if (typeof params.tower === 'number') query.set('tower', String(params.tower))
+    return await this.makeRequest(`/stats/timeseries?${query.toString()}`)
+  }
+
+  // Get the per-collector leaderboard (admin only)
+  async getCollectorStats(params: { page?: number; page_size?: number; sort?: 'amount' | 'donations' | 'visited' | 'last_activity' } = {}): Promise<{ items: CollectorStats[]; totalCount: number; page: number; pageSize: number; }> {
+    const query = new URLSearchParams()
+    if (typeof params.page === 'number') query.set('page', String(params.page))
+    if (typeof params.page_size === 'number') query.set('page_size', String(params.page_size))
+    if (params.sort) query.set('sort', params.sort)
+    const { data, headers } = await this.makeRequestWithHeaders(`/stats/collectors?${query.toString()}`)
+    const totalCount = parseInt(headers.get('X-Total-Count') || headers.get('x-total-count') || '0', 10)
+    const page = parseInt(headers.get('X-Page') || headers.get('x-page') || String(params.page || 1), 10)
+    const pageSize = parseInt(headers.get('X-Page-Size') || headers.get('x-page-size') || String(params.page_size || 20), 10)
+    return { items: data as CollectorStats[], totalCount, page, pageSize }
+  }
+
   // Export donations to Excel
   async exportToExcel(): Promise<void> {
     const url = `${API_BASE_URL}/export/excel`